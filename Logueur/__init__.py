@@ -7,4 +7,18 @@
 from .logueur import Logueur, ConsoleLogueurFactory
 from .log_level import LogLevel
 from .log_out import ConsoleLogHandler, FileLogHandler
-from .log_topic import LogTopicFilter
\ No newline at end of file
+from .log_topic import LogTopicFilter
+from .log_queue import QueueLogHandler
+from .log_async import AsyncLogHandler
+from .log_rotate import RotatingFileLogHandler
+from .log_mmap import RingLogHandler, RingLogReader
+from .log_recorder import FlightRecorderLogHandler
+from .log_binary import BinaryLogHandler, BinaryLogReader
+from .log_json import JSONLinesLogHandler
+from .log_index import IndexedFileLogHandler, LogIndex, queryLog
+from .log_reader import readLog, filterLevel, filterTopic
+from .log_process import ProcessLogHandler, ProcessLogListener
+from .log_limit import LogRateLimiter
+from .log_coalesce import CoalescingLogHandler
+from .log_metrics import LogMetrics
+from .log_breaker import CircuitBreakerLogHandler
\ No newline at end of file
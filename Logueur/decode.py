@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Converter of the binary log files to text
+# ---------------------------------------------------------
+# ./Logueur/decode.py
+
+""" Module decode
+
+Convert a binary log file, written by a BinaryLogHandler, to the
+text format of the log messages:
+
+    python -m Logueur.decode log.bin [-o log.txt] [--format FORMAT]
+
+The messages are written to the standard output by default.
+"""
+
+import sys
+import argparse
+from typing import Optional
+
+from .log_binary import BinaryLogReader
+
+
+def main(argv:Optional[list[str]]=None) -> int:
+    """ Entry point of the converter
+
+    Arguments:
+    argv : Optional[list[str]]
+        The command line arguments, sys.argv[1:] if None.
+
+    Return:
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m Logueur.decode",
+                                     description="Convert a binary log file to text.")
+    parser.add_argument("input", help="the binary log file")
+    parser.add_argument("-o", "--output", help="the text log file, the standard output by default")
+    parser.add_argument("--format", help="the format of the messages, like LogMessage.msg_fmt")
+    args = parser.parse_args(argv)
+    if args.format is not None and not "{body}" in args.format:
+        parser.error("The format must at least contains {body}")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for msg in BinaryLogReader(args.input):
+            if args.format is not None:
+                msg._fmt = args.format
+            out.write(str(msg))
+    except ValueError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
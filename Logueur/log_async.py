@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output for asyncio
+# ---------------------------------------------------------
+# ./Logueur/log_async.py
+
+""" Module log_async
+
+Implement the AsyncLogHandler class, a handler for the programs
+using asyncio. The messages are pushed in a queue owned by the
+event loop, and a worker task give them to an other handler in
+an executor, so the event loop never wait for the output.
+"""
+
+import asyncio
+from typing import Optional
+from concurrent.futures import Executor
+
+from .log_message import LogMessage
+from .log_out import BaseLogHandler, WrapperLogHandler
+
+
+class AsyncLogHandler(WrapperLogHandler):
+    """ AsyncLogHandler
+
+    Handler pushing the messages in an asyncio queue, a worker task of
+    the event loop writing them with the wrapped handler in an executor.
+    Any handler can be wrapped, like ConsoleLogHandler or FileLogHandler,
+    their write and flush being done outside of the event loop.
+
+    The messages can be pushed with the coroutine aemit, waiting for a
+    place in the queue if it's full, or with emit, dropping the message
+    if the queue is full. The Logueur use aemit in its async methods
+    (alog, ainfo, ...). When emit is called outside of the thread of the
+    event loop, the message is given to the loop thread-safely, and if
+    there is no event loop, the message is written right away.
+
+    The queue and the worker task are created on the first message, in
+    the running event loop.
+    """
+
+    def __init__(self, handler:BaseLogHandler, maxsize:int=10000, executor:Optional[Executor]=None) -> None:
+        """ Constructor of AsyncLogHandler
+
+        Arguments:
+        handler : BaseLogHandler
+            The handler writing the messages.
+        maxsize : int = 10000
+            The maximal number of messages in the queue.
+        executor : Optional[Executor]
+            The executor used for writing the messages, the default
+            executor of the event loop if None.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(maxsize,int) or maxsize <= 0:
+            raise ValueError(f"The maxsize must be a strictly positive int, instead I've received '{maxsize}'")
+        if executor is not None and not isinstance(executor,Executor):
+            raise ValueError(f"The executor must be an Executor, instead I've received a '{type(executor)}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(handler)
+        self._maxsize = maxsize
+        self._executor = executor
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self.dropped = 0
+        self.errors = 0
+
+    def _start(self, loop:asyncio.AbstractEventLoop) -> None:
+        """ Create the queue and the worker task in the running event loop """
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(self._maxsize)
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        """ Worker task, writing the messages in the executor
+
+        All of the messages waiting in the queue are written in
+        the same call of the executor.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            messages = [await self._queue.get()]
+            while not self._queue.empty():
+                messages.append(self._queue.get_nowait())
+            try:
+                await loop.run_in_executor(self._executor, self._writeMessages, messages)
+            finally:
+                for _ in messages:
+                    self._queue.task_done()
+    def _writeMessages(self, messages:list[LogMessage]) -> None:
+        """ Write the messages as a batch with the wrapped handler, in the executor, isolating the failing ones """
+        if not messages:
+            return
+        self.errors += self._writeIsolated(messages)
+
+    async def aemit(self, msg:LogMessage) -> None:
+        """ Emit a message to the log, without blocking the event loop
+
+        Filtrate the message and push it in the queue, waiting for
+        a place if the queue is full.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(msg,LogMessage):
+            raise ValueError(f"The message to emit must be a LogMessage, instead I've received a '{type(msg)}'")
+
+        # Push the message:
+        # -----------------
+        if self._filtrate(msg):
+            self._start(asyncio.get_running_loop())
+            await self._queue.put(msg)
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Push the message in the queue, without waiting.
+
+        If the queue is full the message is dropped. Outside of the
+        thread of the event loop, the message is given to the loop,
+        and without event loop the message is written right away.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._start(loop)
+            self._putNowait(msg)
+        elif self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._putNowait, msg)
+        else:
+            self._handler._write(msg)
+    def _putNowait(self, msg:LogMessage) -> None:
+        """ Push the message in the queue, dropping it if the queue is full """
+        try:
+            self._queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def aflush(self) -> None:
+        """ Wait for the messages in the queue to be written, then flush the wrapped handler """
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._handler.flush)
+    async def aclose(self) -> None:
+        """ Write the messages in the queue, stop the worker task and close the wrapped handler """
+        await self.aflush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._handler.close)
+
+    def flush(self) -> None:
+        """ Flush the wrapped handler, writing right away the messages still in the queue
+
+        Should only be used without running event loop, use aflush otherwise.
+        """
+        self._drain()
+        self._handler.flush()
+    def close(self) -> None:
+        """ Close the wrapped handler, writing right away the messages still in the queue
+
+        Should only be used without running event loop, use aclose otherwise.
+        """
+        self._drain()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        self._handler.close()
+    def _drain(self) -> None:
+        """ Write the messages still in the queue, outside of the event loop """
+        if self._queue is None:
+            return
+        messages = list()
+        while not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+            self._queue.task_done()
+        self._writeMessages(messages)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output in a compact binary format
+# ---------------------------------------------------------
+# ./Logueur/log_binary.py
+
+""" Module log_binary
+
+Implement the BinaryLogHandler class, a handler writing the messages
+in a compact binary format, and the BinaryLogReader class, a streaming
+decoder giving back the messages of a binary log file.
+
+A binary log file start with a magic string, followed by records. Each
+record start with its length, as a varint, and its kind:
+- a topic definition (kind 0xFF), followed by the topic in utf-8. The
+topics are numbered in the order of their definition, starting at 0.
+- a message (kind = the value of its level), followed by the number of
+its topic as a varint, its creation time in microseconds since the epoch
+as a little-endian 64 bits int, and its body in utf-8.
+
+A topic is defined the first time a message use it, so each topic is
+written only once per file, and the file can be decoded as a stream.
+"""
+
+import struct
+from typing import Iterator, Optional, Union, BinaryIO
+
+from .log_level import LogLevel
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+from .log_out import FileLogHandler
+
+_MAGIC = b"LOGBIN1\n"
+_TOPIC = 0xFF
+_TIME = struct.Struct("<q")
+_LEVELS = tuple(LogLevel)
+_LEVEL_BYTES = tuple(bytes((level._value_,)) for level in LogLevel)
+
+
+def _encodeVarint(n:int) -> bytes:
+    """ Encode a positive int as a LEB128 varint """
+    if n < 0x80:
+        return bytes((n,))
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+def _decodeVarint(data:bytes, pos:int) -> tuple[int,int]:
+    """ Decode a LEB128 varint at pos, return its value and the position after it
+
+    Raise IndexError if the varint is incomplete.
+    """
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class BinaryLogHandler(FileLogHandler):
+    """ BinaryLogHandler
+
+    Handler writing the messages in a log file in the compact binary
+    format of this module, the topics being written once in the file.
+    The file is opened, buffered and flushed like with FileLogHandler,
+    the msg_fmt of the messages being ignored.
+
+    When appending to an existing binary log file, its topics are read
+    so their numbers are kept, and a ValueError is raised if the file
+    is corrupted.
+    """
+    _binary = True
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:Optional[str], action:str="abort", **kwargs) -> None:
+        """ Constructor of BinaryLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate log messages.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate log messages.
+        filename : Optional[str]
+            The name of the log file, see FileLogHandler.
+        action : str = abort
+            Flag indicating what to do if a file with the same name already
+            exist, see FileLogHandler.
+        kwargs :
+            The flush policy arguments of FileLogHandler.
+        """
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter, filename, action, **kwargs)
+        self._topics = dict() # Topic -> encoded number
+
+        # Topics of the existing file:
+        # ----------------------------
+        if self._file.tell() == 0:
+            self._file.write(_MAGIC)
+            self._file.flush()
+        else:
+            reader = BinaryLogReader(self._filename)
+            try:
+                for _ in reader:
+                    pass
+            except ValueError as error:
+                self.close()
+                raise ValueError(f"Can't append to the file '{self._filename}': {error}") from None
+            self._topics = {topic:_encodeVarint(i) for i, topic in enumerate(reader.topics)}
+            if reader.offset < self._file.tell(): # Record cut by a crash
+                self._file.truncate(reader.offset)
+
+    def _encode(self, msg:LogMessage, body:bytes, newTopics:dict) -> bytes:
+        """ Encode the message as a record, preceded by the definition of its topic if needed, the lock must be held
+
+        The topics defined are added to newTopics, and only numbered
+        in the file once their records are written (see _appendRecords).
+        """
+        topic = msg.topic.topic
+        topicId = self._topics.get(topic) or newTopics.get(topic)
+        if topicId is None:
+            topicId = newTopics[topic] = _encodeVarint(len(self._topics) + len(newTopics))
+            definition = bytes((_TOPIC,)) + topic.encode("utf-8", "replace")
+            prefix = _encodeVarint(len(definition)) + definition
+        else:
+            prefix = b""
+        length = 1 + len(topicId) + _TIME.size + len(body)
+        return b"".join((prefix, _encodeVarint(length), _LEVEL_BYTES[msg.level._value_], topicId,
+                         _TIME.pack(int(msg.time*1e6)), body))
+    def _appendRecords(self, records:bytes, msg:LogMessage, newTopics:dict) -> None:
+        """ Append the records, and keep the topics they define if they were written, the lock must be held
+
+        When the write fails, the topics aren't kept, so they are defined
+        again by the next records.
+        """
+        written = self.written
+        try:
+            self._append(records, msg)
+        finally:
+            if newTopics and self.written != written: # Written in the buffer, even if the flush failed
+                self._topics.update(newTopics)
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Append a message to the end of the log file, as a binary record """
+        body = msg.body.encode("utf-8", "replace")
+        newTopics = dict()
+        with self._lock:
+            self._appendRecords(self._encode(msg, body, newTopics), msg, newTopics)
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Append a batch of messages to the end of the log file, with a single write """
+        bodies = [msg.body.encode("utf-8", "replace") for msg in msgs]
+        newTopics = dict()
+        with self._lock:
+            records = b"".join([self._encode(msg, body, newTopics) for msg, body in zip(msgs, bodies)])
+            self._appendRecords(records, max(msgs,key=lambda msg: msg.level._value_), newTopics)
+
+
+class BinaryLogReader():
+    """ BinaryLogReader
+
+    Streaming decoder of the binary log files, reading the file by
+    chunks and giving back the messages one by one, with their level,
+    topic and creation time. A record cut at the end of the file, by
+    a crash of the writer, is ignored, and a corrupted record raises a
+    ValueError giving its offset in the file.
+    """
+
+    def __init__(self, file:Union[str,BinaryIO], chunkSize:int=1<<20) -> None:
+        """ Constructor of BinaryLogReader
+
+        Arguments:
+        file : Union[str,BinaryIO]
+            The name of the binary log file, or the file opened in binary mode.
+        chunkSize : int = 1 MiB
+            The size of the chunks read.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(file,str) and not hasattr(file,"read"):
+            raise ValueError(f"The file must be a str or a binary file, instead I've received a '{type(file)}'")
+        if not isinstance(chunkSize,int) or chunkSize <= 0:
+            raise ValueError(f"The chunkSize must be a strictly positive int, instead I've received '{chunkSize}'")
+
+        # Initialization:
+        # ---------------
+        self._file = file
+        self._chunkSize = chunkSize
+        self.topics = list()
+        self.offset = 0
+
+    def __iter__(self) -> Iterator[LogMessage]:
+        """ Iterate over the messages of the file """
+        if isinstance(self._file,str):
+            with open(self._file, "rb") as f:
+                yield from self._decode(f)
+        else:
+            yield from self._decode(self._file)
+
+    def _decode(self, f:BinaryIO) -> Iterator[LogMessage]:
+        """ Decode the records of the file, chunk by chunk
+
+        The offset attribute is the position in the file of the end
+        of the last record decoded.
+        """
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("The file isn't a binary log file")
+        topics = self.topics = list()
+        logTopics = list()
+        data = b""
+        base = self.offset = len(_MAGIC) # Position of data in the file
+        while True:
+            chunk = f.read(self._chunkSize)
+            if not chunk:
+                return
+            data += chunk
+            pos = 0
+            end = len(data)
+            while pos < end:
+
+                # Record:
+                # -------
+                try:
+                    length, start = _decodeVarint(data, pos)
+                except IndexError:
+                    break # Incomplete, in the next chunk
+                if start + length > end:
+                    break
+                if length == 0:
+                    raise ValueError(f"corrupted record at offset {base+pos}")
+                kind = data[start]
+                recordOffset = base + pos
+                pos = start + length
+
+                # Topic definition:
+                # -----------------
+                if kind == _TOPIC:
+                    topic = data[start+1:pos].decode("utf-8", "replace")
+                    topics.append(topic)
+                    logTopics.append(LogTopic._trusted(topic))
+                    self.offset = base + pos
+
+                # Message:
+                # --------
+                else:
+                    try:
+                        topicId, bodyStart = _decodeVarint(data, start+1)
+                    except IndexError:
+                        topicId = bodyStart = end
+                    if kind >= len(_LEVELS) or topicId >= len(logTopics) or bodyStart + _TIME.size > pos:
+                        raise ValueError(f"corrupted record at offset {recordOffset}")
+                    timestamp = _TIME.unpack_from(data, bodyStart)[0] / 1e6
+                    body = data[bodyStart+_TIME.size:pos].decode("utf-8", "replace")
+                    self.offset = base + pos
+                    yield LogMessage._trusted(body, _LEVELS[kind], logTopics[topicId], timestamp=timestamp)
+            base += pos
+            data = data[pos:]
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output bypassing a slow or failing handler
+# ---------------------------------------------------------
+# ./Logueur/log_breaker.py
+
+""" Module log_breaker
+
+Implement the CircuitBreakerLogHandler class, a handler measuring the
+writes of an other handler, and bypassing it when its writes are too
+slow or fail again and again, so a stalled output doesn't add its
+latency to every log call. The messages are given to a fallback handler
+while the wrapped handler is bypassed, and the wrapped handler is tried
+again periodically:
+
+    log = Logueur([CircuitBreakerLogHandler(FileLogHandler(...), fallback=ConsoleLogHandler(...))])
+"""
+
+import sys
+import threading
+from time import monotonic as _monotonic
+from typing import Optional
+
+from .log_level import LogLevel
+from .log_topic import LogTopic
+from .log_message import LogMessage
+from .log_out import BaseLogHandler, WrapperLogHandler
+
+# Weight of the last write in the average latency
+_LATENCY_WEIGHT = 0.1
+
+
+class CircuitBreakerLogHandler(WrapperLogHandler):
+    """ CircuitBreakerLogHandler
+
+    Handler giving the messages to the wrapped handler while its writes
+    succeed, the circuit being closed. A write raising an exception or
+    slower than maxLatency seconds is a failure, and after maxFailures
+    consecutive failures, the circuit trip: it's open, and the messages
+    are given to the fallback handler, or dropped and counted if there
+    is none. A message whose write raised is given to the fallback too.
+
+    When the circuit has been open for recoveryInterval seconds, the next
+    message is written with the wrapped handler as a probe, by a single
+    thread, the others using the fallback meanwhile. If the probe succeed,
+    the circuit is closed again, otherwise it stay open for an other
+    recoveryInterval seconds.
+
+    The trips and the recoveries are reported by a WARNING and an INFO
+    message, under the 'Logueur.breaker' topic, given to the fallback, or
+    to stderr if there is none, and to the wrapped handler for the
+    recoveries. The exceptions of the writes aren't raised, but counted in
+    errors, the last one being in the report of the trip. The average
+    latency of the writes of the wrapped handler is in latency.
+    """
+
+    def __init__(self, handler:BaseLogHandler, fallback:Optional[BaseLogHandler]=None,
+                 maxLatency:float=0.1, maxFailures:int=5, recoveryInterval:float=30.0) -> None:
+        """ Constructor of CircuitBreakerLogHandler
+
+        Arguments:
+        handler : BaseLogHandler
+            The handler writing the messages.
+        fallback : Optional[BaseLogHandler]
+            The handler writing the messages while the circuit is open,
+            filtrating them by its level and topic filter. None to drop them.
+        maxLatency : float = 0.1
+            The maximal duration of a write, in seconds, a batch being
+            allowed this duration for each of its messages.
+        maxFailures : int = 5
+            The number of consecutive failures tripping the circuit.
+        recoveryInterval : float = 30.0
+            The time between two probes of the wrapped handler, in seconds.
+        """
+
+        # Type Check:
+        # -----------
+        if fallback is not None and not isinstance(fallback,BaseLogHandler):
+            raise ValueError(f"The fallback must be a BaseLogHandler, instead I've received a '{type(fallback)}'")
+        if not isinstance(maxLatency,(int,float)) or maxLatency <= 0:
+            raise ValueError(f"The maxLatency must be a strictly positive number, instead I've received '{maxLatency}'")
+        if not isinstance(maxFailures,int) or maxFailures <= 0:
+            raise ValueError(f"The maxFailures must be a strictly positive int, instead I've received '{maxFailures}'")
+        if not isinstance(recoveryInterval,(int,float)) or recoveryInterval < 0:
+            raise ValueError(f"The recoveryInterval must be a positive number, instead I've received '{recoveryInterval}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(handler)
+        self._fallback = fallback
+        self._maxLatency = maxLatency
+        self._maxFailures = maxFailures
+        self._recoveryInterval = recoveryInterval
+        self._lock = threading.Lock()
+        self._open = False
+        self._openTime = 0.0
+        self._probing = False
+        self._failures = 0 # Consecutive failures
+        self._lastError = None
+        self.latency = 0.0
+        self.errors = 0
+        self.slow = 0
+        self.dropped = 0
+        self.trips = 0
+        self.recoveries = 0
+
+    @property
+    def fallback(self) -> Optional[BaseLogHandler]:
+        """ The handler writing the messages while the circuit is open """
+        return self._fallback
+    @property
+    def state(self) -> str:
+        """ The state of the circuit, 'closed' or 'open' """
+        return "open" if self._open else "closed"
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Write the message with the wrapped handler, or with the fallback if the circuit is open """
+        self._send([msg], False)
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Write the messages with the wrapped handler, or with the fallback if the circuit is open """
+        self._send(msgs, True)
+
+    def _send(self, msgs:list[LogMessage], batch:bool) -> None:
+        """ Write the messages, measuring the write of the wrapped handler """
+
+        # Bypass the handler:
+        # -------------------
+        probe = False
+        if self._open:
+            with self._lock:
+                if self._probing or _monotonic() - self._openTime < self._recoveryInterval:
+                    self._bypass(msgs)
+                    return
+                self._probing = probe = True
+
+        # Write with the handler:
+        # -----------------------
+        start = _monotonic()
+        try:
+            if batch:
+                self._handler._writeBatch(msgs)
+            else:
+                self._handler._write(msgs[0])
+        except Exception as error:
+            self.errors += 1
+            self._lastError = error
+            self._failed(probe)
+            self._bypass(msgs)
+            return
+        latency = _monotonic() - start
+        self.latency += (latency - self.latency) * _LATENCY_WEIGHT
+        if latency > self._maxLatency * len(msgs):
+            self.slow += 1
+            self._failed(probe)
+        elif probe:
+            self._recover()
+        else:
+            self._failures = 0
+
+    def _bypass(self, msgs:list[LogMessage]) -> None:
+        """ Give the messages to the fallback, or drop them """
+        if self._fallback is None:
+            self.dropped += len(msgs)
+        else:
+            self._fallback.emit_batch(msgs)
+
+    def _failed(self, probe:bool) -> None:
+        """ Count a failure, and trip the circuit if needed """
+        with self._lock:
+            self._failures += 1
+            if probe:
+                self._probing = False
+                self._openTime = _monotonic()
+                return
+            if self._open or self._failures < self._maxFailures:
+                return
+            self._open = True
+            self._openTime = _monotonic()
+            self.trips += 1
+        error = f", last error: {self._lastError!r}" if self._lastError is not None else ""
+        self._report(LogLevel.WARNING, f"{type(self._handler).__name__} bypassed after {self._failures} "
+                                       f"slow or failed writes, average latency {self.latency*1000:.1f}ms{error}")
+
+    def _recover(self) -> None:
+        """ Close the circuit after a successful probe """
+        with self._lock:
+            self._open = False
+            self._probing = False
+            self._failures = 0
+            self._lastError = None
+            self.recoveries += 1
+        report = self._report(LogLevel.INFO, f"{type(self._handler).__name__} recovered, writing the messages again")
+        try:
+            self._handler.emit(report)
+        except Exception:
+            pass # The next writes will trip the circuit again
+
+    def _report(self, level:LogLevel, body:str) -> LogMessage:
+        """ Report a trip or a recovery to the fallback, or to stderr """
+        report = LogMessage._trusted(body, level, LogTopic._trusted("Logueur.breaker"))
+        if self._fallback is not None:
+            self._fallback.emit(report)
+        else:
+            sys.stderr.write(str(report))
+        return report
+
+    def flush(self) -> None:
+        """ Flush the wrapped handler and the fallback """
+        try:
+            self._handler.flush()
+        finally:
+            if self._fallback is not None:
+                self._fallback.flush()
+    def close(self) -> None:
+        """ Close the wrapped handler and the fallback """
+        try:
+            self._handler.close()
+        finally:
+            if self._fallback is not None:
+                self._fallback.close()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output coalescing the duplicated messages
+# ---------------------------------------------------------
+# ./Logueur/log_coalesce.py
+
+""" Module log_coalesce
+
+Implement the CoalescingLogHandler class, a handler suppressing the
+duplicates of a message, with the same level, topic and body, and
+giving to an other handler the first message and one aggregated message
+counting the duplicates, like the 'last message repeated N times' of
+syslog. The writing is reduced when a loop log the same message again
+and again.
+"""
+
+import time
+import threading
+from typing import Optional
+
+from .log_message import LogMessage
+from .log_out import BaseLogHandler, WrapperLogHandler, _startTimer
+
+# Maximal number of messages whose duplicates are counted in the windowed mode
+_MAX_RUNS = 1024
+
+
+class CoalescingLogHandler(WrapperLogHandler):
+    """ CoalescingLogHandler
+
+    Handler suppressing the duplicated messages before giving them to
+    the wrapped handler. Two messages are duplicates if they have the
+    same level, topic and rendered body, compared by hash.
+
+    Without window, the consecutive duplicates are coalesced: the first
+    message is written, and when a different message arrive, the run of
+    duplicates end with an aggregated message. With a window in seconds,
+    the duplicates of a message written less than window seconds before
+    are coalesced, even if other messages were written in between. The
+    aggregated message is written when the window expire, by a timer
+    thread, or when the duplicate arriving after the window start a
+    new one.
+
+    The aggregated message has the level and topic of the duplicates, the
+    body of the duplicates followed by the count and the time span, and
+    the 'repeated' and 'span' fields. The aggregated messages waiting are
+    written when the handler is flushed or closed. The times are the
+    creation times of the messages, the timer following the creation
+    time of the last message.
+    """
+
+    def __init__(self, handler:BaseLogHandler, window:Optional[float]=None) -> None:
+        """ Constructor of CoalescingLogHandler
+
+        Arguments:
+        handler : BaseLogHandler
+            The handler writing the messages.
+        window : Optional[float]
+            The duration of the window in seconds, None for coalescing
+            only the consecutive duplicates.
+        """
+
+        # Type Check:
+        # -----------
+        if window is not None and (not isinstance(window,(int,float)) or window <= 0):
+            raise ValueError(f"The window must be a strictly positive number, instead I've received '{window}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(handler)
+        self._window = window
+        self._runs = dict() # (level, topic, body) -> [first message, duplicates, time of the last duplicate]
+        self._expiry = None # Time the oldest window expire, in the windowed mode
+        self._clock = (0.0, 0.0) # Creation time of the last message, and monotonic time of its coalescing
+        self._timer = None # Expiry of the windows
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    @staticmethod
+    def _aggregate(msg:LogMessage, count:int, last:float) -> LogMessage:
+        """ The aggregated message of count duplicates of a message """
+        span = last - msg.time
+        fields = dict(msg.fields) if msg.fields else dict()
+        fields["repeated"] = count
+        fields["span"] = span
+        return LogMessage._trusted(f"{msg.body} (repeated {count} times in {span:.3f}s)", msg.level, msg.topic,
+                                   msg._fmt, timestamp=last, fields=fields)
+
+    def _coalesce(self, msg:LogMessage, out:list[LogMessage]) -> None:
+        """ Add to out the messages to write for a message, the lock must be held """
+        key = (msg.level._value_, msg.topic.topic, msg.body)
+        runs = self._runs
+        window = self._window
+        now = msg.time
+
+        # Consecutive duplicates:
+        # -----------------------
+        if window is None:
+            run = runs.get(key)
+            if run is not None:
+                run[1] += 1
+                run[2] = now
+                self.coalesced += 1
+                return
+            self._end(out)
+            runs[key] = [msg, 0, now]
+            out.append(msg)
+            return
+
+        # Windowed duplicates:
+        # --------------------
+        self._clock = (now, time.monotonic())
+        if self._expiry is not None and now >= self._expiry:
+            self._expire(now, out)
+        run = runs.get(key)
+        if run is not None and now - run[0].time < window:
+            run[1] += 1
+            run[2] = now
+            self.coalesced += 1
+            return
+        if run is not None:
+            del runs[key]
+            if run[1]:
+                out.append(self._aggregate(*run))
+        elif len(runs) >= _MAX_RUNS:
+            self._end(out)
+        runs[key] = [msg, 0, now]
+        if self._expiry is None or now + window < self._expiry:
+            self._expiry = now + window
+        if self._timer is None:
+            self._timer = _startTimer(self._expiry - now, "_timedExpire", self)
+        out.append(msg)
+
+    def _expire(self, now:float, out:list[LogMessage]) -> None:
+        """ End the runs whose window expired, the lock must be held """
+        window = self._window
+        expiry = None
+        for key, run in list(self._runs.items()):
+            end = run[0].time + window
+            if now >= end:
+                del self._runs[key]
+                if run[1]:
+                    out.append(self._aggregate(*run))
+            elif expiry is None or end < expiry:
+                expiry = end
+        self._expiry = expiry
+
+    def _timedExpire(self) -> None:
+        """ Write the aggregated messages of the expired windows, called by the timer """
+        out = list()
+        with self._lock:
+            self._timer = None
+            if self._expiry is None:
+                return
+            last, then = self._clock
+            now = last + time.monotonic() - then
+            self._expire(now, out)
+            if self._expiry is not None:
+                self._timer = _startTimer(max(self._expiry - now, 0.0), "_timedExpire", self)
+            if out:
+                self._writeIsolated(out)
+
+    def _end(self, out:list[LogMessage]) -> None:
+        """ End all the runs, the lock must be held """
+        for run in self._runs.values():
+            if run[1]:
+                out.append(self._aggregate(*run))
+        self._runs.clear()
+        self._expiry = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Give the message to the wrapped handler, if it isn't a duplicate """
+        out = list()
+        with self._lock:
+            self._coalesce(msg, out)
+            if len(out) == 1:
+                self._handler._write(out[0])
+            elif out:
+                self._handler._writeBatch(out)
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Give the messages which aren't duplicates to the wrapped handler """
+        out = list()
+        with self._lock:
+            for msg in msgs:
+                self._coalesce(msg, out)
+            if out:
+                self._handler._writeBatch(out)
+
+    def flush(self) -> None:
+        """ Write the aggregated messages waiting, and flush the wrapped handler """
+        out = list()
+        with self._lock:
+            self._end(out)
+            if out:
+                self._handler._writeBatch(out)
+        self._handler.flush()
+    def close(self) -> None:
+        """ Write the aggregated messages waiting, and close the wrapped handler """
+        out = list()
+        with self._lock:
+            self._end(out)
+            if out:
+                self._handler._writeBatch(out)
+        self._handler.close()
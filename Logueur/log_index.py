@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Offset index of the log files
+# ---------------------------------------------------------
+# ./Logueur/log_index.py
+
+""" Module log_index
+
+Implement the LogIndex class, an index of the records of a text log
+file, and the IndexedFileLogHandler class, a file handler building the
+index of its log file while writing it. The queryLog function use the
+index to read only the records matching a level, a topic filter and
+a time range, seeking directly to them.
+
+The index is kept in a sidecar file, 'filename.idx', made of blocks.
+Each block is a JSON line giving the level, the topic and the time
+bucket of its records, and their number N, followed by N offsets in
+the log file (little-endian 64 bits int), N lengths (32 bits int) and
+N creation times (64 bits float, NaN if unknown). The blocks are only
+appended to the sidecar, so a handler can save its index incrementally.
+Each save end with a JSON line giving the offset in the log file up to
+which the records are indexed, and the inode of the log file, so the
+records appended since can be indexed, and a rotated or truncated log
+file is indexed again.
+"""
+
+import re
+import os
+import sys
+import json
+import math
+from array import array
+from typing import Iterator, Optional, Union
+
+from .log_level import LogLevel, _VALUES
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+from .log_out import FileLogHandler
+from .log_reader import _LEVELS, _parseRecord
+
+_MAGIC = b"LOGIDX1\n"
+_HEADER = re.compile(rb"\[(" + b"|".join(name.encode() for name in _LEVELS) + rb")\] (\S*)\n")
+
+
+class _Block():
+    """ The records of a level, a topic and a time bucket """
+    __slots__ = ("offsets","lengths","times")
+    def __init__(self) -> None:
+        self.offsets = array("q")
+        self.lengths = array("i")
+        self.times = array("d")
+
+
+class LogIndex():
+    """ LogIndex
+
+    Index of the records of a text log file, written with the default
+    format of the messages: the offsets and the lengths of the records
+    are grouped by level, topic and time bucket of bucketSize seconds.
+    The records whose creation time is unknown, when the index is built
+    from an existing log file, are in a bucket of their own.
+    """
+
+    def __init__(self, bucketSize:float=60) -> None:
+        """ Constructor of LogIndex
+
+        Arguments:
+        bucketSize : float = 60
+            The duration of the time buckets, in seconds.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(bucketSize,(int,float)) or bucketSize <= 0:
+            raise ValueError(f"The bucketSize must be a strictly positive number, instead I've received '{bucketSize}'")
+
+        # Initialization:
+        # ---------------
+        self._bucketSize = bucketSize
+        self._blocks = dict() # (level, topic, bucket) -> _Block
+        self._count = 0
+        self.end = None # Offset of the end of the records indexed in the log file, None if unknown
+        self.inode = None # Inode of the log file
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, level:int, topic:str, time:float, offset:int, length:int) -> None:
+        """ Add a record to the index
+
+        Arguments:
+        level : int
+            The value of the level of the record.
+        topic : str
+            The topic of the record.
+        time : float
+            The creation time of the record, NaN if unknown.
+        offset : int
+            The offset of the record in the log file, in bytes.
+        length : int
+            The length of the record, in bytes.
+        """
+        bucket = None if time != time else int(time // self._bucketSize * self._bucketSize)
+        key = (level, topic, bucket)
+        block = self._blocks.get(key)
+        if block is None:
+            block = self._blocks[key] = _Block()
+        block.offsets.append(offset)
+        block.lengths.append(length)
+        block.times.append(time)
+        self._count += 1
+
+    def clear(self) -> None:
+        """ Remove all of the records of the index """
+        self._blocks.clear()
+        self._count = 0
+
+    def save(self, indexFile:str, append:bool=False) -> None:
+        """ Write the index in a sidecar file
+
+        Arguments:
+        indexFile : str
+            The name of the sidecar file.
+        append : bool = False
+            Append the blocks to the sidecar file, instead of overwriting it.
+        """
+        new = not append or not os.path.isfile(indexFile) or os.path.getsize(indexFile) == 0
+        with open(indexFile, "wb" if new else "ab") as f:
+            if new:
+                f.write(_MAGIC)
+            for (level, topic, bucket), block in self._blocks.items():
+                header = {"level":level, "topic":topic, "bucket":bucket,
+                          "bucketSize":self._bucketSize, "count":len(block.offsets)}
+                f.write(json.dumps(header, separators=(",",":")).encode("utf-8") + b"\n")
+                for values in (block.offsets, block.lengths, block.times):
+                    if sys.byteorder == "big":
+                        values = array(values.typecode, values)
+                        values.byteswap()
+                    f.write(values.tobytes())
+            state = {"count":0, "end":self.end, "inode":self.inode}
+            f.write(json.dumps(state, separators=(",",":")).encode("utf-8") + b"\n")
+
+    @classmethod
+    def load(cls, indexFile:str) -> 'LogIndex':
+        """ Read an index from its sidecar file
+
+        Arguments:
+        indexFile : str
+            The name of the sidecar file.
+        """
+        index = cls()
+        with open(indexFile, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"The file {indexFile} isn't a log index")
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    return index # End of the file, or block cut by a crash
+                header = json.loads(line)
+                if "end" in header: # End of a save
+                    index.end, index.inode = header["end"], header["inode"]
+                    continue
+                count = header["count"]
+                data = f.read(count * 20)
+                if len(data) != count * 20:
+                    return index
+                key = (header["level"], header["topic"], header["bucket"])
+                index._bucketSize = header["bucketSize"]
+                block = index._blocks.get(key)
+                if block is None:
+                    block = index._blocks[key] = _Block()
+                for values, part in ((block.offsets, data[:count*8]), (block.lengths, data[count*8:count*12]),
+                                     (block.times, data[count*12:])):
+                    part = array(values.typecode, part)
+                    if sys.byteorder == "big":
+                        part.byteswap()
+                    values.extend(part)
+                index._count += count
+
+    def _extend(self, other:'LogIndex') -> None:
+        """ Add the records of an other index, indexing the following part of the log file """
+        for key, block in other._blocks.items():
+            mine = self._blocks.get(key)
+            if mine is None:
+                mine = self._blocks[key] = _Block()
+            mine.offsets.extend(block.offsets)
+            mine.lengths.extend(block.lengths)
+            mine.times.extend(block.times)
+        self._count += other._count
+        self.end, self.inode = other.end, other.inode
+
+    @classmethod
+    def build(cls, filename:str, chunkSize:int=1<<20, offset:int=0) -> 'LogIndex':
+        """ Build the index of an existing log file, written with the default format
+
+        The records start with a line '[LEVEL] topic', at the start of the
+        file or after an empty line. Their creation time is unknown.
+
+        Arguments:
+        filename : str
+            The name of the log file.
+        chunkSize : int = 1 MiB
+            The size of the chunks read.
+        offset : int = 0
+            The offset where the indexing start, the start of a record.
+        """
+        index = cls()
+        nan = math.nan
+        current = None # (level, topic, offset) of the record being read
+        previous = b"\n"
+        with open(filename, "rb", buffering=chunkSize) as f:
+            index.inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                if previous == b"\n" and (header := _HEADER.fullmatch(line)):
+                    if current is not None:
+                        index.add(current[0], current[1], nan, current[2], offset - current[2])
+                    current = (_LEVELS[header.group(1).decode()]._value_, header.group(2).decode("utf-8","replace"), offset)
+                offset += len(line)
+                previous = line
+        if current is not None:
+            index.add(current[0], current[1], nan, current[2], offset - current[2])
+        index.end = offset
+        return index
+
+    def search(self, level:Union[LogLevel,int,str]=LogLevel.DEBUG, filter:Optional[LogTopicFilter]=None,
+               start:Optional[float]=None, end:Optional[float]=None) -> list[tuple[int,int,float]]:
+        """ The records matching a level, a topic filter and a time range
+
+        Arguments:
+        level : Union[LogLevel,int,str] = DEBUG
+            The records at least as critical as this level are matched.
+        filter : Optional[LogTopicFilter]
+            The records whose topic match this filter are matched, all if None.
+        start : Optional[float]
+            The records created at or after this time are matched.
+        end : Optional[float]
+            The records created before this time are matched.
+
+        Return:
+        list[tuple[int,int,float]]
+            The offsets, lengths and creation times of the matching records,
+            sorted by offset.
+        """
+        if isinstance(level,LogLevel):
+            minLevel = level._value_
+        else:
+            minLevel = _VALUES.get(level) if isinstance(level,(int,str)) else None
+        if minLevel is None:
+            raise ValueError(f"The level must be a LogLevel, or the value or the name of one, instead I've received '{level}'")
+        if filter is not None and not isinstance(filter,LogTopicFilter):
+            raise ValueError(f"The filter must be a LogTopicFilter, instead I've received a '{type(filter)}'")
+        timed = start is not None or end is not None
+        start = -math.inf if start is None else start
+        end = math.inf if end is None else end
+
+        topics = dict() # Topic -> match, the filter is applied once per topic
+        records = list()
+        for (lvl, topic, bucket), block in self._blocks.items():
+
+            # Select the block:
+            # -----------------
+            if lvl < minLevel:
+                continue
+            if timed and (bucket is None or bucket + self._bucketSize <= start or bucket >= end):
+                continue
+            if filter is not None:
+                match = topics.get(topic)
+                if match is None:
+                    match = topics[topic] = filter.match(LogTopic._trusted(topic))
+                if not match:
+                    continue
+
+            # Select the records:
+            # -------------------
+            if timed:
+                records.extend(record for record in zip(block.offsets, block.lengths, block.times)
+                               if start <= record[2] < end)
+            else:
+                records.extend(zip(block.offsets, block.lengths, block.times))
+        records.sort()
+        return records
+
+
+def _updateIndex(filename:str, indexFile:str) -> LogIndex:
+    """ Load the index of a log file, indexing the records appended since it was saved """
+    stat = os.stat(filename)
+    if os.path.isfile(indexFile):
+        index = LogIndex.load(indexFile)
+        if index.end is not None and index.inode == stat.st_ino and index.end <= stat.st_size:
+            if index.end < stat.st_size:
+                tail = LogIndex.build(filename, offset=index.end)
+                tail.save(indexFile, append=True)
+                index._extend(tail)
+            return index
+    index = LogIndex.build(filename)
+    index.save(indexFile)
+    return index
+
+def queryLog(filename:str, level:Union[LogLevel,int,str]=LogLevel.DEBUG, filter:Optional[LogTopicFilter]=None,
+          start:Optional[float]=None, end:Optional[float]=None, indexFile:Optional[str]=None) -> Iterator[LogMessage]:
+    """ Read the messages of a log file matching a level, a topic filter and a time range
+
+    Only the matching records are read, by seeking to their offset in
+    the log file. If the sidecar file of the index doesn't exist, the
+    index is built and saved first. The records appended to the log file
+    since the index was saved are indexed and saved, and the index is
+    built again if the log file was rotated or truncated.
+
+    Arguments:
+    filename : str
+        The name of the log file.
+    level : Union[LogLevel,int,str] = DEBUG
+        The messages at least as critical as this level are read.
+    filter : Optional[LogTopicFilter]
+        The messages whose topic match this filter are read, all if None.
+    start : Optional[float]
+        The messages created at or after this time are read.
+    end : Optional[float]
+        The messages created before this time are read.
+    indexFile : Optional[str]
+        The name of the sidecar file of the index, 'filename.idx' if None.
+
+    Return:
+    Iterator[LogMessage]
+        The matching messages, in the order of the log file.
+    """
+    index = _updateIndex(filename, indexFile or filename + ".idx")
+    with open(filename, "rb") as f:
+        for offset, length, time in index.search(level, filter, start, end):
+            f.seek(offset)
+            data = f.read(length)
+            if len(data) != length:
+                return # Record not written yet
+            record = data.decode("utf-8", "replace")
+            timestamp = None if time != time else time
+            msg = _parseRecord(record, timestamp)
+            yield msg if msg is not None else LogMessage._trusted(record, LogLevel.DEBUG, LogTopic._trusted(""), timestamp=timestamp)
+
+
+class IndexedFileLogHandler(FileLogHandler):
+    """ IndexedFileLogHandler
+
+    Handler writing the messages in a log file, like FileLogHandler,
+    and indexing them at the same time, with their creation time. The
+    new part of the index is appended to the sidecar file when the
+    handler is flushed or closed, and every indexBlock messages.
+
+    When appending to an existing log file, the index of the records not
+    indexed in its sidecar file is built first.
+    """
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:Optional[str], action:str="abort",
+                 bucketSize:float=60, indexBlock:int=4096, **kwargs) -> None:
+        """ Constructor of IndexedFileLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate log messages.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate log messages.
+        filename : Optional[str]
+            The name of the log file, see FileLogHandler.
+        action : str = abort
+            Flag indicating what to do if a file with the same name already
+            exist, see FileLogHandler.
+        bucketSize : float = 60
+            The duration of the time buckets of the index, in seconds.
+        indexBlock : int = 4096
+            The number of messages indexed before saving the index.
+        kwargs :
+            The flush policy arguments of FileLogHandler.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(indexBlock,int) or indexBlock <= 0:
+            raise ValueError(f"The indexBlock must be a strictly positive int, instead I've received '{indexBlock}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter, filename, action, **kwargs)
+        self._index = LogIndex(bucketSize)
+        self._indexFile = self._filename + ".idx"
+        self._indexBlock = indexBlock
+        self._offset = os.path.getsize(self._filename)
+
+        # Sidecar file:
+        # -------------
+        self._index.inode = os.fstat(self._file.fileno()).st_ino
+        if not "a" in self._file.mode:
+            self._index.end = 0
+            self._index.save(self._indexFile)
+        else:
+            _updateIndex(self._filename, self._indexFile)
+
+    def _append(self, msg_str:str, msg:LogMessage) -> None:
+        """ Index the message, then write it, the lock must be held """
+        length = len(msg_str) if msg_str.isascii() else len(msg_str.encode("utf-8"))
+        self._index.add(msg.level._value_, msg.topic.topic, msg.time, self._offset, length)
+        self._offset += length
+        super()._append(msg_str, msg)
+        if len(self._index) >= self._indexBlock:
+            self._saveIndex()
+
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Index a batch of messages, then write them with a single write """
+        format = self._format
+        msg_strs = [format(msg) for msg in msgs]
+        with self._lock:
+            for msg_str, msg in zip(msg_strs, msgs):
+                length = len(msg_str) if msg_str.isascii() else len(msg_str.encode("utf-8"))
+                self._index.add(msg.level._value_, msg.topic.topic, msg.time, self._offset, length)
+                self._offset += length
+            FileLogHandler._append(self, "".join(msg_strs), max(msgs,key=lambda msg: msg.level._value_))
+            if len(self._index) >= self._indexBlock:
+                self._saveIndex()
+
+    def _saveIndex(self) -> None:
+        """ Flush the log file and append the new part of the index to the sidecar file, the lock must be held """
+        self._flush()
+        self._index.end = self._offset
+        self._index.save(self._indexFile, append=True)
+        self._index.clear()
+
+    def flush(self) -> None:
+        """ Flush the buffer to the log file, and save the index """
+        with self._lock:
+            if not self._file.closed:
+                self._saveIndex()
+    def close(self) -> None:
+        """ Flush the buffer, save the index and close the log file """
+        with self._lock:
+            if not self._file.closed:
+                self._saveIndex()
+        super().close()
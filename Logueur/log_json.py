@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output in the JSON Lines format
+# ---------------------------------------------------------
+# ./Logueur/log_json.py
+
+""" Module log_json
+
+Implement the JSONLinesLogHandler class, a handler writing each
+message as a JSON object on its own line, with its structured fields,
+so the log can be parsed by the log shipping tools.
+"""
+
+from json import JSONEncoder
+from json.encoder import encode_basestring
+from math import isfinite
+from typing import Any, Optional
+
+from .log_level import LogLevel
+from .log_topic import LogTopicFilter
+from .log_message import LogMessage
+from .log_out import FileLogHandler
+
+# Maximal number of topics whose fragments are cached
+_MAX_TOPICS = 4096
+
+
+def _finite(value:Any) -> Any:
+    """ Copy of the fields, with their non-finite floats (NaN and infinities) written as str """
+    if isinstance(value, float):
+        return value if isfinite(value) else repr(value)
+    if isinstance(value, dict):
+        return {(repr(key) if isinstance(key, float) and not isfinite(key) else key):_finite(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+class JSONLinesLogHandler(FileLogHandler):
+    """ JSONLinesLogHandler
+
+    Handler writing the messages in a log file, one JSON object per line:
+
+        {"level":"INFO","topic":"a.topic","time":1700000000.0,"body":"...","fields":{...}}
+
+    The 'fields' key is only present if the message has structured fields.
+    The values of the fields which aren't serializable in JSON are written
+    as their str, and the keys which aren't str, int, float, bool or None
+    are skipped. The non-finite floats (NaN and infinities), which aren't
+    valid JSON, are written as the str 'nan', 'inf' and '-inf'.
+
+    The start of the line, with the level and the topic, is cached for
+    each level and topic, the body is escaped by the C accelerated function
+    of the json module, and only the fields use the encoder of the handler,
+    created once. The file is opened, buffered and flushed like with
+    FileLogHandler, the msg_fmt of the messages being ignored.
+    """
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:Optional[str], action:str="abort", **kwargs) -> None:
+        """ Constructor of JSONLinesLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate log messages.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate log messages.
+        filename : Optional[str]
+            The name of the log file, see FileLogHandler.
+        action : str = abort
+            Flag indicating what to do if a file with the same name already
+            exist, see FileLogHandler.
+        kwargs :
+            The flush policy arguments of FileLogHandler.
+        """
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter, filename, action, **kwargs)
+        self._encoder = JSONEncoder(ensure_ascii=False, separators=(",",":"), skipkeys=True, allow_nan=False, default=str)
+        self._heads = tuple(dict() for _ in LogLevel) # Level -> topic -> start of the line
+
+    def _format(self, msg:LogMessage) -> str:
+        """ The JSON line of the message """
+        heads = self._heads[msg.level._value_]
+        topic = msg.topic.topic
+        head = heads.get(topic)
+        if head is None:
+            if len(heads) >= _MAX_TOPICS:
+                heads.clear()
+            head = heads[topic] = f'{{"level":"{msg.level.name}","topic":{encode_basestring(topic)},"time":'
+        if msg.fields:
+            try:
+                fields = self._encoder.encode(msg.fields)
+            except ValueError: # Non-finite float
+                fields = self._encoder.encode(_finite(msg.fields))
+            return f'{head}{msg.time!r},"body":{encode_basestring(msg.body)},"fields":{fields}}}\n'
+        return f'{head}{msg.time!r},"body":{encode_basestring(msg.body)}}}\n'
@@ -11,7 +11,7 @@ differents levels supported.
 """
 
 from enum import Enum
-from typing import Union
+from typing import Union, Optional
 
 class LogLevel(Enum):
     """ LogLevel
@@ -27,6 +27,10 @@ class LogLevel(Enum):
     part of the application to malfunction or fail.
     - FATAL   (4) :  Critical error causing the termination of the
     application.
+
+    The levels can be compared between them, or with the number or the
+    name of a level. The comparisons use the value of the levels, the
+    numbers and the names being looked up in a precomputed table.
     """
 
     DEBUG = 0
@@ -37,70 +41,66 @@ class LogLevel(Enum):
 
     # self == other
     def __eq__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-
-        return self.value == other.value
+        if other.__class__ is LogLevel:
+            return self._value_ == other._value_
+        try:
+            return self._value_ == _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ == other
     
     # self != other
     def __ne__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-        
-        return self.value != other.value
+        if other.__class__ is LogLevel:
+            return self._value_ != other._value_
+        try:
+            return self._value_ != _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ != other
     
     # self > other
     def __gt__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-        
-        return self.value > other.value
+        if other.__class__ is LogLevel:
+            return self._value_ > other._value_
+        try:
+            return self._value_ > _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ > other
     
     # self >= other
     def __ge__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-        
-        return self.value >= other.value
+        if other.__class__ is LogLevel:
+            return self._value_ >= other._value_
+        try:
+            return self._value_ >= _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ >= other
     
     # self < other
     def __lt__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-        
-        return self.value < other.value
+        if other.__class__ is LogLevel:
+            return self._value_ < other._value_
+        try:
+            return self._value_ < _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ < other
     
     # self <= other
     def __le__(self, other:Union['LogLevel',int,str]) -> bool:
-
-        if not isinstance(other,(LogLevel,int,str)):
-            return False
-        
-        if isinstance(other,(int,str)):
-            other = LogLevel.factory(other)
-        
-        return self.value <= other.value
+        if other.__class__ is LogLevel:
+            return self._value_ <= other._value_
+        try:
+            return self._value_ <= _VALUES[other]
+        except (KeyError,TypeError):
+            other = _toValue(other)
+            return other is not None and self._value_ <= other
     
+    def __hash__(self) -> int:
+        return hash(self._value_)
 
     @classmethod
     def factory(cls, level:Union[str,int]):
@@ -135,4 +135,23 @@ class LogLevel(Enum):
         if isinstance(level,int):
             return cls(level)
         
-        raise Exception(f"Something unexpected has happened !!")
\ No newline at end of file
+        raise Exception(f"Something unexpected has happened !!")
+
+
+# Values of the operands accepted by the comparisons:
+# ---------------------------------------------------
+_VALUES = dict()
+for _level in LogLevel:
+    _VALUES[_level._value_] = _level._value_
+    _VALUES[_level.name] = _level._value_
+    _VALUES[_level.name.lower()] = _level._value_
+del _level
+
+def _toValue(other:Union[LogLevel,int,str]) -> Optional[int]:
+    """
+    Get the value of a level not in the precomputed table, by using
+    LogLevel.factory. Return None if other can't be compared to a level.
+    """
+    if not isinstance(other,(LogLevel,int,str)):
+        return None
+    return LogLevel.factory(other)._value_
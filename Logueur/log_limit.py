@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Rate limiting and sampling of the log messages
+# ---------------------------------------------------------
+# ./Logueur/log_limit.py
+
+""" Module log_limit
+
+Implement the LogRateLimiter class, limiting the number of messages
+logged under the topics matching its rules, with token buckets and
+probabilistic sampling. It's given to a Logueur, which check each
+message with it before giving the message to the outputs, so the
+suppressed messages are never rendered nor written:
+
+    limiter = LogRateLimiter().add_rule("app.loop.#", rate=10, burst=50)
+    log = Logueur([ConsoleLogHandler(...)], rateLimiter=limiter)
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from random import random as _random
+from time import monotonic as _monotonic
+from typing import Optional, Union
+
+from .log_level import LogLevel
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+from .log_out import _startTimer
+
+# Maximal number of topics whose limit is cached
+_MAX_TOPICS = 4096
+# Maximal number of topics detailed in a summary
+_SUMMARY_TOPICS = 10
+
+
+class _TokenBucket():
+    """ State of a token bucket, refilled when it's checked """
+    __slots__ = ("tokens", "last")
+
+    def __init__(self, burst:float) -> None:
+        self.tokens = burst
+        self.last = _monotonic()
+
+class _TopicLimit():
+    """ Limit of a topic, from the first rule matching it
+
+    The buckets are indexed by the value of the levels, the same bucket
+    being shared by all the levels if the rule isn't per level.
+    """
+    __slots__ = ("rate", "burst", "sampling", "maxLevel", "buckets")
+
+    def __init__(self, rule:tuple) -> None:
+        _, self.rate, self.burst, self.sampling, self.maxLevel, perLevel = rule
+        if self.rate is None:
+            self.buckets = None
+        elif perLevel:
+            self.buckets = tuple(_TokenBucket(self.burst) for _ in LogLevel)
+        else:
+            self.buckets = (_TokenBucket(self.burst),) * len(LogLevel)
+
+
+class LogRateLimiter():
+    """ LogRateLimiter
+
+    Limiter of the messages logged under the topics matching its rules.
+    Each rule give a LogTopicFilter, and:
+    - a token bucket: at most burst messages at once, refilled with rate
+      messages per second;
+    - a sampling: the fraction of the messages kept, chosen randomly;
+    - a maximal level: the more critical messages are never limited.
+    The first rule matching a topic is used, the messages of the topics
+    matching no rules are never limited. The bucket is shared by all the
+    levels of a topic, or there is one bucket per level of the topic.
+
+    The rule of a topic is searched once, then cached: checking a message
+    is one dict lookup, and one clock read if its topic is limited. When
+    more than _MAX_TOPICS topics are cached, the least recently used one
+    is forgotten, with its buckets.
+
+    The number of messages suppressed for each topic is reported by a
+    summary message, created at most every summaryInterval seconds, when
+    a limited message is checked or by a timer armed when a message is
+    suppressed: the Logueurs using the limiter give it to their outputs.
+    The summary of the last messages suppressed can be created with the
+    summarize method. The messages of the summary topic are never limited.
+
+    The buckets aren't protected by a lock: when several threads log
+    under the same topic at once, a few more messages than the limit can
+    be kept. The total number of messages suppressed is in suppressed.
+    """
+
+    def __init__(self, summaryInterval:float=60.0, summaryLevel:LogLevel=LogLevel.WARNING,
+                 summaryTopic:str="Logueur.ratelimit") -> None:
+        """ Constructor of LogRateLimiter
+
+        Arguments:
+        summaryInterval : float = 60.0
+            The minimal time between two summaries, in seconds.
+        summaryLevel : LogLevel = WARNING
+            The level of the summary messages.
+        summaryTopic : str = 'Logueur.ratelimit'
+            The topic of the summary messages.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(summaryInterval,(int,float)) or summaryInterval < 0:
+            raise ValueError(f"The summaryInterval must be a positive number, instead I've received '{summaryInterval}'")
+        if not isinstance(summaryLevel,LogLevel):
+            raise ValueError(f"The summaryLevel must be a LogLevel, instead I've received a '{type(summaryLevel)}'")
+        if not isinstance(summaryTopic,str):
+            raise ValueError(f"The summaryTopic must be a str, instead I've received a '{type(summaryTopic)}'")
+
+        # Initialization:
+        # ---------------
+        self._rules = list()
+        self._limits = OrderedDict() # Topic -> _TopicLimit, None if the topic isn't limited, least recently used first
+        self._summaryInterval = summaryInterval
+        self._summaryLevel = summaryLevel
+        self._summaryTopic = LogTopic._trusted(summaryTopic)
+        self._summaryTime = _monotonic()
+        self._summary = None # Summary waiting to be logged
+        self._counts = dict() # Topic -> messages suppressed since the last summary
+        self._lock = threading.Lock()
+        self._timer = None # Timer creating the summary, armed when a message is suppressed
+        self._logueurs = weakref.WeakSet() # Logueurs logging the summaries
+        self.suppressed = 0
+
+    def add_rule(self, filter:Union[str,LogTopicFilter], rate:Optional[float]=None, burst:Optional[int]=None,
+                 sampling:float=1.0, maxLevel:Optional[LogLevel]=None, perLevel:bool=False) -> 'LogRateLimiter':
+        """ Add a rule, used for the topics matching no previous rules
+
+        Arguments:
+        filter : Union[str,LogTopicFilter]
+            The topic filter, with the '*' and '#' wildcards.
+        rate : Optional[float]
+            The number of messages allowed per second, None for no token bucket.
+        burst : Optional[int]
+            The maximal number of messages allowed at once, rate rounded
+            up (and at least 1) if None.
+        sampling : float = 1.0
+            The fraction of the messages kept, between 0 and 1.
+        maxLevel : Optional[LogLevel]
+            The most critical level limited, all the levels if None.
+        perLevel : bool = False
+            Whether each level of a topic has its own token bucket.
+
+        Return:
+        LogRateLimiter
+            The limiter, for chaining the rules.
+        """
+
+        # Type Check:
+        # -----------
+        if isinstance(filter,str):
+            filter = LogTopicFilter(filter)
+        if not isinstance(filter,LogTopicFilter):
+            raise ValueError(f"The filter must be a str or a LogTopicFilter, instead I've received a '{type(filter)}'")
+        if rate is not None and (not isinstance(rate,(int,float)) or rate <= 0):
+            raise ValueError(f"The rate must be a strictly positive number, instead I've received '{rate}'")
+        if burst is not None and (not isinstance(burst,int) or burst <= 0):
+            raise ValueError(f"The burst must be a strictly positive int, instead I've received '{burst}'")
+        if not isinstance(sampling,(int,float)) or not 0 <= sampling <= 1:
+            raise ValueError(f"The sampling must be a number between 0 and 1, instead I've received '{sampling}'")
+        if maxLevel is not None and not isinstance(maxLevel,LogLevel):
+            raise ValueError(f"The maxLevel must be a LogLevel, instead I've received a '{type(maxLevel)}'")
+        if not isinstance(perLevel,bool):
+            raise ValueError(f"The perLevel must be a bool, instead I've received a '{type(perLevel)}'")
+        if rate is not None and burst is None:
+            burst = max(1, -int(-rate // 1))
+
+        # Add the rule:
+        # -------------
+        maxLevel = maxLevel._value_ if maxLevel is not None else LogLevel.FATAL._value_
+        self._rules.append((filter, rate, burst, sampling, maxLevel, perLevel))
+        self._limits.clear()
+        return self
+
+    def _resolve(self, topic:str) -> Optional[_TopicLimit]:
+        """ Search the limit of a topic, and cache it """
+        limit = None
+        if topic != self._summaryTopic.topic:
+            logTopic = LogTopic._trusted(topic)
+            for rule in self._rules:
+                if rule[0].match(logTopic):
+                    limit = _TopicLimit(rule)
+                    break
+        if len(self._limits) >= _MAX_TOPICS:
+            self._limits.popitem(last=False)
+        self._limits[topic] = limit
+        return limit
+
+    def allow(self, msg:LogMessage) -> bool:
+        """ Check if a message is allowed, and count it if it's suppressed
+
+        Called by the Logueur before giving the message to its outputs.
+        The body of the message isn't rendered.
+        """
+        topic = msg.topic.topic
+        try:
+            limit = self._limits[topic]
+            self._limits.move_to_end(topic)
+        except KeyError:
+            limit = self._resolve(topic)
+        if limit is None:
+            return True
+        level = msg.level._value_
+        if level > limit.maxLevel:
+            return True
+
+        now = _monotonic()
+        if now - self._summaryTime >= self._summaryInterval:
+            self._summarize(now)
+
+        # Sampling:
+        # ---------
+        if limit.sampling < 1 and _random() >= limit.sampling:
+            return self._suppress(topic)
+
+        # Token bucket:
+        # -------------
+        if limit.buckets is not None:
+            bucket = limit.buckets[level]
+            tokens = bucket.tokens + (now - bucket.last) * limit.rate
+            if tokens > limit.burst:
+                tokens = limit.burst
+            bucket.last = now
+            if tokens < 1:
+                bucket.tokens = tokens
+                return self._suppress(topic)
+            bucket.tokens = tokens - 1
+        return True
+
+    def _suppress(self, topic:str) -> bool:
+        """ Count a message suppressed """
+        self._counts[topic] = self._counts.get(topic, 0) + 1
+        self.suppressed += 1
+        if self._timer is None:
+            self._armTimer()
+        return False
+
+    def _armTimer(self) -> None:
+        """ Arm the timer creating the summary when it's due """
+        with self._lock:
+            if self._timer is None:
+                delay = self._summaryInterval - (_monotonic() - self._summaryTime)
+                self._timer = _startTimer(max(delay, 0.0), "_timedSummary", self)
+
+    def _timedSummary(self) -> None:
+        """ Create the summary from the timer, and give it to the Logueurs
+
+        When a summary was created since the timer was armed, the timer
+        is armed again for the next one.
+        """
+        with self._lock:
+            self._timer = None
+        now = _monotonic()
+        if now - self._summaryTime < self._summaryInterval:
+            if self._counts:
+                self._armTimer()
+            return
+        self._summarize(now)
+        logueurs = list(self._logueurs)
+        with self._lock:
+            summary, self._summary = self._summary, None
+            if summary is None or not logueurs:
+                self._summary = summary
+                return
+        for logueur in logueurs:
+            logueur._logSummary(summary)
+
+    def _summarize(self, now:float) -> Optional[LogMessage]:
+        """ Create the summary of the messages suppressed since the last one """
+        with self._lock:
+            counts, self._counts = self._counts, dict()
+            elapsed = now - self._summaryTime
+            self._summaryTime = now
+            if not counts:
+                return None
+            total = sum(counts.values())
+            topics = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+            details = ", ".join(f"{topic} ({count})" for topic, count in topics[:_SUMMARY_TOPICS])
+            if len(topics) > _SUMMARY_TOPICS:
+                details += f" and {len(topics) - _SUMMARY_TOPICS} other topics"
+            summary = LogMessage._trusted(f"{total} messages suppressed by the rate limiter in the last {elapsed:.1f}s: {details}",
+                                          self._summaryLevel, self._summaryTopic)
+            self._summary = summary
+            return summary
+
+    def summarize(self) -> Optional[LogMessage]:
+        """ Create the summary of the messages suppressed since the last one
+
+        The summary isn't logged by the Logueur, as it's returned.
+
+        Return:
+        Optional[LogMessage]
+            The summary, None if no messages were suppressed.
+        """
+        summary = self._summarize(_monotonic())
+        self._summary = None
+        return summary
+
+    def reset(self) -> None:
+        """ Refill the token buckets and forget the messages suppressed """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self._limits.clear()
+        self._counts.clear()
+        self._summary = None
+        self.suppressed = 0
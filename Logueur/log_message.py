@@ -10,11 +10,59 @@ Implement the LogMessage class, encapsulating all of the
 relevant informations of a log message.
 """
 
-from typing import Optional
+from time import time as _time
+from string import Formatter
+from functools import partial, lru_cache
+from typing import Optional, Union, Callable
 
 from .log_level import LogLevel
 from .log_topic import LogTopic
 
+@lru_cache(maxsize=128)
+def _compileFormat(fmt:str) -> Callable[[str,str,str],str]:
+    """
+    Compile a message format into a renderer, a function
+    taking the body, the level's name and the topic, and
+    returning the formatted message.
+
+    The format is parsed once, and if it only use the fields
+    'body', 'level' and 'topic' without conversion nor format
+    spec, it is translated into a printf-style template, which
+    is faster than str.format with keyword arguments. Otherwise,
+    the renderer fall back to str.format.
+
+    The renderers are cached, so every message using the same
+    format share the same renderer.
+    """
+
+    # Parse the format:
+    # -----------------
+    template = list()
+    fields = list()
+    try:
+        for literal, field, spec, conversion in Formatter().parse(fmt):
+            template.append(literal.replace("%","%%"))
+            if field is None:
+                continue
+            if not field in ("body","level","topic") or spec or conversion:
+                raise ValueError("Not a simple field")
+            template.append("%s")
+            fields.append(field)
+    except ValueError:
+        return lambda body, level, topic: fmt.format(body=body,level=level,topic=topic)
+    
+    # Create the renderer:
+    # --------------------
+    template = "".join(template)
+    if fields == ["level","topic","body"]: # Default format
+        return lambda body, level, topic: template % (level,topic,body)
+    def render(body:str, level:str, topic:str) -> str:
+        values = {"body":body, "level":level, "topic":topic}
+        return template % tuple(values[field] for field in fields)
+    return render
+
+_new = object.__new__
+
 class LogMessage():
     """ LogMessage
 
@@ -23,8 +71,19 @@ class LogMessage():
     - It's level
     - It's topic
     - The actual message to dispay
+    - It's creation time, in seconds since the epoch
+    - Optional structured fields, a dict of key/value data
+
+    The body of the message can be given as a template with its arguments,
+    or as a callable without arguments. In this case, the body is only
+    rendered the first time it is needed, usually when a handler write
+    the message, and then kept.
+
+    The formatted message is also kept, so it is only formatted once
+    whatever the number of handlers writing it.
     """
 
+    __slots__ = ("_body","_render","level","topic","time","fields","_fmt","_str")
     _msg_fmt = "[{level}] {topic}\n{body}\n\n"
 
     @property
@@ -33,7 +92,7 @@ class LogMessage():
 
         Should at least contains '{body}'
         """
-        return self._msg_fmt
+        return self._fmt or self._msg_fmt
     @msg_fmt.setter
     def msg_fmt(self, msg_fmt:str) -> None:
         """ The string to use for formatting the log message.
@@ -45,44 +104,124 @@ class LogMessage():
             raise ValueError(f"The msg_fmt must a str, instead I've received a '{type(msg_fmt)}'")
         if not r'{body}' in msg_fmt:
             raise ValueError("The msg_fmt must at least contains {body} !")
-        self._msg_fmt = msg_fmt
+        self._fmt = msg_fmt
+        self._str = None
 
-    def __init__(self, body:str, level:LogLevel, topic:LogTopic, fmt:Optional[str]=None) -> None:
+    @property
+    def body(self) -> str:
+        """ The message to print in the log, rendered on the first access """
+        if self._body is None:
+            self._body = str(self._render())
+            self._render = None
+        return self._body
+    @body.setter
+    def body(self, body:str) -> None:
+        """ The message to print in the log """
+        if not isinstance(body,str):
+            raise ValueError(f"The body of the log message must be a str, instead I've received '{type(body)}'")
+        self._body = body
+        self._render = None
+        self._str = None
+
+    def __init__(self, body:Union[str,Callable[[],str]], level:LogLevel, topic:LogTopic, fmt:Optional[str]=None,
+                 args:tuple=(), kwargs:Optional[dict]=None, timestamp:Optional[float]=None,
+                 fields:Optional[dict]=None) -> None:
         """ Constructor of LogMessage
 
         Construct a log message.
 
         Arguments:
-        body : str
-            The message to print in the log
+        body : Union[str,Callable[[],str]]
+            The message to print in the log, a template formatted with
+            str.format(*args,**kwargs) if there is arguments, or a callable
+            without arguments returning the message.
         level : LogLevel
             The level of the message
         topic : LogTopic
             The topic of the message
         fmt : Optional[str]
             The format to use for formatting the message
+        args : tuple = ()
+            The positional arguments of the body's template
+        kwargs : Optional[dict]
+            The keyword arguments of the body's template
+        timestamp : Optional[float]
+            The creation time of the message in seconds since the epoch,
+            now if None
+        fields : Optional[dict]
+            Structured key/value data attached to the message
         """
 
         # Type Check:
         # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the log message must be a str, instead I've received '{type(body)}'")
+        if not isinstance(body,str) and not callable(body):
+            raise ValueError(f"The body of the log message must be a str or a callable, instead I've received '{type(body)}'")
+        if not isinstance(args,tuple):
+            raise ValueError(f"The args of the log message must be a tuple, instead I've received '{type(args)}'")
+        if kwargs and not isinstance(kwargs,dict):
+            raise ValueError(f"The kwargs of the log message must be a dict, instead I've received '{type(kwargs)}'")
+        if callable(body) and (args or kwargs):
+            raise ValueError("The body of the log message can't have arguments if it's a callable")
         if not isinstance(level,LogLevel):
             raise ValueError(f"The level of the log message must be a LogLevel, instead I've received '{type(level)}'")
         if not isinstance(topic,LogTopic):
             raise ValueError(f"The topic of the log message must be a LogTopic, instead I've received '{type(topic)}'")
         if fmt and not isinstance(fmt,str):
             raise ValueError(f"The format of the log message must be a str, instead I've received '{type(fmt)}'")
+        if timestamp is not None and not isinstance(timestamp,(int,float)):
+            raise ValueError(f"The timestamp of the log message must be a float, instead I've received '{type(timestamp)}'")
+        if fields is not None and not isinstance(fields,dict):
+            raise ValueError(f"The fields of the log message must be a dict, instead I've received '{type(fields)}'")
         
         # Save arguments:
         # ---------------
-        self.body = body
+        if args or kwargs:
+            self._body = None
+            self._render = partial(body.format,*args,**(kwargs or {}))
+        elif isinstance(body,str):
+            self._body = body
+            self._render = None
+        else:
+            self._body = None
+            self._render = body
         self.level = level
         self.topic = topic
-        
+        self.time = _time() if timestamp is None else timestamp
+        self.fields = fields
+        self._fmt = None
+        self._str = None
         if fmt:
             self.msg_fmt = fmt
 
+    @classmethod
+    def _trusted(cls, body:Union[str,Callable[[],str]], level:LogLevel, topic:LogTopic, fmt:Optional[str]=None,
+                 args:tuple=(), kwargs:Optional[dict]=None, timestamp:Optional[float]=None,
+                 fields:Optional[dict]=None) -> 'LogMessage':
+        """ Construct a log message without checking the arguments.
+
+        Only to be used with arguments already checked, as the Logueur
+        does in its level methods. The format must contains '{body}'.
+        """
+        msg = _new(cls)
+        if args or kwargs:
+            msg._body = None
+            msg._render = partial(body.format,*args,**(kwargs or {}))
+        elif isinstance(body,str):
+            msg._body = body
+            msg._render = None
+        else:
+            msg._body = None
+            msg._render = body
+        msg.level = level
+        msg.topic = topic
+        msg.time = _time() if timestamp is None else timestamp
+        msg.fields = fields
+        msg._fmt = fmt
+        msg._str = None
+        return msg
+
     def __str__(self) -> str:
-        """ Format the message with the formating string """
-        return self.msg_fmt.format(body=self.body,level=self.level.name,topic=self.topic.topic)
\ No newline at end of file
+        """ Format the message with the formating string, only once """
+        if self._str is None:
+            self._str = _compileFormat(self.msg_fmt)(self.body,self.level.name,self.topic.topic)
+        return self._str
\ No newline at end of file
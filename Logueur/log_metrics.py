@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Metrics of the logging
+# ---------------------------------------------------------
+# ./Logueur/log_metrics.py
+
+""" Module log_metrics
+
+Implement the LogMetrics class, measuring what the logging cost: the
+messages logged per level and topic, and for each handler the messages
+written, the messages filtered out by level and by topic, the size
+written and the latency of the writes. The metrics are available as
+a dict, or in the Prometheus text format, dumped periodically in a file:
+
+    metrics = LogMetrics().attach(log)
+    metrics.start("/var/lib/node_exporter/logueur.prom", interval=15)
+
+The Logueurs and the handlers not attached only check that they have
+no metrics, an attribute compared to None, when they log a message.
+"""
+
+import os
+import sys
+import bisect
+import threading
+import traceback
+from time import perf_counter as _perfCounter
+from typing import Optional, Union
+
+from .log_level import LogLevel
+from .log_message import LogMessage
+from .log_out import BaseLogHandler
+from .logueur import Logueur
+
+_LEVELS = tuple(level.name for level in LogLevel)
+# Upper bounds of the buckets of the latency histograms, in seconds
+_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+# Maximal number of topics counted, the messages of the other topics being counted together
+_MAX_TOPICS = 1024
+_OTHER_TOPICS = "_other"
+
+
+class _HandlerMetrics():
+    """ Metrics of a handler """
+    __slots__ = ("name", "handler", "written", "filteredLevel", "filteredTopic", "errors",
+                 "buckets", "latency", "writes")
+
+    def __init__(self, name:str, handler:BaseLogHandler) -> None:
+        self.name = name
+        self.handler = handler
+        self.written = 0 # Messages given to _write or _writeBatch
+        self.filteredLevel = 0
+        self.filteredTopic = 0
+        self.errors = 0
+        self.buckets = [0] * (len(_BUCKETS) + 1) # Writes per bucket, not cumulated
+        self.latency = 0.0 # Sum of the latencies
+        self.writes = 0
+
+    def filtered(self, msg:LogMessage) -> None:
+        """ Count a message filtered out, by level or else by topic """
+        if msg.level._value_ < self.handler.level._value_:
+            self.filteredLevel += 1
+        else:
+            self.filteredTopic += 1
+
+    def observe(self, latency:float) -> None:
+        """ Add a write to the histogram """
+        self.buckets[bisect.bisect_left(_BUCKETS, latency)] += 1
+        self.latency += latency
+        self.writes += 1
+
+    def _emit(self, handler:BaseLogHandler, msg:LogMessage) -> None:
+        """ Emit a message with a handler, measuring it """
+        if not handler._filtrate(msg):
+            self.filtered(msg)
+            return
+        start = _perfCounter()
+        try:
+            handler._write(msg)
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            self.observe(_perfCounter() - start)
+        self.written += 1
+
+    def _emitBatch(self, handler:BaseLogHandler, msgs:list[LogMessage]) -> None:
+        """ Emit a batch of messages with a handler, measuring it """
+        filtrate = handler._filtrate
+        kept = list()
+        for msg in msgs:
+            if filtrate(msg):
+                kept.append(msg)
+            else:
+                self.filtered(msg)
+        if not kept:
+            return
+        start = _perfCounter()
+        try:
+            handler._writeBatch(kept)
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            self.observe(_perfCounter() - start)
+        self.written += len(kept)
+
+
+class LogMetrics():
+    """ LogMetrics
+
+    Metrics of the Logueurs and handlers attached to it:
+    - the messages logged by the Logueurs, per level and topic, after
+      their rate limiter. Only the first 1024 topics are counted apart,
+      the messages of the other topics being counted under '_other';
+    - for each handler, the messages written, the messages filtered out
+      by the level and by the topic filter, the writes raising an
+      exception, and the size written by the handlers counting it (the
+      written attribute of ConsoleLogHandler and FileLogHandler, in
+      bytes, the console only counting it while it's attached);
+    - for each handler, a histogram of the latency of _write, and of
+      _writeBatch for the batches.
+
+    A Logueur attached count its messages, and its handlers are attached,
+    the ones added later included. A handler attached measure its messages
+    in emit and emit_batch. Attaching instrument the Logueurs and the
+    handlers, and detaching remove the instrumentation: a Logueur or a
+    handler not attached only compare an attribute to None.
+
+    The handlers are named by their class, followed by a number when
+    several handlers have the same class, unless a name is given. The
+    counters of a handler aren't protected by a lock, like the buckets
+    of LogRateLimiter: a few writes can be missed when several threads
+    write with the same handler at once.
+    """
+
+    def __init__(self) -> None:
+        """ Constructor of LogMetrics """
+
+        # Initialization:
+        # ---------------
+        self._lock = threading.Lock()
+        self._messages = dict() # (level, topic) -> messages logged
+        self._topics = set()
+        self._handlers = dict() # Name -> _HandlerMetrics
+        self._logueurs = list()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # Instrumentation:
+    # ----------------
+    def attach(self, target:Union[Logueur,BaseLogHandler,list[BaseLogHandler]], name:Optional[str]=None) -> 'LogMetrics':
+        """ Measure a Logueur and its handlers, or handlers
+
+        Arguments:
+        target : Union[Logueur,BaseLogHandler,list[BaseLogHandler]]
+            The Logueur or the handlers to measure.
+        name : Optional[str]
+            The name of the handler in the metrics, for a single handler.
+
+        Return:
+        LogMetrics
+            The metrics, for chaining the calls.
+        """
+
+        # Type Check:
+        # -----------
+        if name is not None and not isinstance(target,BaseLogHandler):
+            raise ValueError("A name can only be given when attaching a single handler")
+        if name is not None and not isinstance(name,str):
+            raise ValueError(f"The name must be a str, instead I've received a '{type(name)}'")
+
+        # Logueur:
+        # --------
+        if isinstance(target,Logueur):
+            if target._metrics is not None and target._metrics is not self:
+                raise ValueError("The Logueur is already measured by other metrics")
+            target._metrics = self
+            if target not in self._logueurs:
+                self._logueurs.append(target)
+            return self.attach(list(target._out))
+
+        # Handlers:
+        # ---------
+        handlers = target if isinstance(target,list) else [target]
+        for i,handler in enumerate(handlers,start=1):
+            if not isinstance(handler,BaseLogHandler):
+                raise ValueError(f"Handler {i} must be a BaseLogHandler, instead I've received a '{type(handler)}'")
+        with self._lock:
+            for handler in handlers:
+                if handler._metrics is not None and self._handlers.get(handler._metrics.name) is handler._metrics:
+                    continue
+                if handler._metrics is not None:
+                    raise ValueError("The handler is already measured by other metrics")
+                previous = next((metrics for metrics in self._handlers.values() if metrics.handler is handler), None)
+                if previous is not None: # Attached again after detach
+                    handler._metrics = previous
+                    continue
+                handlerName = name or self._makeName(handler)
+                if handlerName in self._handlers:
+                    raise ValueError(f"A handler named '{handlerName}' is already measured")
+                self._handlers[handlerName] = handler._metrics = _HandlerMetrics(handlerName, handler)
+        return self
+
+    def _makeName(self, handler:BaseLogHandler) -> str:
+        """ A name for a handler, from its class """
+        name = type(handler).__name__
+        i = 1
+        while name in self._handlers:
+            i += 1
+            name = f"{type(handler).__name__}#{i}"
+        return name
+
+    def detach(self) -> None:
+        """ Remove the instrumentation of the Logueurs and handlers attached, the metrics are kept """
+        with self._lock:
+            for logueur in self._logueurs:
+                logueur._metrics = None
+            for metrics in self._handlers.values():
+                # The handler use the None of its class again
+                metrics.handler.__dict__.pop("_metrics", None)
+            self._logueurs.clear()
+
+    # Measures:
+    # ---------
+    def _count(self, msg:LogMessage) -> None:
+        """ Count a message logged by a Logueur """
+        key = (msg.level._value_, msg.topic.topic)
+        with self._lock:
+            count = self._messages.get(key)
+            if count is None:
+                if len(self._topics) >= _MAX_TOPICS and key[1] not in self._topics:
+                    key = (key[0], _OTHER_TOPICS)
+                else:
+                    self._topics.add(key[1])
+                count = self._messages.get(key, 0)
+            self._messages[key] = count + 1
+
+    # Export:
+    # -------
+    def snapshot(self) -> dict:
+        """ The current metrics
+
+        Return:
+        dict
+            {"messages": {level: {topic: count}},
+             "handlers": {name: {"written", "filtered": {"level", "topic"},
+                                 "errors", "bytes", "latency": {"buckets", "sum", "count"}}}}
+            The buckets are cumulated, as (upper bound, count) pairs, the
+            bytes are None for the handlers not counting them.
+        """
+        with self._lock:
+            messages = dict()
+            for (level, topic), count in self._messages.items():
+                messages.setdefault(_LEVELS[level], dict())[topic] = count
+            handlers = dict()
+            for name, metrics in self._handlers.items():
+                cumulated, buckets = 0, list()
+                for bound, count in zip(_BUCKETS + (float("inf"),), metrics.buckets):
+                    cumulated += count
+                    buckets.append((bound, cumulated))
+                handlers[name] = {
+                    "written": metrics.written,
+                    "filtered": {"level": metrics.filteredLevel, "topic": metrics.filteredTopic},
+                    "errors": metrics.errors,
+                    "bytes": getattr(metrics.handler, "written", None),
+                    "latency": {"buckets": buckets, "sum": metrics.latency, "count": metrics.writes},
+                }
+        return {"messages": messages, "handlers": handlers}
+
+    @staticmethod
+    def _label(value:str) -> str:
+        """ Escape the value of a Prometheus label """
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def prometheus(self) -> str:
+        """ The current metrics in the Prometheus text format """
+        snapshot = self.snapshot()
+        label = self._label
+        lines = ["# HELP logueur_messages_total Messages logged by the Logueurs.",
+                 "# TYPE logueur_messages_total counter"]
+        for level, topics in snapshot["messages"].items():
+            for topic, count in topics.items():
+                lines.append(f'logueur_messages_total{{level="{level}",topic="{label(topic)}"}} {count}')
+
+        handlers = snapshot["handlers"]
+        lines += ["# HELP logueur_handler_messages_total Messages written by the handlers.",
+                  "# TYPE logueur_handler_messages_total counter"]
+        lines += [f'logueur_handler_messages_total{{handler="{label(name)}"}} {metrics["written"]}' for name, metrics in handlers.items()]
+        lines += ["# HELP logueur_handler_filtered_total Messages filtered out by the handlers, by level or by topic.",
+                  "# TYPE logueur_handler_filtered_total counter"]
+        for name, metrics in handlers.items():
+            for reason, count in metrics["filtered"].items():
+                lines.append(f'logueur_handler_filtered_total{{handler="{label(name)}",reason="{reason}"}} {count}')
+        lines += ["# HELP logueur_handler_errors_total Writes of the handlers raising an exception.",
+                  "# TYPE logueur_handler_errors_total counter"]
+        lines += [f'logueur_handler_errors_total{{handler="{label(name)}"}} {metrics["errors"]}' for name, metrics in handlers.items()]
+        lines += ["# HELP logueur_handler_written_bytes_total Size written by the handlers.",
+                  "# TYPE logueur_handler_written_bytes_total counter"]
+        lines += [f'logueur_handler_written_bytes_total{{handler="{label(name)}"}} {metrics["bytes"]}'
+                  for name, metrics in handlers.items() if metrics["bytes"] is not None]
+        lines += ["# HELP logueur_handler_write_seconds Latency of the writes of the handlers.",
+                  "# TYPE logueur_handler_write_seconds histogram"]
+        for name, metrics in handlers.items():
+            latency = metrics["latency"]
+            for bound, count in latency["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'logueur_handler_write_seconds_bucket{{handler="{label(name)}",le="{le}"}} {count}')
+            lines.append(f'logueur_handler_write_seconds_sum{{handler="{label(name)}"}} {latency["sum"]!r}')
+            lines.append(f'logueur_handler_write_seconds_count{{handler="{label(name)}"}} {latency["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename:str) -> None:
+        """ Write the metrics in the Prometheus text format in a file
+
+        The file is replaced at once, so a reader never see it half written.
+
+        Arguments:
+        filename : str
+            The name of the file.
+        """
+        if not isinstance(filename,str):
+            raise ValueError(f"The filename must be a str, instead I've received a '{type(filename)}'")
+        tmp = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write(self.prometheus())
+        os.replace(tmp, filename)
+
+    # Periodic dump:
+    # --------------
+    def start(self, filename:str, interval:float=15.0) -> 'LogMetrics':
+        """ Dump the metrics in a file every interval seconds, from a dedicated thread
+
+        Arguments:
+        filename : str
+            The name of the file.
+        interval : float = 15.0
+            The time between two dumps, in seconds.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(filename,str):
+            raise ValueError(f"The filename must be a str, instead I've received a '{type(filename)}'")
+        if not isinstance(interval,(int,float)) or interval <= 0:
+            raise ValueError(f"The interval must be a strictly positive number, instead I've received '{interval}'")
+
+        # Start the thread:
+        # -----------------
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(filename, interval),
+                                            name=f"LogMetrics-{id(self):x}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self, filename:str, interval:float) -> None:
+        """ Loop of the thread, dumping the metrics until stopped """
+        while not self._stop.wait(interval):
+            self._dumpSafe(filename)
+        self._dumpSafe(filename)
+
+    def _dumpSafe(self, filename:str) -> None:
+        """ Dump the metrics, printing the error if it fail """
+        try:
+            self.dump(filename)
+        except Exception:
+            traceback.print_exc(file=sys.stderr)
+
+    def stop(self) -> None:
+        """ Stop the periodic dump, after a last dump """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output to a memory-mapped ring file
+# ---------------------------------------------------------
+# ./Logueur/log_mmap.py
+
+""" Module log_mmap
+
+Implement the RingLogHandler class, a handler writing the messages
+in a memory-mapped file of fixed size, used as a ring buffer: the
+newest messages overwrite the oldest ones. Writing a message is a
+copy in memory, the operating system writing the pages to the file,
+even if the program crash.
+
+The RingLogReader class read back the messages of a ring file, from
+the oldest to the newest.
+
+The file start with a header: a magic string, the capacity of the
+ring, and the head and the tail, the offsets since the creation of
+the file of the end of the newest record and of the start of the
+oldest one. Each record start with its length, its level and the
+length of its topic, followed by the topic and the body in utf-8.
+The tail is moved before a record is overwritten, and the head after
+a record is written, so the records between the tail and the head
+are always complete.
+"""
+
+import os
+import mmap
+import struct
+import threading
+from typing import Iterator
+
+from .log_level import LogLevel
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+from .log_out import BaseLogHandler
+
+# File header: magic, capacity, head and tail
+_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"LOGRING1"
+_HEAD = 16
+_TAIL = 24
+_OFFSET = struct.Struct("<Q")
+# Record header: length of the record, level and length of the topic
+_RECORD = struct.Struct("<IBH")
+_LEVELS = tuple(LogLevel)
+
+
+class RingLogHandler(BaseLogHandler):
+    """ RingLogHandler
+
+    Handler writing the messages in a memory-mapped ring file of
+    capacity bytes, overwriting the oldest messages when the ring
+    is full. The messages bigger than the ring are dropped, and
+    counted.
+
+    If the file already exist with the same capacity, the messages
+    are appended to the ring, otherwise the file is created.
+    """
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:str, capacity:int=1<<20) -> None:
+        """ Constructor of RingLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate log messages.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate log messages.
+        filename : str
+            The name of the ring file.
+        capacity : int = 1 MiB
+            The size of the ring, in bytes.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(filename,str):
+            raise ValueError(f"The filename must be a str, instead I've received a '{type(filename)}'")
+        if not isinstance(capacity,int) or capacity <= _RECORD.size:
+            raise ValueError(f"The capacity must be an int greater than {_RECORD.size}, instead I've received '{capacity}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter)
+        self._filename = filename
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+        # Open the ring:
+        # --------------
+        size = _HEADER.size + capacity
+        header = None
+        if os.path.isfile(filename) and os.path.getsize(filename) == size:
+            self._file = open(filename, "r+b")
+            header = _HEADER.unpack(self._file.read(_HEADER.size))
+            if header[0] != _MAGIC or header[1] != capacity or not 0 <= header[2] - header[3] <= capacity:
+                header = None
+        else:
+            self._file = open(filename, "w+b")
+            self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+        if header is None:
+            self._head = self._tail = 0
+            _HEADER.pack_into(self._mmap, 0, _MAGIC, capacity, 0, 0)
+        else:
+            self._head, self._tail = header[2], header[3]
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Copy the message at the head of the ring, overwriting the oldest messages if needed """
+
+        # Encode the record:
+        # ------------------
+        topic = msg.topic.topic.encode("utf-8", "replace")[:0xFFFF]
+        body = msg.body.encode("utf-8", "replace")
+        length = _RECORD.size + len(topic) + len(body)
+        if length > self._capacity:
+            self.dropped += 1
+            return
+        record = _RECORD.pack(length, msg.level._value_, len(topic)) + topic + body
+
+        with self._lock:
+
+            # Make room:
+            # ----------
+            head, tail, capacity = self._head, self._tail, self._capacity
+            if head + length - tail > capacity:
+                while head + length - tail > capacity:
+                    tail += _RECORD.unpack(self._readAt(tail, _RECORD.size))[0]
+                self._tail = tail
+                _OFFSET.pack_into(self._mmap, _TAIL, tail)
+
+            # Write the record:
+            # -----------------
+            self._writeAt(head, record)
+            self._head = head + length
+            _OFFSET.pack_into(self._mmap, _HEAD, self._head)
+
+    def _writeAt(self, offset:int, data:bytes) -> None:
+        """ Copy data at the offset of the ring, wrapping around the end """
+        pos = offset % self._capacity
+        n = min(len(data), self._capacity - pos)
+        self._mmap[_HEADER.size+pos:_HEADER.size+pos+n] = data[:n]
+        if n < len(data):
+            self._mmap[_HEADER.size:_HEADER.size+len(data)-n] = data[n:]
+    def _readAt(self, offset:int, size:int) -> bytes:
+        """ Read size bytes at the offset of the ring, wrapping around the end """
+        pos = offset % self._capacity
+        n = min(size, self._capacity - pos)
+        data = self._mmap[_HEADER.size+pos:_HEADER.size+pos+n]
+        if n < size:
+            data += self._mmap[_HEADER.size:_HEADER.size+size-n]
+        return data
+
+    def flush(self) -> None:
+        """ Write the modified pages of the ring to the file """
+        with self._lock:
+            if not self._mmap.closed:
+                self._mmap.flush()
+    def close(self) -> None:
+        """ Write the modified pages of the ring and close the file """
+        with self._lock:
+            if not self._mmap.closed:
+                self._mmap.flush()
+                self._mmap.close()
+                self._file.close()
+
+
+class RingLogReader():
+    """ RingLogReader
+
+    Read the messages of a ring file written by a RingLogHandler, from
+    the oldest to the newest. The file is read at once, so it can be
+    read while being written: the records overwritten during the read
+    are skipped, and the reading stop at the first partial or invalid
+    record.
+    """
+
+    def __init__(self, filename:str) -> None:
+        """ Constructor of RingLogReader
+
+        Arguments:
+        filename : str
+            The name of the ring file.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(filename,str):
+            raise ValueError(f"The filename must be a str, instead I've received a '{type(filename)}'")
+
+        # Initialization:
+        # ---------------
+        self._filename = filename
+
+    def __iter__(self) -> Iterator[LogMessage]:
+        """ Iterate over the messages of the ring, from the oldest to the newest """
+
+        # Read the ring:
+        # --------------
+        with open(self._filename, "rb") as f:
+            magic, capacity, head, tail = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"The file {self._filename} isn't a ring log file")
+            data = f.read(capacity)
+            f.seek(_TAIL)
+            newTail = _OFFSET.unpack(f.read(_OFFSET.size))[0] # Moved if the writer overwrote records
+        if len(data) != capacity or not 0 <= head - tail <= capacity:
+            raise ValueError(f"The ring log file {self._filename} is corrupted")
+        data = data + data # Unroll the ring, so a record never wrap around the end
+
+        # Decode the records:
+        # -------------------
+        offset = tail
+        while offset + _RECORD.size <= head:
+            pos = offset % capacity
+            length, level, topicLength = _RECORD.unpack_from(data, pos)
+            if length < _RECORD.size + topicLength or offset + length > head or level >= len(_LEVELS):
+                return # Partial record
+            if offset >= newTail:
+                start = pos + _RECORD.size
+                topic = data[start:start+topicLength].decode("utf-8", "replace")
+                body = data[start+topicLength:pos+length].decode("utf-8", "replace")
+                yield LogMessage._trusted(body, _LEVELS[level], LogTopic._trusted(topic))
+            offset += length
+
+    def replay(self, handler:BaseLogHandler) -> None:
+        """ Emit the messages of the ring to a handler, filtrated by its level and topic filter """
+        handler.emit_batch(list(self))
@@ -13,19 +13,49 @@ how a message is writted.
 
 This module also implement a log output to the console, and
 a log output to a file.
+
+The handlers can be flushed and closed, explicitly or by using 
+them as context managers.
 """
 
 import os
 import sys
+import time
+import weakref
 import warnings
 import datetime
-from typing import Optional
+import threading
+import traceback
+from typing import Optional, Union
 from abc import ABC, abstractmethod
 
 from .log_level import LogLevel
 from .log_topic import LogTopicFilter
 from .log_message import LogMessage
 
+_WARNING = LogLevel.WARNING._value_
+
+
+def _utf8Size(text:str) -> int:
+    """ The size of a text encoded in utf-8, only encoded if it isn't ascii (str.isascii is constant time) """
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+def _startTimer(interval:float, method:str, handler:object) -> threading.Timer:
+    """ Call a method of the handler after interval seconds, in a daemon thread
+
+    The timer only keep a weak reference to the handler, so it doesn't
+    delay its collection, the call being skipped if it's collected.
+    """
+    ref = weakref.ref(handler)
+    def call() -> None:
+        handler = ref()
+        if handler is not None:
+            getattr(handler, method)()
+    timer = threading.Timer(interval, call)
+    timer.daemon = True
+    timer.start()
+    return timer
+
 
 class BaseLogHandler(ABC):
     """ BaseLogOutput
@@ -33,6 +63,7 @@ class BaseLogHandler(ABC):
     Implement the interface that should be provided
     by a LogOutput class.
     """
+    _metrics = None # The LogMetrics instrumenting the handler, if any
 
     def __init__(self,level:LogLevel,filter:LogTopicFilter) -> None:
         """ Constructor of BaseLogHandler
@@ -58,15 +89,48 @@ class BaseLogHandler(ABC):
         # Initialization:
         # ---------------
         super().__init__()
+        self._logueurs = weakref.WeakSet()
         self.level = level
         self.filter = filter
 
+    @property
+    def level(self) -> LogLevel:
+        """ The level used for filtrate log messages. """
+        return self._level
+    @level.setter
+    def level(self, level:LogLevel) -> None:
+        """ The level used for filtrate log messages.
+
+        The Logueurs using this handler are notified of the change.
+        """
+        if not isinstance(level,LogLevel):
+            raise ValueError(f"The level must be a LogLevel, instead I've received a '{type(level)}'")
+        self._level = level
+        for logueur in self._logueurs:
+            logueur._updateMinLevel()
+
     @abstractmethod
     def _write(self,msg:LogMessage) -> None:
         """ 
         Abstract method that should implement how the message is emitted. 
         """
         pass
+    def _writeBatch(self,msgs:list[LogMessage]) -> None:
+        """
+        Emit a batch of messages, already filtrated. By default, each
+        message is emitted with _write, the handlers able to write a 
+        batch at once should override this method.
+
+        If the batch fail after some of its messages were written, the
+        exception raised has a '_written' attribute, the number of messages
+        written, so they aren't written again (see WrapperLogHandler).
+        """
+        for i, msg in enumerate(msgs):
+            try:
+                self._write(msg)
+            except Exception as error:
+                error._written = i
+                raise
 
     def _filtrate(self,msg:LogMessage) -> bool:
         """ Check if a message should be emited.
@@ -77,13 +141,25 @@ class BaseLogHandler(ABC):
 
         # Check level:
         # ------------
-        if msg.level < self.level:
+        if msg.level._value_ < self._level._value_:
             return False
         
         # Check topic:
         # ------------
         return self.filter.match(msg.topic)
 
+    def flush(self) -> None:
+        """ Flush the messages waiting to be written, if any """
+        pass
+    def close(self) -> None:
+        """ Flush and release the resources used by the handler """
+        self.flush()
+
+    def __enter__(self) -> 'BaseLogHandler':
+        return self
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def emit(self,msg:LogMessage) -> None:
         """ Emit a message to the log
         
@@ -104,9 +180,135 @@ class BaseLogHandler(ABC):
         
         # Emit the message:
         # -----------------
-        if self._filtrate(msg):
+        if self._metrics is not None:
+            self._metrics._emit(self, msg)
+        elif self._filtrate(msg):
             self._write(msg)
 
+    def emit_batch(self,msgs:list[LogMessage]) -> None:
+        """ Emit a batch of messages to the log
+
+        Filtrate the whole batch, and emit the messages passing
+        the filter with a single write when the handler support it.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(msgs,(list,tuple)):
+            raise ValueError(f"The messages to emit must be a list of LogMessage, instead I've received a '{type(msgs)}'")
+        for i,msg in enumerate(msgs,start=1):
+            if not isinstance(msg,LogMessage):
+                raise ValueError(f"Message {i} of the messages to emit must be a LogMessage, instead I've received a '{type(msg)}'")
+        
+        # Emit the messages:
+        # ------------------
+        if self._metrics is not None:
+            self._metrics._emitBatch(self, msgs)
+            return
+        filtrate = self._filtrate
+        msgs = [msg for msg in msgs if filtrate(msg)]
+        if msgs:
+            self._writeBatch(msgs)
+
+
+class WrapperLogHandler(BaseLogHandler):
+    """ WrapperLogHandler
+
+    Base class for the handlers changing how the messages are 
+    given to an other handler, the wrapped one. The level and 
+    the topic filter are the ones of the wrapped handler, and
+    the Logueurs using the wrapper are notified when the level 
+    of the wrapped handler change.
+    """
+
+    def __init__(self, handler:BaseLogHandler) -> None:
+        """ Constructor of WrapperLogHandler
+
+        Arguments:
+        handler : BaseLogHandler
+            The handler to wrap.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(handler,BaseLogHandler):
+            raise ValueError(f"The handler must be a BaseLogHandler, instead I've received a '{type(handler)}'")
+        
+        # Initialization:
+        # ---------------
+        self._handler = handler
+        super().__init__(handler.level, handler.filter)
+        self._logueurs = handler._logueurs
+
+    @property
+    def handler(self) -> BaseLogHandler:
+        """ The wrapped handler """
+        return self._handler
+    @property
+    def level(self) -> LogLevel:
+        """ The level used for filtrate log messages, the one of the wrapped handler. """
+        return self._handler.level
+    @level.setter
+    def level(self, level:LogLevel) -> None:
+        self._handler.level = level
+    @property
+    def filter(self) -> LogTopicFilter:
+        """ The topic filter used for filtrate log messages, the one of the wrapped handler. """
+        return self._handler.filter
+    @filter.setter
+    def filter(self, filter:LogTopicFilter) -> None:
+        self._handler.filter = filter
+
+    def _filtrate(self, msg:LogMessage) -> bool:
+        return self._handler._filtrate(msg)
+
+    def _writeIsolated(self, msgs:list[LogMessage]) -> int:
+        """ Write messages as a batch with the wrapped handler, isolating the failing ones
+
+        The bodies are rendered first, the messages whose body can't be
+        rendered being skipped. If the batch still fail, its failure is
+        counted, and the messages not written yet are written one by one,
+        so a failing message doesn't drop the others: all of them, or the
+        ones after the '_written' first messages if the exception has this
+        attribute (see BaseLogHandler._writeBatch). The tracebacks are
+        printed on stderr.
+
+        Return:
+        int
+            The number of failures.
+        """
+        errors = 0
+        rendered = list()
+        for msg in msgs:
+            try:
+                msg.body
+            except Exception:
+                errors += 1
+                traceback.print_exc(file=sys.stderr)
+            else:
+                rendered.append(msg)
+        if not rendered:
+            return errors
+        try:
+            self._handler._writeBatch(rendered)
+            return errors
+        except Exception as error:
+            errors += 1
+            traceback.print_exc(file=sys.stderr)
+            written = getattr(error, "_written", 0)
+        for msg in rendered[written:]:
+            try:
+                self._handler._write(msg)
+            except Exception:
+                errors += 1
+                traceback.print_exc(file=sys.stderr)
+        return errors
+
+    def flush(self) -> None:
+        self._handler.flush()
+    def close(self) -> None:
+        self._handler.close()
+
 
 class ConsoleLogHandler(BaseLogHandler):
     """ ConsoleLogHandler
@@ -153,6 +355,7 @@ class ConsoleLogHandler(BaseLogHandler):
         super().__init__(level,filter)
         self._supportColor = supportColor
         self._useStderr = useStderr
+        self.written = 0 # Number of bytes written, in utf-8, counted while a LogMetrics is attached
 
     def _write(self,msg:LogMessage) -> None:
         """ Emit a log message to the console.
@@ -185,21 +388,77 @@ class ConsoleLogHandler(BaseLogHandler):
 
         # Emit the message:
         # -----------------
-        if self._useStderr and msg.level >= LogLevel.WARNING:
+        if self._useStderr and msg.level._value_ >= _WARNING:
             out = sys.stderr
         else:
             out = sys.stdout
         out.write(msg_str)
         out.flush()
+        if self._metrics is not None:
+            self.written += _utf8Size(msg_str)
+
+    def _writeBatch(self,msgs:list[LogMessage]) -> None:
+        """ Emit a batch of log messages to the console.
+
+        The consecutive messages going to the same stream are 
+        written and flushed at once.
+        """
+        
+        # Group the messages by stream:
+        # -----------------------------
+        runs = list()
+        for msg in msgs:
+            if self._useStderr and msg.level._value_ >= _WARNING:
+                out = sys.stderr
+            else:
+                out = sys.stdout
+            if self._supportColor:
+                msg_str = f"{self._FG_COLORS[msg.level.name]}{msg}{self._FG_RS}"
+            else:
+                msg_str = str(msg)
+            if runs and runs[-1][0] is out:
+                runs[-1][1].append(msg_str)
+            else:
+                runs.append((out,[msg_str]))
+        
+        # Emit the messages:
+        # ------------------
+        written = 0
+        for out, msg_strs in runs:
+            msg_str = "".join(msg_strs)
+            try:
+                out.write(msg_str)
+                out.flush()
+            except Exception as error:
+                error._written = written
+                raise
+            written += len(msg_strs)
+            if self._metrics is not None:
+                self.written += _utf8Size(msg_str)
 
 class FileLogHandler(BaseLogHandler):
     """ FileLogHandler
 
     Represent the interface to write log messages to a file.
+
+    The file is opened once, when the handler is created, and the 
+    messages are written in a buffer. The buffer is flushed to the
+    file depending on the flush policy of the handler:
+    - 'message' -> after each message (default)
+    - 'bytes'   -> when flushBytes bytes are waiting in the buffer
+    - 'time'    -> flushInterval ms after the first message waiting in
+    the buffer, by a timer thread
+    - 'level'   -> only when the buffer is full
+    Whatever the policy, the buffer is flushed right away for the messages
+    at least as critical as flushLevel, and when the handler is closed.
     """
     _actions = ["overwrite","overwrite-warn","abort","append","new"]
+    _flushPolicies = ["message","bytes","time","level"]
+    _binary = False # Open the log file in binary mode, for the subclasses writing bytes
 
-    def __init__(self, level: LogLevel, filter: LogTopicFilter, filename:Optional[str], action:str="abort") -> None:
+    def __init__(self, level: LogLevel, filter: LogTopicFilter, filename:Optional[str], action:str="abort",
+                 flushPolicy:str="message", bufferSize:int=65536, flushBytes:int=65536,
+                 flushInterval:float=1000, flushLevel:Optional[LogLevel]=LogLevel.WARNING) -> None:
         """ Constructor of FileLogHandler
 
         Implement the interface needed to write log messages to a log file.
@@ -227,16 +486,39 @@ class FileLogHandler(BaseLogHandler):
             name will be generated following ISO 8601 format: log_YYYY-MM-DDT:HH:MM:SS
         action : str = abort
             Flag indicating what to do if a file with the same name already exist
+        flushPolicy : str = message
+            When to flush the buffer: 'message', 'bytes', 'time' or 'level'
+        bufferSize : int = 65536
+            The size of the write buffer, in bytes
+        flushBytes : int = 65536
+            The number of bytes waiting before a flush, with the 'bytes' policy
+        flushInterval : float = 1000
+            The maximal time between two flush in ms, with the 'time' policy
+        flushLevel : Optional[LogLevel] = WARNING
+            The messages at least as critical as this level are flushed right 
+            away. None to disable.
         """
 
         # Type Check:
         # -----------
-        if not filename and not isinstance(filename,str):
+        if filename and not isinstance(filename,str):
             raise ValueError(f"The filename must be a str, instead I've received a '{type(filename)}'")
         if not isinstance(action,str):
             raise ValueError(f"The action argument must be a str, instead I've received a '{type(action)}'")
         if not action in self._actions:
             raise ValueError(f"The action argument must be in {self._actions}, instead I've received '{action}'")
+        if not isinstance(flushPolicy,str):
+            raise ValueError(f"The flushPolicy argument must be a str, instead I've received a '{type(flushPolicy)}'")
+        if not flushPolicy in self._flushPolicies:
+            raise ValueError(f"The flushPolicy argument must be in {self._flushPolicies}, instead I've received '{flushPolicy}'")
+        if not isinstance(bufferSize,int) or bufferSize <= 0:
+            raise ValueError(f"The bufferSize argument must be a strictly positive int, instead I've received '{bufferSize}'")
+        if not isinstance(flushBytes,int) or flushBytes <= 0:
+            raise ValueError(f"The flushBytes argument must be a strictly positive int, instead I've received '{flushBytes}'")
+        if not isinstance(flushInterval,(int,float)) or flushInterval < 0:
+            raise ValueError(f"The flushInterval argument must be a positive number, instead I've received '{flushInterval}'")
+        if flushLevel is not None and not isinstance(flushLevel,LogLevel):
+            raise ValueError(f"The flushLevel argument must be a LogLevel, instead I've received a '{type(flushLevel)}'")
         
         # Initialize instance:
         # --------------------
@@ -246,25 +528,50 @@ class FileLogHandler(BaseLogHandler):
 
         # check filename :
         if action == 'overwrite':
-            with open(filename,'w'): pass
-            self._filename = filename
+            mode = 'w'
 
         elif action == 'overwrite-warn':
             if os.path.isfile(filename):
                 warnings.warn(f"The file {filename} already exist, it's contents will be erased !",ResourceWarning)
-            with open(filename,'w'): pass
-            self._filename = filename
+            mode = 'w'
         
         elif action == 'abort':
             if os.path.isfile(filename):
                 raise FileExistsError(f"The log file {filename} already exist !")
+            mode = 'w'
+
+        elif action == 'append':
+            mode = 'a'
             
         else: # action == 'new'
-            self._filename = self._makeValideFilename(filename)
-            with open(filename,'w'): pass
+            filename = self._makeValideFilename(filename)
+            mode = 'w'
+        
+        # Open the file:
+        self._filename = filename
+        self._bufferSize = bufferSize
+        if self._binary:
+            self._file = open(filename, mode+"b", buffering=bufferSize)
+        else:
+            self._file = open(filename, mode, buffering=bufferSize, encoding="utf-8")
+        self._finalizer = weakref.finalize(self, self._file.close)
+        self._lock = threading.Lock()
+
+        # Flush policy:
+        self._flushPolicy = flushPolicy
+        self._flushBytes = flushBytes
+        self._flushInterval = flushInterval / 1000
+        self._flushLevel = flushLevel._value_ if flushLevel is not None else LogLevel.FATAL._value_ + 1
+        self._pending = 0 # Number of bytes waiting in the buffer
+        self._lastFlush = time.monotonic()
+        self._timer = None # Flush of the 'time' policy
+        self.written = 0 # Number of bytes written
     
     def _write(self, msg:LogMessage) -> None:
         """ Append a message to the end of the log file.
+
+        The message is written in the buffer, which is flushed
+        depending on the flush policy.
         """
 
         # Type Check:
@@ -274,8 +581,74 @@ class FileLogHandler(BaseLogHandler):
         
         # Emit the message:
         # -----------------
-        with open(self._filename,'a') as f:
-            f.write(msg)
+        msg_str = self._format(msg)
+        with self._lock:
+            self._append(msg_str, msg)
+
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Append a batch of messages to the end of the log file, with a single write.
+
+        The buffer is flushed depending on the flush policy, as if
+        the messages were written one by one.
+        """
+        format = self._format
+        msg_str = "".join([format(msg) for msg in msgs])
+        with self._lock:
+            self._append(msg_str, max(msgs,key=lambda msg: msg.level._value_))
+    def _format(self, msg:LogMessage) -> str:
+        """ The text of the message written in the log file, its formatted string """
+        return str(msg)
+    def _append(self, msg_str:Union[str,bytes], msg:LogMessage) -> None:
+        """ Write msg_str in the buffer and apply the flush policy for msg, the lock must be held """
+        self._file.write(msg_str)
+        size = len(msg_str) if self._binary else _utf8Size(msg_str)
+        self._pending += size
+        self.written += size
+        if self._shouldFlush(msg):
+            self._flush()
+        elif self._flushPolicy == "time" and self._timer is None:
+            delay = self._lastFlush + self._flushInterval - time.monotonic()
+            self._timer = _startTimer(max(delay, 0.0), "_timedFlush", self)
+
+    def _shouldFlush(self, msg:LogMessage) -> bool:
+        """ Check if the buffer should be flushed after writing msg """
+        if msg.level._value_ >= self._flushLevel:
+            return True
+        if self._flushPolicy == "message":
+            return True
+        if self._flushPolicy == "bytes":
+            return self._pending >= self._flushBytes
+        if self._flushPolicy == "time":
+            return time.monotonic() - self._lastFlush >= self._flushInterval
+        return False # 'level'
+    def _flush(self) -> None:
+        """ Flush the buffer to the file, the lock must be held """
+        self._file.flush()
+        self._pending = 0
+        self._lastFlush = time.monotonic()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    def _timedFlush(self) -> None:
+        """ Flush the messages waiting in the buffer, called by the timer of the 'time' policy """
+        with self._lock:
+            self._timer = None
+            if self._pending and not self._file.closed:
+                self._flush()
+
+    def flush(self) -> None:
+        """ Flush the buffer to the log file """
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+    def close(self) -> None:
+        """ Flush the buffer and close the log file """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._file.close()
+        self._finalizer.detach()
     
     @staticmethod
     def _generateLogFilename() -> str:
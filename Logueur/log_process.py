@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output for multiple processes
+# ---------------------------------------------------------
+# ./Logueur/log_process.py
+
+""" Module log_process
+
+Implement the logging from several processes: in each worker process,
+a ProcessLogHandler send the messages through a multiprocessing queue,
+and in the parent process, a ProcessLogListener receive them and give
+them to the handlers writing them, so only one process write the log.
+
+The messages are sent by batches, one pickle and one write in the pipe
+of the queue for many messages. Their bodies are rendered in the worker
+process, where the arguments of the lazy bodies live.
+
+    listener = ProcessLogListener([FileLogHandler(...)]).start()
+    # In the workers:
+    log = Logueur([ProcessLogHandler(listener.queue)])
+
+The listener use a multiprocessing.SimpleQueue, whose batches are written
+in the pipe by the worker itself: unlike with a multiprocessing.Queue, the
+batch sent just before a crash isn't lost in the buffer of a feeder thread.
+"""
+
+import os
+import sys
+import weakref
+import multiprocessing
+import threading
+import traceback
+from multiprocessing.util import Finalize, register_after_fork
+from time import monotonic as _monotonic
+from typing import Optional
+
+from .log_level import LogLevel
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+from .log_out import BaseLogHandler, _startTimer
+
+_LEVELS = tuple(LogLevel)
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+# The handlers of the process, whose batch are dropped in the forked processes
+_handlers = weakref.WeakSet()
+def _afterFork() -> None:
+    for handler in list(_handlers):
+        handler._batch.clear()
+        handler._lock = threading.Lock()
+        handler._timer = None # The thread of the timer isn't in the child
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_afterFork)
+
+
+class ProcessLogHandler(BaseLogHandler):
+    """ ProcessLogHandler
+
+    Handler of the worker processes, sending the messages to the
+    ProcessLogListener of the parent process through a multiprocessing
+    queue. The messages are sent by batches of batchSize messages, or
+    when the oldest message of the batch is older than batchInterval
+    seconds, by a timer thread. The batch is also sent
+    when the handler is flushed or closed, and at the exit of the process.
+
+    A message at least as critical as flushLevel is sent right away with
+    its batch, so it isn't lost if the process crash just after it.
+
+    The values of the fields which aren't str, int, float, bool or None
+    are sent as their str. When a process is forked, the batch of the
+    handler is emptied in the child process, so the messages of the
+    parent aren't sent twice.
+    """
+
+    def __init__(self, queue, level:LogLevel=LogLevel.DEBUG, filter:LogTopicFilter=LogTopicFilter("#"),
+                 batchSize:int=100, batchInterval:float=0.1, flushLevel:Optional[LogLevel]=LogLevel.ERROR) -> None:
+        """ Constructor of ProcessLogHandler
+
+        Arguments:
+        queue : multiprocessing.SimpleQueue
+            The queue of the ProcessLogListener, its queue attribute.
+        level : LogLevel = DEBUG
+            The level used for filtrate log messages.
+        filter : LogTopicFilter = '#'
+            The topic filtrer used for filtrate log messages.
+        batchSize : int = 100
+            The maximal number of messages in a batch.
+        batchInterval : float = 0.1
+            The maximal age of a batch in seconds.
+        flushLevel : Optional[LogLevel] = ERROR
+            The messages at least as critical as this level are sent right
+            away. None to disable.
+        """
+
+        # Type Check:
+        # -----------
+        if not hasattr(queue,"put"):
+            raise ValueError(f"The queue must be a multiprocessing queue, instead I've received a '{type(queue)}'")
+        if not isinstance(batchSize,int) or batchSize <= 0:
+            raise ValueError(f"The batchSize must be a strictly positive int, instead I've received '{batchSize}'")
+        if not isinstance(batchInterval,(int,float)) or batchInterval < 0:
+            raise ValueError(f"The batchInterval must be a positive number, instead I've received '{batchInterval}'")
+        if flushLevel is not None and not isinstance(flushLevel,LogLevel):
+            raise ValueError(f"The flushLevel must be a LogLevel, instead I've received a '{type(flushLevel)}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter)
+        self._queue = queue
+        self._batchSize = batchSize
+        self._batchInterval = batchInterval
+        self._flushLevel = flushLevel._value_ if flushLevel is not None else LogLevel.FATAL._value_ + 1
+        self._batch = list()
+        self._batchTime = 0
+        self._timer = None # Sending of the batch older than batchInterval
+        self._lock = threading.Lock()
+        self._closed = False
+        _handlers.add(self)
+        self._registerFinalize()
+        # The finalizers are cleared in the processes started by multiprocessing:
+        register_after_fork(self, ProcessLogHandler._registerFinalize)
+
+    def _registerFinalize(self) -> None:
+        """ Send the last batch when the handler is deleted, or at the exit of the process
+
+        The multiprocessing workers included, before the queue is closed.
+        """
+        Finalize(self, ProcessLogHandler._sendBatch, (self._queue, self._batch), exitpriority=20)
+
+    @staticmethod
+    def _serialize(msg:LogMessage) -> tuple:
+        """ The message as a tuple of picklable values, its body rendered """
+        fields = msg.fields
+        if fields:
+            fields = {key:(value if value.__class__ in _PRIMITIVES else str(value)) for key, value in fields.items()}
+        return (msg.level._value_, msg.topic.topic, msg.body, msg.time, msg._fmt, fields)
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Add the message to the batch, and send the batch if needed """
+        record = self._serialize(msg)
+        with self._lock:
+            if self._closed:
+                raise ValueError("The ProcessLogHandler is closed")
+            batch = self._batch
+            if not batch:
+                self._batchTime = _monotonic()
+            batch.append(record)
+            if (len(batch) >= self._batchSize or record[0] >= self._flushLevel
+                or _monotonic() - self._batchTime >= self._batchInterval):
+                self._send()
+            elif self._timer is None:
+                self._timer = _startTimer(self._batchInterval, "_timedSend", self)
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Add the messages to the batch, and send the batch """
+        records = [self._serialize(msg) for msg in msgs]
+        with self._lock:
+            if self._closed:
+                raise ValueError("The ProcessLogHandler is closed")
+            self._batch.extend(records)
+            self._send()
+
+    def _send(self) -> None:
+        """ Send the batch to the listener, the lock must be held """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._sendBatch(self._queue, self._batch)
+    def _timedSend(self) -> None:
+        """ Send the batch older than batchInterval, called by the timer """
+        with self._lock:
+            self._timer = None
+            if not self._closed:
+                self._send()
+    @staticmethod
+    def _sendBatch(queue, batch:list) -> None:
+        """ Send the batch to the listener, and empty it """
+        if batch:
+            queue.put((os.getpid(), batch[:]))
+            batch.clear()
+
+    def flush(self) -> None:
+        """ Send the batch to the listener """
+        with self._lock:
+            self._send()
+    def close(self) -> None:
+        """ Send the batch to the listener, and close the handler """
+        with self._lock:
+            if self._closed:
+                return
+            self._send()
+            self._closed = True
+
+
+class ProcessLogListener():
+    """ ProcessLogListener
+
+    Listener of the parent process, receiving the messages sent by the
+    ProcessLogHandler of the worker processes, and giving them as batches
+    to its handlers, which filtrate them by level and topic. The messages
+    are received by a dedicated thread of the parent process.
+
+    The batch which can't be decoded, or whose writing fail, is dropped
+    and counted in the errors, the other batches being received normally,
+    so a worker process crashing never stop the listener. The messages of
+    a worker killed before sending its batch are lost, the flushLevel of
+    the ProcessLogHandler limiting the loss of the critical messages.
+    As with any multiprocessing queue, a worker killed while writing in
+    the queue can leave it unusable: give a timeout to stop.
+
+    When the listener is stopped, the batches waiting in the queue are
+    written before closing the handlers.
+    """
+
+    def __init__(self, handlers:list[BaseLogHandler], queue=None) -> None:
+        """ Constructor of ProcessLogListener
+
+        Arguments:
+        handlers : list[BaseLogHandler]
+            The handlers writing the messages.
+        queue : Optional[multiprocessing.SimpleQueue]
+            The queue the workers send the messages in, a new
+            multiprocessing.SimpleQueue if None.
+        """
+
+        # Type Check:
+        # -----------
+        if queue is not None and not hasattr(queue,"get"):
+            raise ValueError(f"The queue must be a multiprocessing queue, instead I've received a '{type(queue)}'")
+        if not isinstance(handlers,list):
+            raise ValueError(f"The handlers must be a list of BaseLogHandler, instead I've received a '{type(handlers)}'")
+        for i,handler in enumerate(handlers,start=1):
+            if not isinstance(handler,BaseLogHandler):
+                raise ValueError(f"Handler {i} must be a BaseLogHandler, instead I've received a '{type(handler)}'")
+
+        # Initialization:
+        # ---------------
+        self._queue = queue if queue is not None else multiprocessing.SimpleQueue()
+        self._handlers = handlers
+        self._thread = None
+        self._topics = dict() # Topic -> LogTopic, shared by the messages
+        self.received = dict() # Pid -> number of messages received
+        self.errors = 0
+
+    @property
+    def queue(self):
+        """ The queue to give to the ProcessLogHandler of the workers """
+        return self._queue
+
+    def start(self) -> 'ProcessLogListener':
+        """ Start the thread receiving the messages """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"ProcessLogListener-{id(self):x}", daemon=True)
+            self._thread.start()
+        return self
+    def __enter__(self) -> 'ProcessLogListener':
+        return self.start()
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        """ Loop of the thread, until the stop sentinel is received """
+        while True:
+            try:
+                item = self._queue.get()
+            except Exception: # Corrupted batch
+                self.errors += 1
+                traceback.print_exc(file=sys.stderr)
+                continue
+            if item is None:
+                return
+            self._dispatch(item)
+
+    def _dispatch(self, item:tuple) -> None:
+        """ Give a batch received to the handlers """
+        try:
+            pid, batch = item
+            topics = self._topics
+            msgs = list()
+            for level, topic, body, time, fmt, fields in batch:
+                logTopic = topics.get(topic)
+                if logTopic is None:
+                    logTopic = topics[topic] = LogTopic._trusted(topic)
+                msgs.append(LogMessage._trusted(body, _LEVELS[level], logTopic, fmt, timestamp=time, fields=fields))
+            self.received[pid] = self.received.get(pid, 0) + len(msgs)
+        except Exception:
+            self.errors += 1
+            traceback.print_exc(file=sys.stderr)
+            return
+        for handler in self._handlers:
+            try:
+                handler.emit_batch(msgs)
+            except Exception:
+                self.errors += 1
+                traceback.print_exc(file=sys.stderr)
+
+    def stop(self, timeout:Optional[float]=None) -> None:
+        """ Write the batches waiting in the queue, stop the thread and close the handlers
+
+        Arguments:
+        timeout : Optional[float]
+            The maximal time to wait for the thread, in seconds.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            stopped = not self._thread.is_alive()
+            self._thread = None
+        else:
+            stopped = True
+
+        # Batches sent after the sentinel:
+        # --------------------------------
+        while stopped and not self._queue.empty():
+            try:
+                item = self._queue.get()
+            except Exception:
+                self.errors += 1
+                continue
+            if item is not None:
+                self._dispatch(item)
+
+        for handler in self._handlers:
+            handler.close()
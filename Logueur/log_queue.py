@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output written by a background thread
+# ---------------------------------------------------------
+# ./Logueur/log_queue.py
+
+""" Module log_queue
+
+Implement the QueueLogHandler class, a handler giving the messages
+to an other handler through a bounded queue, the messages being
+written by a dedicated thread. The thread logging a message only
+pay for pushing it in the queue, whatever the speed of the output.
+"""
+
+import atexit
+import weakref
+import threading
+from typing import Optional
+from collections import deque
+
+from .log_level import LogLevel
+from .log_message import LogMessage
+from .log_out import BaseLogHandler, WrapperLogHandler
+
+
+# The handlers not closed yet, closed at the exit of the interpreter. The
+# references are weak, so a handler registered can still be collected.
+_openHandlers = weakref.WeakSet()
+
+@atexit.register
+def _closeAtExit() -> None:
+    """ Close the handlers not closed yet, writing the messages of their queue """
+    for handler in list(_openHandlers):
+        handler.close()
+
+
+class QueueLogHandler(WrapperLogHandler):
+    """ QueueLogHandler
+
+    Handler pushing the messages in a bounded queue, the messages being
+    emitted to the wrapped handler by a dedicated writer thread.
+
+    The messages are filtrated by the level and topic filter of the wrapped
+    handler before being pushed. When the queue is full, the overflow policy
+    specify what to do:
+    - 'block'            -> wait for a place in the queue (default)
+    - 'drop-oldest'      -> drop the oldest message of the queue
+    - 'drop-newest'      -> drop the message to push
+    - 'drop-below-level' -> drop the message to push if it's less critical
+    than dropLevel, wait for a place otherwise
+
+    The dropped messages are counted. When the handler is closed, the
+    messages in the queue are written before closing the wrapped handler.
+
+    As the messages are written by the writer thread, their lazy bodies
+    are rendered in this thread, when the message is written.
+    """
+
+    _overflows = ["block","drop-oldest","drop-newest","drop-below-level"]
+
+    def __init__(self, handler:BaseLogHandler, maxsize:int=10000, overflow:str="block",
+                 dropLevel:LogLevel=LogLevel.WARNING) -> None:
+        """ Constructor of QueueLogHandler
+
+        Start the writer thread, giving the messages to the wrapped handler.
+
+        Arguments:
+        handler : BaseLogHandler
+            The handler writing the messages.
+        maxsize : int = 10000
+            The maximal number of messages in the queue.
+        overflow : str = block
+            What to do when the queue is full: 'block', 'drop-oldest',
+            'drop-newest' or 'drop-below-level'.
+        dropLevel : LogLevel = WARNING
+            With the 'drop-below-level' policy, the messages less critical
+            than this level are dropped when the queue is full.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(maxsize,int) or maxsize <= 0:
+            raise ValueError(f"The maxsize must be a strictly positive int, instead I've received '{maxsize}'")
+        if not isinstance(overflow,str):
+            raise ValueError(f"The overflow argument must be a str, instead I've received a '{type(overflow)}'")
+        if not overflow in self._overflows:
+            raise ValueError(f"The overflow argument must be in {self._overflows}, instead I've received '{overflow}'")
+        if not isinstance(dropLevel,LogLevel):
+            raise ValueError(f"The dropLevel must be a LogLevel, instead I've received a '{type(dropLevel)}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(handler)
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._dropLevel = dropLevel._value_
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._notEmpty = threading.Condition(self._lock)
+        self._notFull = threading.Condition(self._lock)
+        self._done = threading.Condition(self._lock)
+        self._writing = 0
+        self._closed = False
+
+        self.dropped = 0
+        self.droppedByLevel = {level.name:0 for level in LogLevel}
+        self.errors = 0
+
+        # Writer thread:
+        # --------------
+        self._thread = threading.Thread(target=self._run, name=f"QueueLogHandler-{id(self):x}", daemon=True)
+        self._thread.start()
+        _openHandlers.add(self)
+
+    def _drop(self, msg:LogMessage) -> None:
+        """ Count a dropped message, the lock must be held """
+        self.dropped += 1
+        self.droppedByLevel[msg.level.name] += 1
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Push the message in the queue, for the writer thread.
+
+        If the queue is full, the overflow policy is applied.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("The QueueLogHandler is closed")
+
+            # Overflow:
+            # ---------
+            if len(self._queue) >= self._maxsize:
+                if self._overflow == "drop-newest":
+                    self._drop(msg)
+                    return
+                elif self._overflow == "drop-oldest":
+                    self._drop(self._queue.popleft())
+                elif self._overflow == "drop-below-level" and msg.level._value_ < self._dropLevel:
+                    self._drop(msg)
+                    return
+                else: # block
+                    while len(self._queue) >= self._maxsize and not self._closed:
+                        self._notFull.wait()
+                    if self._closed:
+                        raise ValueError("The QueueLogHandler is closed")
+
+            # Push the message:
+            # -----------------
+            self._queue.append(msg)
+            self._notEmpty.notify()
+
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Push the messages in the queue, for the writer thread """
+        for msg in msgs:
+            self._write(msg)
+
+    def _run(self) -> None:
+        """ Loop of the writer thread
+
+        Take all of the messages in the queue and emit them as a batch,
+        until the handler is closed and the queue is empty.
+        """
+        while True:
+
+            # Get the messages:
+            # -----------------
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._notEmpty.wait()
+                if not self._queue: # Closed
+                    return
+                messages = list(self._queue)
+                self._queue.clear()
+                self._writing = len(messages)
+                self._notFull.notify_all()
+
+            # Emit them at once, already filtrated:
+            # -------------------------------------
+            self.errors += self._writeIsolated(messages)
+
+            with self._lock:
+                self._writing = 0
+                self._done.notify_all()
+
+    def qsize(self) -> int:
+        """ The number of messages waiting in the queue """
+        return len(self._queue)
+    def stats(self) -> dict:
+        """ The number of messages waiting, dropped, and of errors of the wrapped handler """
+        with self._lock:
+            return {"queued":len(self._queue), "dropped":self.dropped,
+                    "droppedByLevel":dict(self.droppedByLevel), "errors":self.errors}
+
+    def flush(self, timeout:Optional[float]=None) -> None:
+        """ Wait for the messages in the queue to be written, then flush the wrapped handler
+
+        Arguments:
+        timeout : Optional[float]
+            The maximal time to wait for the queue, in seconds.
+        """
+        with self._lock:
+            self._done.wait_for(lambda: not self._queue and not self._writing, timeout)
+        self._handler.flush()
+    def close(self, timeout:Optional[float]=None) -> None:
+        """ Write the messages in the queue, stop the writer thread and close the wrapped handler
+
+        Arguments:
+        timeout : Optional[float]
+            The maximal time to wait for the writer thread, in seconds.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._notEmpty.notify_all()
+            self._notFull.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        _openHandlers.discard(self)
+        self._handler.close()
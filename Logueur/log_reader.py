@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Streaming reader of the text log files
+# ---------------------------------------------------------
+# ./Logueur/log_reader.py
+
+""" Module log_reader
+
+Implement the readLog generator, reading the messages of a text log
+file written with the default format, '[LEVEL] topic\\nbody\\n\\n', by
+large chunks, and the generators filtering a stream of messages by
+level and by topic, so they can be chained as a pipeline:
+
+    for msg in filterTopic(filterLevel(readLog("app.log"), LogLevel.ERROR), LogTopicFilter("app.#")):
+        ...
+
+Only one chunk and the record being read are in memory at a time,
+whatever the size of the log file.
+"""
+
+import re
+import gzip
+import lzma
+from typing import Iterable, Iterator, Optional, Union, BinaryIO
+
+from .log_level import LogLevel, _VALUES
+from .log_topic import LogTopic, LogTopicFilter
+from .log_message import LogMessage
+
+_LEVELS = {level.name:level for level in LogLevel}
+# The end of a record: an empty line followed by the first line of the next record
+_SEPARATOR = re.compile(rb"\n\n(?=\[(?:" + b"|".join(name.encode() for name in _LEVELS) + rb")\] \S*\n)")
+_RECORD = re.compile(r"\[(\w+)\] (\S*)\n(.*)\n\n", re.DOTALL)
+_OPENERS = {".gz":gzip.open, ".xz":lzma.open}
+
+
+def _parseRecord(record:str, timestamp:Optional[float]=None) -> Optional[LogMessage]:
+    """ Make a message from a record written with the default format, None if it isn't a record """
+    match = _RECORD.fullmatch(record)
+    if match is None or match.group(1) not in _LEVELS:
+        return None
+    return LogMessage._trusted(match.group(3), _LEVELS[match.group(1)], LogTopic._trusted(match.group(2)), timestamp=timestamp)
+
+def _resumePosition(buffer:bytes) -> int:
+    """ The position from which a separator can still be found in the buffer once completed
+
+    A separator is only undecided when no end of line follow its empty
+    line, the line of the next record being incomplete.
+    """
+    last = buffer.rfind(b"\n")
+    return len(buffer) if last < 0 else max(0, last - 1)
+
+def readLog(file:Union[str,BinaryIO], chunkSize:int=1<<20, maxRecordSize:int=16<<20) -> Iterator[LogMessage]:
+    """ Read the messages of a text log file, written with the default format
+
+    The file is read by chunks, the records cut between two chunks being
+    completed with the next one. A record end with an empty line followed
+    by the first line of the next record, '[LEVEL] topic' with a topic
+    without spaces, so the bodies can contain empty lines. The text before
+    the first record is skipped, and a record cut at the end of the file
+    is completed. The creation time of the messages is unknown, it's the
+    time of the reading. A record longer than maxRecordSize is skipped,
+    so a file without separators isn't loaded in memory.
+
+    The rotated segments compressed with gzip or lzma ('.gz' and '.xz')
+    are decompressed while being read.
+
+    Arguments:
+    file : Union[str,BinaryIO]
+        The name of the log file, or the file opened in binary mode.
+    chunkSize : int = 1 MiB
+        The size of the chunks read.
+    maxRecordSize : int = 16 MiB
+        The size of the longest record kept.
+
+    Return:
+    Iterator[LogMessage]
+        The messages of the file, in order.
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(file,str) and not hasattr(file,"read"):
+        raise ValueError(f"The file must be a str or a binary file, instead I've received a '{type(file)}'")
+    if not isinstance(chunkSize,int) or chunkSize <= 0:
+        raise ValueError(f"The chunkSize must be a strictly positive int, instead I've received '{chunkSize}'")
+    if not isinstance(maxRecordSize,int) or maxRecordSize <= 0:
+        raise ValueError(f"The maxRecordSize must be a strictly positive int, instead I've received '{maxRecordSize}'")
+
+    # Open the file:
+    # --------------
+    if isinstance(file,str):
+        opener = _OPENERS.get(file[-3:], open)
+        with opener(file, "rb") as f:
+            yield from readLog(f, chunkSize, maxRecordSize)
+        return
+
+    # Read the records:
+    # -----------------
+    buffer = b""
+    resume = 0 # The separators before it are already found
+    skipping = False # Inside a record longer than maxRecordSize
+    while True:
+        chunk = file.read(chunkSize)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        for separator in _SEPARATOR.finditer(buffer, resume):
+            if not skipping and separator.end() - start <= maxRecordSize:
+                msg = _parseRecord(buffer[start:separator.end()].decode("utf-8", "replace"))
+                if msg is not None:
+                    yield msg
+            skipping = False
+            start = separator.end()
+        buffer = buffer[start:]
+        resume = _resumePosition(buffer)
+
+        # Oversized record:
+        # -----------------
+        if len(buffer) > maxRecordSize:
+            skipping = True
+            buffer = buffer[resume:] if len(buffer) - resume <= maxRecordSize else b""
+            resume = 0
+
+    # Last record:
+    # ------------
+    if buffer and not skipping and len(buffer) <= maxRecordSize:
+        record = buffer.decode("utf-8", "replace")
+        msg = _parseRecord(record if record.endswith("\n\n") else record.rstrip("\n") + "\n\n")
+        if msg is not None:
+            yield msg
+
+def filterLevel(messages:Iterable[LogMessage], level:Union[LogLevel,int,str]) -> Iterator[LogMessage]:
+    """ Keep the messages at least as critical as a level
+
+    Arguments:
+    messages : Iterable[LogMessage]
+        The messages to filtrate.
+    level : Union[LogLevel,int,str]
+        The level, or the value or the name of one.
+    """
+
+    # Type Check:
+    # -----------
+    if isinstance(level,LogLevel):
+        minLevel = level._value_
+    else:
+        minLevel = _VALUES.get(level) if isinstance(level,(int,str)) else None
+    if minLevel is None:
+        raise ValueError(f"The level must be a LogLevel, or the value or the name of one, instead I've received '{level}'")
+
+    # Filtrate:
+    # ---------
+    return (msg for msg in messages if msg.level._value_ >= minLevel)
+
+def filterTopic(messages:Iterable[LogMessage], filter:LogTopicFilter) -> Iterator[LogMessage]:
+    """ Keep the messages whose topic match a filter
+
+    The filter is only applied once for each topic.
+
+    Arguments:
+    messages : Iterable[LogMessage]
+        The messages to filtrate.
+    filter : LogTopicFilter
+        The topic filter.
+    """
+
+    # Type Check:
+    # -----------
+    if not isinstance(filter,LogTopicFilter):
+        raise ValueError(f"The filter must be a LogTopicFilter, instead I've received a '{type(filter)}'")
+
+    # Filtrate:
+    # ---------
+    return _filterTopic(messages, filter)
+def _filterTopic(messages:Iterable[LogMessage], filter:LogTopicFilter) -> Iterator[LogMessage]:
+    """ Generator of filterTopic, after the type check """
+    matches = dict() # Topic -> match
+    for msg in messages:
+        topic = msg.topic.topic
+        match = matches.get(topic)
+        if match is None:
+            match = matches[topic] = filter.match(msg.topic)
+        if match:
+            yield msg
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output keeping the last messages in memory
+# ---------------------------------------------------------
+# ./Logueur/log_recorder.py
+
+""" Module log_recorder
+
+Implement the FlightRecorderLogHandler class, a handler keeping the
+last messages in memory, without rendering them, and giving them to
+an other handler only when a critical message arrive. The detailed
+messages are available when something fail, without paying for
+their formatting and writing the rest of the time.
+"""
+
+import sys
+import threading
+from functools import partial
+from collections import deque
+
+from .log_level import LogLevel
+from .log_topic import LogTopicFilter
+from .log_message import LogMessage
+from .log_out import BaseLogHandler
+
+# Approximation of the memory used by a message, without its body and topic
+_MESSAGE_OVERHEAD = 128
+
+
+def _argumentSize(value:object) -> int:
+    """ Approximation of the memory used by an argument of a body template """
+    if value.__class__ is str or value.__class__ is bytes:
+        return len(value)
+    return sys.getsizeof(value)
+def _messageSize(msg:LogMessage) -> int:
+    """ Approximation of the memory used by a message, without rendering it
+
+    The size of a lazy body is the length of its template and the size of
+    its arguments, the one of a callable body is unknown.
+    """
+    size = _MESSAGE_OVERHEAD + len(msg.topic.topic)
+    body = msg._body
+    if body is not None:
+        return size + len(body)
+    render = msg._render
+    if render.__class__ is partial: # Template and its arguments
+        size += len(render.func.__self__)
+        for arg in render.args:
+            size += _argumentSize(arg)
+        for arg in render.keywords.values():
+            size += _argumentSize(arg)
+    return size
+
+
+class FlightRecorderLogHandler(BaseLogHandler):
+    """ FlightRecorderLogHandler
+
+    Handler keeping the last messages in a ring, bounded by a number of
+    messages and by a number of bytes. When a message at least as critical
+    as triggerLevel arrive, the messages of the ring and the critical message
+    are emitted as a batch to the target handler, filtrated by its level and
+    topic filter, and the ring is emptied.
+
+    The messages are kept unrendered: the lazy bodies are rendered only
+    when the messages are dumped, with the state of their arguments at
+    this time. The size of a message is approximated from the length of
+    its body, or of its template and the size of its arguments, and from
+    the length of its topic.
+    """
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, handler:BaseLogHandler,
+                 triggerLevel:LogLevel=LogLevel.ERROR, capacity:int=1000, maxBytes:int=1<<20) -> None:
+        """ Constructor of FlightRecorderLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate the messages to keep.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate the messages to keep.
+        handler : BaseLogHandler
+            The handler the messages are dumped to.
+        triggerLevel : LogLevel = ERROR
+            The messages at least as critical as this level trigger the dump.
+        capacity : int = 1000
+            The maximal number of messages kept.
+        maxBytes : int = 1 MiB
+            The maximal size of the messages kept, approximated.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(handler,BaseLogHandler):
+            raise ValueError(f"The handler must be a BaseLogHandler, instead I've received a '{type(handler)}'")
+        if not isinstance(triggerLevel,LogLevel):
+            raise ValueError(f"The triggerLevel must be a LogLevel, instead I've received a '{type(triggerLevel)}'")
+        if not isinstance(capacity,int) or capacity <= 0:
+            raise ValueError(f"The capacity must be a strictly positive int, instead I've received '{capacity}'")
+        if not isinstance(maxBytes,int) or maxBytes <= 0:
+            raise ValueError(f"The maxBytes must be a strictly positive int, instead I've received '{maxBytes}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter)
+        self._handler = handler
+        self._triggerLevel = triggerLevel._value_
+        self._capacity = capacity
+        self._maxBytes = maxBytes
+        self._ring = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.dumps = 0
+
+    @property
+    def handler(self) -> BaseLogHandler:
+        return self._handler
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def _write(self, msg:LogMessage) -> None:
+        """ Keep the message in the ring, or dump the ring if the message is critical """
+        if msg.level._value_ >= self._triggerLevel:
+            self._dump(msg)
+            return
+
+        size = _messageSize(msg)
+        with self._lock:
+            ring = self._ring
+            ring.append((size, msg))
+            self._bytes += size
+            while len(ring) > self._capacity or (self._bytes > self._maxBytes and len(ring) > 1):
+                self._bytes -= ring.popleft()[0]
+
+    def dump(self) -> None:
+        """ Emit the messages of the ring to the target handler, and empty the ring """
+        self._dump(None)
+    def _dump(self, trigger:LogMessage) -> None:
+        """ Emit the messages of the ring and the trigger message to the target handler """
+        with self._lock:
+            msgs = [msg for _, msg in self._ring]
+            self._ring.clear()
+            self._bytes = 0
+            self.dumps += 1
+        if trigger is not None:
+            msgs.append(trigger)
+        if msgs:
+            self._handler.emit_batch(msgs)
+
+    def flush(self) -> None:
+        """ Flush the target handler, the messages of the ring are kept """
+        self._handler.flush()
+    def close(self) -> None:
+        """ Close the target handler, the messages of the ring are discarded """
+        with self._lock:
+            self._ring.clear()
+            self._bytes = 0
+        self._handler.close()
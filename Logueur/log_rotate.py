@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Log output to rotating files
+# ---------------------------------------------------------
+# ./Logueur/log_rotate.py
+
+""" Module log_rotate
+
+Implement the RotatingFileLogHandler class, a file handler starting
+a new file when the current one is too big or too old. The previous
+files, the segments, are kept up to a retention limit, and can be
+compressed by a background thread, so the thread logging a message
+never wait for the compression.
+"""
+
+import os
+import re
+import sys
+import gzip
+import lzma
+import time
+import shutil
+import weakref
+import datetime
+import traceback
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .log_level import LogLevel
+from .log_topic import LogTopicFilter
+from .log_message import LogMessage
+from .log_out import FileLogHandler, _utf8Size
+
+
+class RotatingFileLogHandler(FileLogHandler):
+    """ RotatingFileLogHandler
+
+    Handler writing the messages in a log file, like FileLogHandler, and
+    rotating it when it would exceed maxBytes, or when it's older than
+    interval seconds. On rotation, the log file is renamed with the time
+    of the rotation, 'filename.YYYYMMDD-HHMMSS-ffffff', and a new log
+    file is opened with the same name.
+
+    The segments can be compressed with gzip or lzma, adding the '.gz'
+    or '.xz' extension. Only the backupCount most recent segments are
+    kept, the older ones being removed. The compression and the removal
+    are done by a background thread, one segment at a time.
+
+    The size of the file is counted in bytes written, in utf-8. The
+    segments are processed in the background until the handler is
+    closed, which wait for them.
+    """
+    _compressions = {"gzip":(".gz",gzip.open), "lzma":(".xz",lzma.open)}
+
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:Optional[str],
+                 maxBytes:Optional[int]=None, interval:Optional[float]=None, backupCount:Optional[int]=5,
+                 compression:Optional[str]=None, action:str="append", **kwargs) -> None:
+        """ Constructor of RotatingFileLogHandler
+
+        Arguments:
+        level : LogLevel
+            The level used for filtrate log messages.
+        filter : LogTopicFilter
+            The topic filtrer used for filtrate log messages.
+        filename : Optional[str]
+            The name of the log file, see FileLogHandler.
+        maxBytes : Optional[int]
+            The maximal size of the log file, None to disable.
+        interval : Optional[float]
+            The maximal age of the log file in seconds, None to disable.
+        backupCount : Optional[int] = 5
+            The number of segments to keep, None to keep them all.
+        compression : Optional[str]
+            The compression of the segments: 'gzip', 'lzma' or None.
+        action : str = append
+            Flag indicating what to do if a file with the same name already
+            exist, see FileLogHandler.
+        kwargs :
+            The flush policy arguments of FileLogHandler.
+        """
+
+        # Type Check:
+        # -----------
+        if maxBytes is not None and (not isinstance(maxBytes,int) or maxBytes <= 0):
+            raise ValueError(f"The maxBytes argument must be a strictly positive int, instead I've received '{maxBytes}'")
+        if interval is not None and (not isinstance(interval,(int,float)) or interval <= 0):
+            raise ValueError(f"The interval argument must be a strictly positive number, instead I've received '{interval}'")
+        if backupCount is not None and (not isinstance(backupCount,int) or backupCount < 0):
+            raise ValueError(f"The backupCount argument must be a positive int, instead I've received '{backupCount}'")
+        if compression is not None and not compression in self._compressions:
+            raise ValueError(f"The compression argument must be in {list(self._compressions)}, instead I've received '{compression}'")
+
+        # Initialization:
+        # ---------------
+        super().__init__(level, filter, filename, action, **kwargs)
+        self._maxBytes = maxBytes
+        self._interval = interval
+        self._backupCount = backupCount
+        self._compression = compression
+        self._size = os.path.getsize(self._filename)
+        self._rolloverAt = time.time() + interval if interval is not None else None
+        self._segmentPattern = re.compile(re.escape(os.path.basename(self._filename))
+                                          + r"\.(\d{8}-\d{6}-\d{6})(?:\.gz|\.xz)?$")
+
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix=f"RotatingFileLogHandler-{id(self):x}")
+        self.errors = 0
+
+    def _append(self, msg_str:str, msg:LogMessage) -> None:
+        """ Rotate the log file if needed, then write msg_str, the lock must be held """
+        size = _utf8Size(msg_str)
+        if self._size and ((self._maxBytes is not None and self._size + size > self._maxBytes)
+                           or (self._interval is not None and time.time() >= self._rolloverAt)):
+            self._rotate()
+        self._size += size
+        super()._append(msg_str, msg)
+    def _writeBatch(self, msgs:list[LogMessage]) -> None:
+        """ Append a batch of messages, split where the log file must be rotated by size """
+        format = self._format
+        with self._lock:
+            chunk, size, top = list(), self._size, None
+            written = 0 # Messages of the chunks written
+            for msg in msgs:
+                msg_str = format(msg)
+                msgSize = _utf8Size(msg_str)
+                if chunk and self._maxBytes is not None and size + msgSize > self._maxBytes:
+                    try:
+                        self._append("".join(chunk), top)
+                    except Exception as error:
+                        error._written = written
+                        raise
+                    written += len(chunk)
+                    chunk, size, top = list(), 0, None # The next chunk start a new log file
+                chunk.append(msg_str)
+                size += msgSize
+                if top is None or msg.level._value_ > top.level._value_:
+                    top = msg
+            if chunk:
+                try:
+                    self._append("".join(chunk), top)
+                except Exception as error:
+                    error._written = written
+                    raise
+
+    def rotate(self) -> None:
+        """ Rotate the log file now """
+        with self._lock:
+            self._rotate()
+    def _rotate(self) -> None:
+        """ Rename the log file into a segment and open a new one, the lock must be held """
+
+        # New log file:
+        # -------------
+        self._file.close()
+        renamed = False
+        try:
+            now = datetime.datetime.now()
+            segment = f"{self._filename}.{now:%Y%m%d-%H%M%S-%f}"
+            while os.path.exists(segment): # Two rotations in the same microsecond
+                now += datetime.timedelta(microseconds=1)
+                segment = f"{self._filename}.{now:%Y%m%d-%H%M%S-%f}"
+            os.rename(self._filename, segment)
+            renamed = True
+        finally:
+            # If the renaming failed, the messages are appended to the same log file
+            self._file = open(self._filename, "w" if renamed else "a", buffering=self._bufferSize, encoding="utf-8")
+            self._finalizer.detach()
+            self._finalizer = weakref.finalize(self, self._file.close)
+        self._size = 0
+        self._pending = 0
+        if self._interval is not None:
+            self._rolloverAt = time.time() + self._interval
+
+        # Compression and retention:
+        # --------------------------
+        self._executor.submit(self._processSegment, segment)
+
+    def _processSegment(self, segment:str) -> None:
+        """ Compress a segment and remove the oldest ones, in the background thread """
+        try:
+            if self._compression is not None:
+                ext, opener = self._compressions[self._compression]
+                with open(segment, "rb") as src, opener(segment + ext + ".tmp", "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+                os.replace(segment + ext + ".tmp", segment + ext)
+                os.remove(segment)
+            if self._backupCount is not None:
+                for old in self.segments()[:-self._backupCount or None]:
+                    os.remove(old)
+        except Exception:
+            self.errors += 1
+            traceback.print_exc(file=sys.stderr)
+
+    def segments(self) -> list[str]:
+        """ The paths of the segments, from the oldest to the most recent """
+        directory = os.path.dirname(self._filename) or "."
+        matches = [(match.group(1), name) for name in os.listdir(directory)
+                   if (match := self._segmentPattern.match(name))]
+        return [os.path.join(directory, name) for _, name in sorted(matches)]
+
+    def close(self) -> None:
+        """ Flush the buffer, close the log file and wait for the segments to be processed """
+        super().close()
+        self._executor.shutdown(wait=True)
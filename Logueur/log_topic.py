@@ -12,34 +12,59 @@ a filter for log message's topic.
 """
 
 import re
+import sys
 import inspect
+from types import CodeType, ModuleType
 from typing import Optional, Union
+from collections import OrderedDict
 
 def _generateFromStack(n_frame:int) -> str:
     """
-    Generate the topic by concatening the 'function'
-    property of each FrameInfo of the execution stack returned by
-    the function inspect.stack(). The topic start with the outermost
-    frame's function, and each function name are separated by a dot.
+    Generate the topic by concatening the name of the function
+    of each frame of the execution stack. The topic start with the 
+    outermost frame's function, and each function name are separated 
+    by a dot.
     
-    Ignore the first 'n_frame'.
+    Ignore the first 'n_frame', the frame 0 being the one of this
+    function. The frames are walked through their 'f_back' attribute,
+    which avoid the cost of inspect.stack() (building a FrameInfo and
+    reading the source context of every frame), while giving the same
+    topic.
     """
 
-    # Get the stack:
+    # Get the frame:
     # --------------
-    stack = inspect.stack()
-    stack = stack[n_frame:]
+    try:
+        frame = sys._getframe(n_frame)
+    except ValueError: # Deeper than the stack
+        return ""
 
-    # Parse the stack:
-    # ----------------
+    # Walk the stack:
+    # ---------------
     topics = list()
-    for frame_info in reversed(stack):
-        if frame_info.function == "<module>":
-            continue
-        topics.append(frame_info.function)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name != "<module>":
+            topics.append(name)
+        frame = frame.f_back
 
     # Concatenate the topic string:
+    topics.reverse()
     return ".".join(topics)
+def _getModuleName(frame) -> Optional[str]:
+    """
+    Get the name of the module in which the code of the frame
+    was defined, as inspect.getmodule(frame) would.
+
+    The module is first looked up with the '__name__' of the frame's
+    globals, and is only trusted if the file of the module is the one
+    of the code. Otherwise, we fall back to inspect.getmodule.
+    """
+    name = frame.f_globals.get("__name__")
+    module = sys.modules.get(name) if isinstance(name,str) else None
+    if module is None or getattr(module,"__file__",None) != frame.f_code.co_filename:
+        module = inspect.getmodule(frame)
+    return module.__name__ if module else None
 def _generateFromModule(n_frame:int) -> str:
     """
     generate the topic in the following form:
@@ -47,29 +72,28 @@ def _generateFromModule(n_frame:int) -> str:
         'module_name.function_name'
 
     The frame used to get the module, class, methode
-    or function name is specified by using n_frame
+    or function name is specified by using n_frame, the
+    frame 0 being the one of this function.
     """
 
     # Get the frame:
     # --------------
-    stack = inspect.stack()
-    frame_info = stack[n_frame]
+    try:
+        frame = sys._getframe(n_frame)
+    except ValueError:
+        raise IndexError(f"The stack is not {n_frame} frames deep") from None
 
     # Get the topic:
     # --------------
     topics = list()
 
     # Module:
-    if module := inspect.getmodule(frame_info.frame):
-        if '.' in module.__name__:
-            topics.append(module.__name__.rsplit(".",1)[-1])
-        else:
-            topics.append(module.__name__)
+    if module_name := _getModuleName(frame):
+        topics.append(module_name.rsplit(".",1)[-1])
     # Class and method:
-    qualName = frame_info.frame.f_code.co_qualname
+    qualName = frame.f_code.co_qualname
     if '.' in qualName:
-        topics.append(qualName.rsplit(".",1)[0]) # class
-        topics.append(qualName.rsplit(".",1)[1]) # method
+        topics.extend(qualName.rsplit(".",1)) # class and method
     else:
         topics.append(qualName)
     
@@ -77,6 +101,93 @@ def _generateFromModule(n_frame:int) -> str:
 
 
 
+class TopicCache():
+    """ TopicCache
+
+    Bounded cache of generated topics, keyed on the id of the code object
+    of the call site: hashing a code object hash all of its content, and
+    two code objects of different files can be equal. The cache keep a
+    reference to the code objects, so their id can't be reused while
+    they are cached. As the topic generated for a call site never change,
+    the topic is only generated on the first call, and the same LogTopic
+    instance is returned for the next ones.
+
+    When the cache is full, the least recently used topic is evicted.
+    The number of hits and misses are counted, and the topics of a
+    reloaded module can be invalidated, as the old code objects will
+    never be used again.
+    """
+
+    def __init__(self, maxsize:int=1024) -> None:
+        """ Constructor of TopicCache
+
+        Arguments:
+        maxsize : int = 1024
+            The maximal number of topics to keep in the cache.
+        """
+
+        # Type Check:
+        # -----------
+        if not isinstance(maxsize,int):
+            raise ValueError(f"The maxsize must be an int, instead I've received a '{type(maxsize)}'")
+        if maxsize <= 0:
+            raise ValueError(f"The maxsize must be strictly positive, instead I've received '{maxsize}'")
+
+        # Initialization:
+        # ---------------
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, code:CodeType) -> Optional['LogTopic']:
+        """ Get the topic cached for a code object, None if there is none """
+        key = id(code)
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            self._cache.move_to_end(key)
+        except KeyError: # Evicted by another thread meanwhile
+            pass
+        return entry[1]
+    def put(self, code:CodeType, topic:'LogTopic') -> None:
+        """ Cache the topic of a code object, evicting the oldest one if full """
+        self._cache[id(code)] = (code, topic)
+        while len(self._cache) > self.maxsize:
+            try:
+                self._cache.popitem(last=False)
+            except KeyError:
+                break
+
+    def invalidate(self, module:Union[ModuleType,str,None]=None) -> None:
+        """ Invalidate the cached topics.
+
+        If a module (or a module name) is given, only the topics of the
+        code defined in the file of this module are removed, which should
+        be done when the module is reloaded. Otherwise, the whole cache is
+        cleared.
+        """
+        if module is None:
+            self._cache.clear()
+            return
+        if isinstance(module,str):
+            module = sys.modules.get(module)
+        filename = getattr(module,"__file__",None)
+        if filename is None:
+            return
+        for key in [key for key, (code, _) in list(self._cache.items()) if code.co_filename == filename]:
+            self._cache.pop(key,None)
+    def info(self) -> dict:
+        """ Get the statistics of the cache """
+        return {"hits":self.hits, "misses":self.misses, "size":len(self._cache), "maxsize":self.maxsize}
+
+
 class LogTopic():
     """ LogTopic
 
@@ -91,7 +202,9 @@ class LogTopic():
     the different messages.
     """
 
+    __slots__ = ("topic",)
     _fromMethode = ["stack","module"]
+    _moduleCache = TopicCache()
 
     def __init__(self, topic:str) -> None:
         """ Constructor of LogTopic.
@@ -112,6 +225,12 @@ class LogTopic():
         # Save topic:
         # -----------
         self.topic = topic
+    @classmethod
+    def _trusted(cls, topic:str) -> 'LogTopic':
+        """ Construct a topic without checking that it is a str """
+        self = object.__new__(cls)
+        self.topic = topic
+        return self
     def __repr__(self) -> str:
         return self.topic
     def __eq__(self,other:Union['LogTopic',str]) -> bool:
@@ -127,17 +246,17 @@ class LogTopic():
     def topicFactory(cls, method:Optional[str], n_frame:int=2) -> 'LogTopic':
         """ Generate a log topic from the execution stack.
 
-        This static method use the inspect module to inspect
-        the execution stack. It ignore the first n_frame given
+        This static method walk the frames of the execution
+        stack. It ignore the first n_frame given
         in argument.
 
         This function generate the topic by using 2 methods, that
         the user can choose:
         
-        - by 'stack': generate the topic by concatening the 'function'
-        property of each FrameInfo of the execution stack returned by
-        the function inspect.stack(). The topic start with the outermost
-        frame's function, and each function name are separated by a dot.
+        - by 'stack': generate the topic by concatening the function's
+        name of each frame of the execution stack. The topic start with
+        the outermost frame's function, and each function name are 
+        separated by a dot.
 
         - by 'module': generate the topic in the following form:
         'module_name.class_name.methode_name' or
@@ -152,6 +271,10 @@ class LogTopic():
             The method to use for generating the topic. Must be member of
         ["stack","module"]. Default is "module"
 
+        The topics generated by 'module' are cached per call site, so
+        the same LogTopic instance is returned for every call from the
+        same code. See cacheInfo and invalidateCache.
+
         Return:
         topic : LogTopic
             The topic generated.
@@ -164,7 +287,6 @@ class LogTopic():
         if method and not isinstance(method,str):
             raise ValueError(f"The agument method must be a str, instead I've received a '{type(method)}'")
         if not method:
-            print(f"[DEBUG] setting method to 'module'")
             method = "module"
         
         # Value Check:
@@ -175,11 +297,34 @@ class LogTopic():
         # Topic generation:
         # -----------------
         if method == "stack":
-            topic = _generateFromStack(n_frame)
-        else:
-            topic = _generateFromModule(n_frame)
+            return cls(_generateFromStack(n_frame))
         
-        return cls(topic)
+        # By module, the topic only depends on the code of the call site,
+        # (the frame n_frame-1 of this function), so it can be cached:
+        if n_frame < 1:
+            return cls(_generateFromModule(n_frame))
+        try:
+            code = sys._getframe(n_frame-1).f_code
+        except ValueError:
+            raise IndexError(f"The stack is not {n_frame} frames deep") from None
+        topic = cls._moduleCache.get(code)
+        if topic is None:
+            topic = cls(sys.intern(_generateFromModule(n_frame)))
+            cls._moduleCache.put(code,topic)
+        return topic
+
+    @classmethod
+    def cacheInfo(cls) -> dict:
+        """ Get the statistics of the cache used by the 'module' method """
+        return cls._moduleCache.info()
+    @classmethod
+    def invalidateCache(cls, module:Union[ModuleType,str,None]=None) -> None:
+        """ Invalidate the topics cached for the 'module' method.
+
+        Should be called with the module (or its name) when a module is
+        reloaded. If no module is given, the whole cache is cleared.
+        """
+        cls._moduleCache.invalidate(module)
 
 class LogTopicFilter():
     """ LogTopicFilter
@@ -10,12 +10,17 @@ Implement the Logueur class, used for logging messages
 to various output.
 """
 
-from typing import Union, Optional
+from typing import Union, Optional, Callable
 
 from .log_level import LogLevel
 from .log_message import LogMessage
 from .log_topic import LogTopic, LogTopicFilter
 from .log_out import BaseLogHandler, ConsoleLogHandler, FileLogHandler
+from .log_limit import LogRateLimiter
+
+# Value of the levels, for checking them in the level methods without
+# accessing the members of LogLevel:
+_DEBUG, _INFO, _WARNING, _ERROR, _FATAL = (level._value_ for level in LogLevel)
 
 class Logueur():
     """ Logueur
@@ -26,12 +31,23 @@ class Logueur():
     with each output configured differently. This provide a structured
     logging for debugging and monitoring application behavior. It also 
     simplifies the sending of messages by handling the creation of the 
-    messages.    
+    messages.
+
+    The Logueur keep the minimal level accepted by its outputs, so the 
+    messages that no output would emit are discarded before any work is
+    done to create them.
+
+    Each level method has a coroutine counterpart (adebug, ainfo, ...), 
+    for logging from asyncio code without blocking the event loop, when 
+    used with async outputs like AsyncLogHandler.
+
+    With a LogRateLimiter, the messages of the hot topics are limited
+    before being given to the outputs, and so before being rendered.
     """
 
     def __init__(self, output:Union[BaseLogHandler,list[BaseLogHandler]],
                  topicGenerationMethode:Optional[str]=None,
-                 messageFormat:Optional[str]=None) -> None:
+                 messageFormat:Optional[str]=None, rateLimiter:Optional[LogRateLimiter]=None) -> None:
         """ Constructor of Logueur
 
         Configure the Logueur with the different output given in argument.
@@ -39,6 +55,9 @@ class Logueur():
         Arguments:
         output : list[BaseLogHandler]
             The differents output to use for logging messages.
+        rateLimiter : Optional[LogRateLimiter]
+            The limiter checking the messages before they are given to
+            the outputs, see LogRateLimiter.
         """
 
         # Type Check:
@@ -65,11 +84,22 @@ class Logueur():
         if messageFormat and not r'{body}' in messageFormat:
             raise ValueError("The msg_fmt must at least contains {body} !")
 
+        # Rate limiter:
+        if rateLimiter is not None and not isinstance(rateLimiter,LogRateLimiter):
+            raise ValueError(f"The rate limiter must be a LogRateLimiter, instead I've received a '{type(rateLimiter)}'")
+
         # Initialization:
         # ---------------
         self._out = output
         self._topicGenerationMethode = topicGenerationMethode
         self._messageFormat = messageFormat
+        self._rateLimiter = rateLimiter
+        self._metrics = None # The LogMetrics counting the messages, if any
+        for out in self._out:
+            out._logueurs.add(self)
+        if rateLimiter is not None:
+            rateLimiter._logueurs.add(self)
+        self._updateMinLevel()
 
     def add_out(self, output:Union[BaseLogHandler,list[BaseLogHandler]]) -> None:
         """ Add a log output to the logueur """
@@ -85,7 +115,30 @@ class Logueur():
 
         # Add output:
         # -----------
-        self._out.append(output)
+        self._out.extend(output)
+        for out in output:
+            out._logueurs.add(self)
+        if self._metrics is not None:
+            self._metrics.attach(output)
+        self._updateMinLevel()
+
+    def _updateMinLevel(self) -> None:
+        """ Compute the minimal level accepted by the outputs.
+
+        Called when an output is added or when the level of one of
+        the outputs change.
+        """
+        levels = [out.level._value_ for out in self._out]
+        self._minLevel = min(levels) if levels else LogLevel.FATAL._value_ + 1
+
+    def is_enabled_for(self, level:Union[LogLevel,int,str]) -> bool:
+        """ Check if a message of the given level would be emitted by at least one output.
+
+        Only the level of the outputs are checked, not their topic filter.
+        """
+        if not isinstance(level,LogLevel):
+            level = LogLevel.factory(level)
+        return level._value_ >= self._minLevel
 
     def log(self,msg:LogMessage) -> None:
         """ Log a specific message """
@@ -97,125 +150,261 @@ class Logueur():
         
         # Logging:
         # --------
+        if self._rateLimiter is not None and not self._allow(msg):
+            return
+        if self._metrics is not None:
+            self._metrics._count(msg)
         for out in self._out:
             out.emit(msg)
-    
-    def debug(self, body:str, topic:Optional[str]=None, format:Optional[str]=None) -> None:
-        """ Log a message with a DEBUG level
 
-        Construct and log a debug message. If the topic isn't specified, one is
-        constructed with the topicFactory class method of the LogTopic class.
-        If the format isn't specified, the default one will be used.
+    def _allow(self, msg:LogMessage) -> bool:
+        """ Check a message with the rate limiter, and log its summary if one is due """
+        limiter = self._rateLimiter
+        allowed = limiter.allow(msg)
+        summary = limiter._summary
+        if summary is not None:
+            limiter._summary = None
+            self._logSummary(summary)
+        return allowed
+
+    def _logSummary(self, summary:LogMessage) -> None:
+        """ Give a summary of the rate limiter to the outputs """
+        for out in self._out:
+            out.emit(summary)
+    
+    def log_many(self,msgs:list[LogMessage]) -> None:
+        """ Log a batch of messages 
+        
+        Each output filtrate the whole batch and write it at once,
+        if it support it (see BaseLogHandler.emit_batch).
         """
 
         # Type Check:
         # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the message must be a str, instead I've received a '{type(body)}'")
-        if topic and not isinstance(topic,str):
-            raise ValueError(f"The topic of the message must be a str, instead I've received a '{type(topic)}'")
-        else:
-            topic = LogTopic.topicFactory(self._topicGenerationMethode, 3)
-        if format and not isinstance(format,str):
-            raise ValueError(f"The format of the message must be a str, instead I've received a '{type(format)}'")
+        if not isinstance(msgs,(list,tuple)):
+            raise ValueError(f"The messages to logged must be a list of LogMessage, instead I've received a '{type(msgs)}'")
+        for i,msg in enumerate(msgs,start=1):
+            if not isinstance(msg,LogMessage):
+                raise ValueError(f"Message {i} of the messages to logged must be a LogMessage, instead I've received a '{type(msg)}'")
         
-        # Create and log message:
-        # -----------------------
-        msg = LogMessage(body,LogLevel.DEBUG,topic,fmt=format)
-        self.log(msg)
-    def info(self, body:str, topic:Optional[str]=None, format:Optional[str]=None) -> None:
-        """ Log a message with a INFO level
+        # Logging:
+        # --------
+        if self._rateLimiter is not None:
+            msgs = [msg for msg in msgs if self._allow(msg)]
+        if self._metrics is not None:
+            for msg in msgs:
+                self._metrics._count(msg)
+        for out in self._out:
+            out.emit_batch(msgs)
 
-        Construct and log an info message. If the topic isn't specified, one is
-        constructed with the topicFactory class method of the LogTopic class.
-        If the format isn't specified, the default one will be used.
+    async def alog(self,msg:LogMessage) -> None:
+        """ Log a specific message, from a coroutine
+        
+        The message is given to the outputs implementing an aemit
+        coroutine (like AsyncLogHandler) without blocking the event
+        loop. The other outputs emit it right away.
+        """
+        
+        # Type Check:
+        # -----------
+        if not isinstance(msg,LogMessage):
+            raise ValueError(f"The message to logged must be a LogMessage, instead I've received a '{type(msg)}'")
+        
+        # Logging:
+        # --------
+        if self._rateLimiter is not None and not self._allow(msg):
+            return
+        if self._metrics is not None:
+            self._metrics._count(msg)
+        for out in self._out:
+            aemit = getattr(out,"aemit",None)
+            if aemit is not None:
+                await aemit(msg)
+            else:
+                out.emit(msg)
+    
+    def _makeMessage(self, level:LogLevel, body:Union[str,Callable[[],str]], topic:Optional[str],
+                     format:Optional[str], args:tuple, kwargs:dict, fields:Optional[dict]=None) -> LogMessage:
+        """ Construct a message, called by the level methods
+
+        The topic is generated for the caller of the level method.
         """
 
         # Type Check:
         # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the message must be a str, instead I've received a '{type(body)}'")
+        if not isinstance(body,str) and not callable(body):
+            raise ValueError(f"The body of the message must be a str or a callable, instead I've received a '{type(body)}'")
         if topic and not isinstance(topic,str):
             raise ValueError(f"The topic of the message must be a str, instead I've received a '{type(topic)}'")
-        else:
-            topic = LogTopic.topicFactory(self._topicGenerationMethode, 3)
         if format and not isinstance(format,str):
             raise ValueError(f"The format of the message must be a str, instead I've received a '{type(format)}'")
+        if format and not r'{body}' in format:
+            raise ValueError("The format of the message must at least contains {body} !")
+        if callable(body) and (args or kwargs):
+            raise ValueError("The body of the message can't have arguments if it's a callable")
+        if args and not "{" in body:
+            raise ValueError("The body of the message has no {} placeholder for its arguments, the topic must be given with topic=")
+        if fields is not None and not isinstance(fields,dict):
+            raise ValueError(f"The fields of the message must be a dict, instead I've received a '{type(fields)}'")
         
-        # Create and log message:
-        # -----------------------
-        msg = LogMessage(body,LogLevel.INFO,topic,fmt=format)
-        self.log(msg)
-    def warning(self, body:str, topic:Optional[str]=None, format:Optional[str]=None) -> None:
+        # Topic:
+        # ------
+        if topic:
+            topic = LogTopic._trusted(topic)
+        else:
+            topic = LogTopic.topicFactory(self._topicGenerationMethode, 4)
+        
+        # Create message:
+        # ---------------
+        # The arguments are checked, the message can be trusted:
+        return LogMessage._trusted(body,level,topic,format or self._messageFormat,args,kwargs,fields=fields)
+
+    def debug(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+              format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with a DEBUG level
+
+        Construct and log a debug message. If the topic isn't specified, one is
+        constructed with the topicFactory class method of the LogTopic class.
+        If the format isn't specified, the default one will be used.
+
+        The body can be a template, formatted with str.format(*args,**kwargs),
+        or a callable without arguments returning the body. In both case, the
+        body is only rendered when the message is written. The fields are
+        structured key/value data attached to the message, written by the
+        structured handlers like JSONLinesLogHandler.
+
+        Nothing is done if no output accept DEBUG messages.
+        """
+        if _DEBUG < self._minLevel:
+            return
+        self.log(self._makeMessage(LogLevel.DEBUG, body, topic, format, args, kwargs, fields))
+    def info(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+             format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with an INFO level
+
+        Construct and log an info message. If the topic isn't specified, one is
+        constructed with the topicFactory class method of the LogTopic class.
+        If the format isn't specified, the default one will be used.
+
+        The body can be a template, formatted with str.format(*args,**kwargs),
+        or a callable without arguments returning the body. In both case, the
+        body is only rendered when the message is written. The fields are
+        structured key/value data attached to the message, written by the
+        structured handlers like JSONLinesLogHandler.
+
+        Nothing is done if no output accept INFO messages.
+        """
+        if _INFO < self._minLevel:
+            return
+        self.log(self._makeMessage(LogLevel.INFO, body, topic, format, args, kwargs, fields))
+    def warning(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
         """ Log a message with a WARNING level
 
         Construct and log a warning message. If the topic isn't specified, one is
         constructed with the topicFactory class method of the LogTopic class.
         If the format isn't specified, the default one will be used.
-        """
 
-        # Type Check:
-        # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the message must be a str, instead I've received a '{type(body)}'")
-        if topic and not isinstance(topic,str):
-            raise ValueError(f"The topic of the message must be a str, instead I've received a '{type(topic)}'")
-        else:
-            topic = LogTopic.topicFactory(self._topicGenerationMethode, 3)
-        if format and not isinstance(format,str):
-            raise ValueError(f"The format of the message must be a str, instead I've received a '{type(format)}'")
-        
-        # Create and log message:
-        # -----------------------
-        msg = LogMessage(body,LogLevel.WARNING,topic,fmt=format)
-        self.log(msg)
-    def error(self, body:str, topic:Optional[str]=None, format:Optional[str]=None) -> None:
-        """ Log a message with a ERROR level
+        The body can be a template, formatted with str.format(*args,**kwargs),
+        or a callable without arguments returning the body. In both case, the
+        body is only rendered when the message is written. The fields are
+        structured key/value data attached to the message, written by the
+        structured handlers like JSONLinesLogHandler.
+
+        Nothing is done if no output accept WARNING messages.
+        """
+        if _WARNING < self._minLevel:
+            return
+        self.log(self._makeMessage(LogLevel.WARNING, body, topic, format, args, kwargs, fields))
+    def error(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+              format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with an ERROR level
 
         Construct and log an error message. If the topic isn't specified, one is
         constructed with the topicFactory class method of the LogTopic class.
         If the format isn't specified, the default one will be used.
-        """
 
-        # Type Check:
-        # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the message must be a str, instead I've received a '{type(body)}'")
-        if topic and not isinstance(topic,str):
-            raise ValueError(f"The topic of the message must be a str, instead I've received a '{type(topic)}'")
-        else:
-            topic = LogTopic.topicFactory(self._topicGenerationMethode, 3)
-        if format and not isinstance(format,str):
-            raise ValueError(f"The format of the message must be a str, instead I've received a '{type(format)}'")
-        
-        # Create and log message:
-        # -----------------------
-        msg = LogMessage(body,LogLevel.ERROR,topic,fmt=format)
-        self.log(msg)
-    def fatal(self, body:str, topic:Optional[str]=None, format:Optional[str]=None) -> None:
+        The body can be a template, formatted with str.format(*args,**kwargs),
+        or a callable without arguments returning the body. In both case, the
+        body is only rendered when the message is written. The fields are
+        structured key/value data attached to the message, written by the
+        structured handlers like JSONLinesLogHandler.
+
+        Nothing is done if no output accept ERROR messages.
+        """
+        if _ERROR < self._minLevel:
+            return
+        self.log(self._makeMessage(LogLevel.ERROR, body, topic, format, args, kwargs, fields))
+    def fatal(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+              format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
         """ Log a message with a FATAL level
 
         Construct and log a fatal message. If the topic isn't specified, one is
         constructed with the topicFactory class method of the LogTopic class.
         If the format isn't specified, the default one will be used.
+
+        The body can be a template, formatted with str.format(*args,**kwargs),
+        or a callable without arguments returning the body. In both case, the
+        body is only rendered when the message is written. The fields are
+        structured key/value data attached to the message, written by the
+        structured handlers like JSONLinesLogHandler.
+
+        Nothing is done if no output accept FATAL messages.
         """
+        if _FATAL < self._minLevel:
+            return
+        self.log(self._makeMessage(LogLevel.FATAL, body, topic, format, args, kwargs, fields))
 
-        # Type Check:
-        # -----------
-        if not isinstance(body,str):
-            raise ValueError(f"The body of the message must be a str, instead I've received a '{type(body)}'")
-        if topic and not isinstance(topic,str):
-            raise ValueError(f"The topic of the message must be a str, instead I've received a '{type(topic)}'")
-        else:
-            topic = LogTopic.topicFactory(self._topicGenerationMethode, 3)
-        if format and not isinstance(format,str):
-            raise ValueError(f"The format of the message must be a str, instead I've received a '{type(format)}'")
-        
-        # Create and log message:
-        # -----------------------
-        msg = LogMessage(body,LogLevel.FATAL,topic,fmt=format)
-        self.log(msg)
+    async def adebug(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                     format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with a DEBUG level, from a coroutine
 
+        Same as the debug method, the topic being generated for the calling
+        coroutine, but the message is logged with alog.
+        """
+        if _DEBUG < self._minLevel:
+            return
+        await self.alog(self._makeMessage(LogLevel.DEBUG, body, topic, format, args, kwargs, fields))
+    async def ainfo(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                    format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with an INFO level, from a coroutine
+
+        Same as the info method, the topic being generated for the calling
+        coroutine, but the message is logged with alog.
+        """
+        if _INFO < self._minLevel:
+            return
+        await self.alog(self._makeMessage(LogLevel.INFO, body, topic, format, args, kwargs, fields))
+    async def awarning(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                       format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with a WARNING level, from a coroutine
+
+        Same as the warning method, the topic being generated for the calling
+        coroutine, but the message is logged with alog.
+        """
+        if _WARNING < self._minLevel:
+            return
+        await self.alog(self._makeMessage(LogLevel.WARNING, body, topic, format, args, kwargs, fields))
+    async def aerror(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                     format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with an ERROR level, from a coroutine
+
+        Same as the error method, the topic being generated for the calling
+        coroutine, but the message is logged with alog.
+        """
+        if _ERROR < self._minLevel:
+            return
+        await self.alog(self._makeMessage(LogLevel.ERROR, body, topic, format, args, kwargs, fields))
+    async def afatal(self, body:Union[str,Callable[[],str]], *args, topic:Optional[str]=None,
+                     format:Optional[str]=None, fields:Optional[dict]=None, **kwargs) -> None:
+        """ Log a message with a FATAL level, from a coroutine
+
+        Same as the fatal method, the topic being generated for the calling
+        coroutine, but the message is logged with alog.
+        """
+        if _FATAL < self._minLevel:
+            return
+        await self.alog(self._makeMessage(LogLevel.FATAL, body, topic, format, args, kwargs, fields))
 
 def ConsoleLogueurFactory(level:Union[str,LogLevel],filter:Union[str,LogTopicFilter]="#",
                           supportColor:bool=True, useStderr:bool=True) -> Logueur:
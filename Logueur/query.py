@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Query of the indexed log files
+# ---------------------------------------------------------
+# ./Logueur/query.py
+
+""" Module query
+
+Print the messages of a text log file matching a level, a topic
+filter and a time range, using the index of the log file:
+
+    python -m Logueur.query log.txt [--level ERROR] [--topic 'app.#'] [--since T] [--until T]
+
+The times are given in seconds since the epoch, or in ISO 8601 format.
+The index is built and saved in 'log.txt.idx' if it doesn't exist.
+"""
+
+import sys
+import argparse
+import datetime
+from typing import Optional
+
+from .log_topic import LogTopicFilter
+from .log_index import queryLog
+
+
+def _parseTime(value:str) -> float:
+    """ Parse a time in seconds since the epoch, or in ISO 8601 format """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time '{value}'")
+
+def main(argv:Optional[list[str]]=None) -> int:
+    """ Entry point of the query
+
+    Arguments:
+    argv : Optional[list[str]]
+        The command line arguments, sys.argv[1:] if None.
+
+    Return:
+    int
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(prog="python -m Logueur.query",
+                                     description="Print the messages of a log file matching a query.")
+    parser.add_argument("input", help="the text log file")
+    parser.add_argument("--level", default="DEBUG", help="the minimal level of the messages")
+    parser.add_argument("--topic", help="the topic filter of the messages, with the '*' and '#' wildcards")
+    parser.add_argument("--since", type=_parseTime, help="the messages created at or after this time")
+    parser.add_argument("--until", type=_parseTime, help="the messages created before this time")
+    parser.add_argument("--index", help="the sidecar file of the index, 'input.idx' by default")
+    args = parser.parse_args(argv)
+
+    try:
+        filter = LogTopicFilter(args.topic) if args.topic else None
+        for msg in queryLog(args.input, args.level.upper(), filter, args.since, args.until, args.index):
+            sys.stdout.write(str(msg))
+    except (ValueError, OSError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
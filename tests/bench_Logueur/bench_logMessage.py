@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Benchmark for log messages
+# ---------------------------------------------------------
+# ./tests/bench_Logueur/bench_logMessage.py
+""" Benchmark for the log_message module
+
+Measure the memory used by a LogMessage and its LogTopic, compared
+to the same classes without __slots__, and the construction time of
+a message by its public constructor and by the trusted one used by
+the Logueur, and the rendering of the messages.
+
+Run it from the root of the repository:
+    PYTHONPATH=. python tests/bench_Logueur/bench_logMessage.py
+"""
+
+import timeit
+import tracemalloc
+
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopic
+from Logueur.log_message import LogMessage
+
+class _DictTopic():
+    """ A LogTopic with a __dict__, as before __slots__ """
+    def __init__(self, topic:str) -> None:
+        if not isinstance(topic,str):
+            raise ValueError()
+        self.topic = topic
+class _DictMessage():
+    """ A LogMessage with a __dict__, as before __slots__ """
+    def __init__(self, body:str, level:LogLevel, topic:_DictTopic, fmt=None) -> None:
+        if not isinstance(body,str) or not isinstance(level,LogLevel) or not isinstance(topic,_DictTopic):
+            raise ValueError()
+        self._body = body
+        self._render = None
+        self.level = level
+        self.topic = topic
+        self._str = None
+        if fmt:
+            self._msg_fmt = fmt
+
+def _bytesPerInstance(create, number:int) -> float:
+    """ Memory allocated per instance returned by create(i), in bytes """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [create(i) for i in range(number)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / number
+
+def bench_messageMemory(number:int=10000) -> dict[str,float]:
+    """ Memory used by a message and its topic, in bytes """
+    bodies = [f"body {i}" for i in range(number)]
+    topics = [f"topic.{i}" for i in range(number)]
+    level = LogLevel.INFO
+    return {
+        "dict": _bytesPerInstance(lambda i: _DictMessage(bodies[i],level,_DictTopic(topics[i])), number),
+        "slots": _bytesPerInstance(lambda i: LogMessage(bodies[i],level,LogTopic(topics[i])), number),
+    }
+def bench_messageConstruction(number:int=100000) -> dict[str,float]:
+    """ Time to construct a message and its topic, in seconds """
+    level = LogLevel.INFO
+    return {
+        "dict": timeit.timeit(lambda: _DictMessage("body",level,_DictTopic("a.topic")), number=number) / number,
+        "public": timeit.timeit(lambda: LogMessage("body",level,LogTopic("a.topic")), number=number) / number,
+        "trusted": timeit.timeit(lambda: LogMessage._trusted("body",level,LogTopic._trusted("a.topic")), number=number) / number,
+    }
+
+def bench_rendering(number:int=100000) -> dict[str,float]:
+    """ Time to construct and render a message, and to render it again, in seconds """
+    level, topic = LogLevel.INFO, LogTopic("a.topic")
+    fmt = "{level} | {topic} | {body}\n"
+    cached = LogMessage("body {} {}", level, topic, args=(1, "two"))
+    str(cached)
+    return {
+        "plain": timeit.timeit(lambda: str(LogMessage._trusted("body",level,topic)), number=number) / number,
+        "template": timeit.timeit(lambda: str(LogMessage._trusted("body {} {}",level,topic,args=(1,"two"))), number=number) / number,
+        "callable": timeit.timeit(lambda: str(LogMessage._trusted(lambda: "body",level,topic)), number=number) / number,
+        "format": timeit.timeit(lambda: str(LogMessage._trusted("body",level,topic,fmt)), number=number) / number,
+        "cached": timeit.timeit(lambda: str(cached), number=number) / number,
+    }
+
+def main():
+    memory = bench_messageMemory()
+    print(f"{'memory':<10} {'bytes':>10}")
+    for name, size in memory.items():
+        print(f"{name:<10} {size:>10.1f}")
+    print()
+    construction = bench_messageConstruction()
+    print(f"{'construct':<10} {'us':>10}")
+    for name, duration in construction.items():
+        print(f"{name:<10} {duration*1e6:>10.3f}")
+    print()
+    rendering = bench_rendering()
+    print(f"{'render':<10} {'us':>10}")
+    for name, duration in rendering.items():
+        print(f"{name:<10} {duration*1e6:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Benchmark for log's outputs
+# ---------------------------------------------------------
+# ./tests/bench_Logueur/bench_logOut.py
+""" Benchmark for the log_out module
+
+Measure the cost of BaseLogHandler._filtrate, compared to the one
+of the comparison of the levels through LogLevel.factory, as they
+were compared before the precomputed table of LogLevel.
+
+Measure the throughput of FileLogHandler with its different flush
+policies, compared to reopening the file for each message as it was
+done before, and the throughput of ConsoleLogHandler, its output being
+redirected to /dev/null.
+
+Run it from the root of the repository:
+    PYTHONPATH=. python tests/bench_Logueur/bench_logOut.py
+"""
+
+import os
+import sys
+import time
+import timeit
+import tempfile
+
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopic, LogTopicFilter
+from Logueur.log_message import LogMessage
+from Logueur.log_out import BaseLogHandler, ConsoleLogHandler, FileLogHandler
+
+class _NullLogHandler(BaseLogHandler):
+    """ Handler writing nothing """
+    def _write(self, msg:LogMessage) -> None:
+        pass
+
+def _factoryLt(self:LogLevel, other) -> bool:
+    """ self < other, as LogLevel.__lt__ was before the precomputed table """
+    if not isinstance(other,(LogLevel,int,str)):
+        return False
+    if isinstance(other,(int,str)):
+        other = LogLevel.factory(other)
+    return self.value < other.value
+def _factoryFiltrate(handler:BaseLogHandler, msg:LogMessage) -> bool:
+    """ BaseLogHandler._filtrate, as it was before the precomputed table """
+    if _factoryLt(msg.level, handler.level):
+        return False
+    return handler.filter.match(msg.topic)
+
+def bench_filtrate(number:int=200000) -> dict[str,float]:
+    """ Cost of the filtering of a message by a handler, in seconds """
+    handler = _NullLogHandler(LogLevel.INFO, LogTopicFilter("#"))
+    accepted = LogMessage("body", LogLevel.WARNING, LogTopic("a.topic"))
+    rejected = LogMessage("body", LogLevel.DEBUG, LogTopic("a.topic"))
+    return {
+        "factory.accepted": timeit.timeit(lambda: _factoryFiltrate(handler,accepted), number=number) / number,
+        "factory.rejected": timeit.timeit(lambda: _factoryFiltrate(handler,rejected), number=number) / number,
+        "table.accepted": timeit.timeit(lambda: handler._filtrate(accepted), number=number) / number,
+        "table.rejected": timeit.timeit(lambda: handler._filtrate(rejected), number=number) / number,
+    }
+def bench_levelComparison(number:int=200000) -> dict[str,float]:
+    """ Cost of the comparison of a level with a level, an int and a str, in seconds """
+    level = LogLevel.INFO
+    results = dict()
+    for name, other in (("level",LogLevel.WARNING),("int",2),("str","WARNING")):
+        results[f"factory.{name}"] = timeit.timeit(lambda: _factoryLt(level,other), number=number) / number
+        results[f"table.{name}"] = timeit.timeit(lambda: level < other, number=number) / number
+    return results
+
+class _ReopenFileLogHandler(BaseLogHandler):
+    """ Handler reopening the file for each message, as FileLogHandler did """
+    def __init__(self, level:LogLevel, filter:LogTopicFilter, filename:str) -> None:
+        super().__init__(level, filter)
+        self._filename = filename
+    def _write(self, msg:LogMessage) -> None:
+        with open(self._filename,'a') as f:
+            f.write(str(msg))
+
+def _messagesPerSecond(handler:BaseLogHandler, messages:list[LogMessage]) -> float:
+    """ Number of messages emitted per second by the handler """
+    start = time.perf_counter()
+    for msg in messages:
+        handler.emit(msg)
+    handler.close()
+    return len(messages) / (time.perf_counter() - start)
+
+def bench_fileThroughput(number:int=20000) -> dict[str,float]:
+    """ Throughput of the file handlers, in messages per second """
+    messages = [LogMessage(f"message number {i}", LogLevel.INFO, LogTopic("a.topic")) for i in range(number)]
+    level, filter = LogLevel.DEBUG, LogTopicFilter("#")
+    results = dict()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "bench.log")
+        results["reopen"] = _messagesPerSecond(_ReopenFileLogHandler(level,filter,filename), messages)
+        for policy in FileLogHandler._flushPolicies:
+            handler = FileLogHandler(level, filter, filename, action="overwrite", flushPolicy=policy)
+            results[policy] = _messagesPerSecond(handler, messages)
+    return results
+
+def bench_consoleThroughput(number:int=20000) -> dict[str,float]:
+    """ Throughput of ConsoleLogHandler writing to /dev/null, in messages per second """
+    messages = [LogMessage(f"message number {i}", LogLevel.INFO, LogTopic("a.topic")) for i in range(number)]
+    level, filter = LogLevel.DEBUG, LogTopicFilter("#")
+    results = dict()
+    stdout, stderr = sys.stdout, sys.stderr
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = sys.stderr = devnull
+        try:
+            for color in (False, True):
+                name = "color" if color else "plain"
+                handler = ConsoleLogHandler(level, filter, supportColor=color)
+                results[name] = _messagesPerSecond(handler, messages)
+                start = time.perf_counter()
+                handler.emit_batch(messages)
+                results[f"{name}.batch"] = number / (time.perf_counter() - start)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+    return results
+
+def main():
+    print(f"{'_filtrate':<10} {'factory (ns)':>14} {'table (ns)':>14}")
+    results = bench_filtrate()
+    for case in ("accepted","rejected"):
+        print(f"{case:<10} {results[f'factory.{case}']*1e9:>14.1f} {results[f'table.{case}']*1e9:>14.1f}")
+    print()
+    print(f"{'level <':<10} {'factory (ns)':>14} {'table (ns)':>14}")
+    results = bench_levelComparison()
+    for case in ("level","int","str"):
+        print(f"{case:<10} {results[f'factory.{case}']*1e9:>14.1f} {results[f'table.{case}']*1e9:>14.1f}")
+    print()
+    print(f"{'file':<10} {'messages/s':>14}")
+    for case, throughput in bench_fileThroughput().items():
+        print(f"{case:<10} {throughput:>14.0f}")
+    print()
+    print(f"{'console':<12} {'messages/s':>12}")
+    for case, throughput in bench_consoleThroughput().items():
+        print(f"{case:<12} {throughput:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Benchmark for log messages' topic generation
+# ---------------------------------------------------------
+# ./tests/bench_Logueur/bench_logTopic.py
+""" Benchmark for the log_topic module
+
+Compare the per-call cost of the topic generation by walking the
+frames with the previous one, using inspect.stack(), at different
+depths of the execution stack, and measure the cost of a cached
+topic and of the matching of the topic filters.
+
+Run it from the root of the repository:
+    PYTHONPATH=. python tests/bench_Logueur/bench_logTopic.py
+"""
+
+import inspect
+import timeit
+
+from Logueur.log_topic import LogTopic, LogTopicFilter, _generateFromStack, _generateFromModule
+
+DEPTHS = (10, 50, 200)
+
+def _inspectStack(n_frame:int) -> str:
+    """ Topic generation by 'stack', using inspect.stack() """
+    stack = inspect.stack()[n_frame:]
+    return ".".join(f.function for f in reversed(stack) if f.function != "<module>")
+def _inspectModule(n_frame:int) -> str:
+    """ Topic generation by 'module', using inspect.stack() """
+    frame_info = inspect.stack()[n_frame]
+    topics = [inspect.getmodule(frame_info.frame).__name__.rsplit(".",1)[-1]]
+    topics.extend(frame_info.frame.f_code.co_qualname.rsplit(".",1))
+    return ".".join(topics)
+
+def _atDepth(depth:int, func, *args):
+    """ Call func(*args) with depth more frames on the stack """
+    if depth == 0:
+        return func(*args)
+    return _atDepth(depth-1, func, *args)
+def _timePerCall(depth:int, func, number:int) -> float:
+    """ Time a call of func(1) at the given depth, in seconds """
+    return _atDepth(depth, lambda: timeit.timeit(lambda: func(1), number=number)) / number
+
+def bench_topicGeneration(number:int=200) -> dict[str,float]:
+    """ Per-call cost of the topic generation, in seconds """
+    results = dict()
+    for depth in DEPTHS:
+        results[f"stack.inspect.{depth}"] = _timePerCall(depth, _inspectStack, number)
+        results[f"stack.frames.{depth}"] = _timePerCall(depth, _generateFromStack, number)
+        results[f"module.inspect.{depth}"] = _timePerCall(depth, _inspectModule, number)
+        results[f"module.frames.{depth}"] = _timePerCall(depth, _generateFromModule, number)
+    return results
+
+def bench_topicFactory(number:int=10000) -> dict[str,float]:
+    """ Per-call cost of LogTopic.topicFactory by 'module', with its cache, in seconds """
+    results = dict()
+    factory = lambda _: LogTopic.topicFactory("module",3)
+    for depth in DEPTHS:
+        results[f"module.cached.{depth}"] = _timePerCall(depth, factory, number)
+    return results
+
+def bench_filterMatch(number:int=200000) -> dict[str,float]:
+    """ Per-call cost of LogTopicFilter.match, for a matching and an other topic, in seconds """
+    matching = LogTopic("app.service.db.query")
+    other = LogTopic("other.service.db.query")
+    results = dict()
+    for pattern in ("#", "app.#", "app.*.db.*", "app.service.db.query"):
+        filter = LogTopicFilter(pattern)
+        results[f"{pattern}.match"] = timeit.timeit(lambda: filter.match(matching), number=number) / number
+        results[f"{pattern}.other"] = timeit.timeit(lambda: filter.match(other), number=number) / number
+    return results
+
+def main():
+    results = bench_topicGeneration()
+    print(f"{'method':<8} {'depth':>6} {'inspect (us)':>14} {'frames (us)':>14} {'speedup':>9}")
+    for method in ("stack","module"):
+        for depth in DEPTHS:
+            old = results[f"{method}.inspect.{depth}"]
+            new = results[f"{method}.frames.{depth}"]
+            print(f"{method:<8} {depth:>6} {old*1e6:>14.2f} {new*1e6:>14.2f} {old/new:>8.1f}x")
+    print()
+    results = bench_topicFactory()
+    print(f"{'method':<8} {'depth':>6} {'cached (us)':>14}")
+    for depth in DEPTHS:
+        print(f"{'module':<8} {depth:>6} {results[f'module.cached.{depth}']*1e6:>14.3f}")
+    print()
+    print(f"{'filter.match':<26} {'ns':>10}")
+    for case, duration in bench_filterMatch().items():
+        print(f"{case:<26} {duration*1e9:>10.1f}")
+
+if __name__ == "__main__":
+    main()
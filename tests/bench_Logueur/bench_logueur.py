@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Benchmark for the Logueur
+# ---------------------------------------------------------
+# ./tests/bench_Logueur/bench_logueur.py
+""" Benchmark for the logueur module
+
+Measure the cost of a call of the level methods of the Logueur when
+no output accept the level, which should return before any work, and
+when the message is created and given to an output writing nothing.
+
+Run it from the root of the repository:
+    PYTHONPATH=. python tests/bench_Logueur/bench_logueur.py
+"""
+
+import timeit
+
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopicFilter
+from Logueur.log_message import LogMessage
+from Logueur.log_out import BaseLogHandler
+from Logueur.logueur import Logueur
+
+class _NullLogHandler(BaseLogHandler):
+    """ Handler writing nothing """
+    def _write(self, msg:LogMessage) -> None:
+        pass
+
+def bench_disabledLevel(number:int=500000) -> dict[str,float]:
+    """ Cost of a call of a level method whose level is disabled, in seconds """
+    log = Logueur([_NullLogHandler(LogLevel.WARNING, LogTopicFilter("#"))])
+    return {
+        "plain": timeit.timeit(lambda: log.debug("body"), number=number) / number,
+        "template": timeit.timeit(lambda: log.debug("body {} {}", 1, "two", topic="a.topic"), number=number) / number,
+        "callable": timeit.timeit(lambda: log.info(lambda: "body"), number=number) / number,
+    }
+def bench_enabledLevel(number:int=100000) -> dict[str,float]:
+    """ Cost of a call of a level method, its message given to a handler writing nothing, in seconds """
+    results = dict()
+    for method in ("module","stack"):
+        log = Logueur([_NullLogHandler(LogLevel.DEBUG, LogTopicFilter("#"))], topicGenerationMethode=method)
+        results[method] = timeit.timeit(lambda: log.info("body {}", 1), number=number) / number
+    results["topic"] = timeit.timeit(lambda: log.info("body {}", 1, topic="a.topic"), number=number) / number
+    return results
+
+def main():
+    print(f"{'disabled':<10} {'ns':>10}")
+    for case, duration in bench_disabledLevel().items():
+        print(f"{case:<10} {duration*1e9:>10.1f}")
+    print()
+    print(f"{'enabled':<10} {'us':>10}")
+    for case, duration in bench_enabledLevel().items():
+        print(f"{case:<10} {duration*1e6:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Process for running benchmarks
+# ---------------------------------------------------------
+# ./tests/run_benchmarks.py
+""" Run the benchmarks of the hot paths, and compare them to a baseline
+
+    PYTHONPATH=. python tests/run_benchmarks.py [--save] [--compare] [-b logTopic.*]
+
+The results are stored as JSON in a baseline file. When comparing, a
+benchmark is a regression if it's slower than its baseline by more than
+its threshold, a ratio (0.25 -> 25% slower), and the exit status is 1.
+The thresholds can be given for a pattern of benchmark names, on the
+command line or in the 'thresholds' object of the baseline file.
+
+The baselines depend on the machine: save one on the machine running
+the comparison.
+"""
+
+import re
+import sys
+import json
+import inspect
+import argparse
+import datetime
+import platform
+import importlib
+
+# Benchmarks: (module, function, unit, cases kept)
+# The 's' unit is a duration per call, lower is better, the 'msg/s' unit
+# is a throughput, higher is better.
+BENCHMARKS = [
+    ("bench_logueur", "bench_disabledLevel", "s", None),
+    ("bench_logueur", "bench_enabledLevel", "s", None),
+    ("bench_logTopic", "bench_topicGeneration", "s", r"\.frames\."), # The inspect cases are the old implementation
+    ("bench_logTopic", "bench_topicFactory", "s", None),
+    ("bench_logTopic", "bench_filterMatch", "s", None),
+    ("bench_logMessage", "bench_messageConstruction", "s", r"^(public|trusted)$"),
+    ("bench_logMessage", "bench_rendering", "s", None),
+    ("bench_logOut", "bench_filtrate", "s", r"^table\."),
+    ("bench_logOut", "bench_consoleThroughput", "msg/s", None),
+    ("bench_logOut", "bench_fileThroughput", "msg/s", r"^(?!reopen$)"),
+]
+DEFAULT_BASELINE = "tests/bench_Logueur/baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+def _compilePatterns(patterns:list[str]) -> re.Pattern:
+    """ Compile the patterns of benchmark names, '*' matching anything """
+    return re.compile("|".join(re.escape(pattern).replace(r"\*", ".*") for pattern in patterns))
+
+def _benchmarkName(module:str, function:str) -> str:
+    """ 'bench_logTopic', 'bench_filterMatch' -> 'logTopic.filterMatch' """
+    return f"{module[len('bench_'):]}.{function[len('bench_'):]}"
+
+def run_benchmarks(patterns:list[str], repeat:int=3, scale:float=1.0, verbose:bool=True) -> dict[str,dict]:
+    """ Run the benchmarks whose name match one of the patterns
+
+    Each benchmark is run repeat times, keeping its best result, with
+    its number of calls multiplied by scale.
+
+    Return:
+    dict[str,dict]
+        The name of the case -> {"value": float, "unit": str}
+    """
+    pattern = _compilePatterns(patterns) if patterns else None
+    results = dict()
+    for module, function, unit, cases in BENCHMARKS:
+        name = _benchmarkName(module, function)
+        if pattern and not pattern.fullmatch(name):
+            continue
+        bench = getattr(importlib.import_module(f"bench_Logueur.{module}"), function)
+        number = max(1, int(inspect.signature(bench).parameters["number"].default * scale))
+        casePattern = re.compile(cases) if cases else None
+        best = dict()
+        for _ in range(repeat):
+            for case, value in bench(number=number).items():
+                if casePattern and not casePattern.search(case):
+                    continue
+                if case not in best:
+                    best[case] = value
+                else:
+                    best[case] = min(best[case], value) if unit == "s" else max(best[case], value)
+        for case, value in best.items():
+            results[f"{name}.{case}"] = {"value": value, "unit": unit}
+            if verbose:
+                print(f"{f'{name}.{case}':<56} {_formatValue(value, unit):>16}")
+    return results
+
+def _formatValue(value:float, unit:str) -> str:
+    """ A value with a readable unit """
+    if unit == "msg/s":
+        return f"{value:,.0f} msg/s"
+    if value >= 1e-3:
+        return f"{value*1e3:.3f} ms"
+    if value >= 1e-6:
+        return f"{value*1e6:.3f} us"
+    return f"{value*1e9:.1f} ns"
+
+def compare(results:dict[str,dict], baseline:dict[str,dict], thresholds:dict[str,float],
+            default:float=DEFAULT_THRESHOLD) -> list[str]:
+    """ Compare the results to the baseline, and print the comparison
+
+    The threshold of a case is the one of the last pattern matching its
+    name, or the default one.
+
+    Return:
+    list[str]
+        The names of the regressed cases.
+    """
+    compiled = [(_compilePatterns([pattern]), threshold) for pattern, threshold in thresholds.items()]
+    regressions = list()
+    print(f"{'benchmark':<56} {'baseline':>16} {'current':>16} {'change':>8}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or reference["unit"] != result["unit"]:
+            print(f"{name:<56} {'-':>16} {_formatValue(result['value'], result['unit']):>16}      new")
+            continue
+        threshold = default
+        for pattern, value in compiled:
+            if pattern.fullmatch(name):
+                threshold = value
+        # Slowdown, positive when the case is slower:
+        if result["unit"] == "msg/s":
+            slowdown = reference["value"] / result["value"] - 1
+        else:
+            slowdown = result["value"] / reference["value"] - 1
+        status = ""
+        if slowdown > threshold:
+            regressions.append(name)
+            status = "  REGRESSION"
+        print(f"{name:<56} {_formatValue(reference['value'], result['unit']):>16} "
+              f"{_formatValue(result['value'], result['unit']):>16} {slowdown:>+8.1%}{status}")
+    return regressions
+
+def _parseThreshold(value:str) -> tuple[str,float]:
+    """ 'pattern=ratio' -> (pattern, ratio) """
+    pattern, _, ratio = value.rpartition("=")
+    try:
+        return pattern, float(ratio)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid threshold '{value}', expected 'pattern=ratio'")
+
+if __name__ == '__main__':
+
+    # Arguments Parser:
+    # -----------------
+    parser = argparse.ArgumentParser(description='Run the benchmarks.')
+    parser.add_argument('-b','--benchmarks', nargs='+', default=list(),
+                        help="Benchmark names to run, like 'logTopic.filterMatch', '*' matching anything. If none provided, run all")
+    parser.add_argument('-r','--repeat', type=int, default=3, help="Number of runs of each benchmark, the best one being kept")
+    parser.add_argument('--scale', type=float, default=1.0, help="Factor of the number of calls of each benchmark")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f"The baseline file, '{DEFAULT_BASELINE}' by default")
+    parser.add_argument('--save', action='store_true', help="Save the results in the baseline file")
+    parser.add_argument('--compare', action='store_true', help="Compare the results to the baseline file, exit with 1 on regression")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help=f"The default regression threshold, as a ratio ({DEFAULT_THRESHOLD} by default)")
+    parser.add_argument('-t','--case-threshold', nargs='+', type=_parseThreshold, dest="case_thresholds", default=list(),
+                        help="Regression thresholds of benchmark names, as 'pattern=ratio'")
+    args = parser.parse_args()
+
+    # Load the baseline:
+    # ------------------
+    stored = {"thresholds": dict(), "results": dict()}
+    if args.compare or args.save:
+        try:
+            with open(args.baseline, encoding="utf-8") as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            if args.compare:
+                print(f"Error: no baseline file '{args.baseline}', create it with --save", file=sys.stderr)
+                sys.exit(2)
+
+    # Start Process:
+    # --------------
+    results = run_benchmarks(args.benchmarks, args.repeat, args.scale, verbose=not args.compare)
+    regressions = list()
+    if args.compare:
+        thresholds = dict(stored.get("thresholds", dict()))
+        thresholds.update(args.case_thresholds)
+        default = args.threshold if args.threshold is not None else stored.get("threshold", DEFAULT_THRESHOLD)
+        regressions = compare(results, stored.get("results", dict()), thresholds, default)
+        print(f"\n{len(regressions)} regression(s) in {len(results)} benchmarks")
+
+    # Save the baseline:
+    # ------------------
+    if args.save:
+        stored.setdefault("thresholds", dict()).update(args.case_thresholds)
+        if args.threshold is not None:
+            stored["threshold"] = args.threshold
+        stored.setdefault("results", dict()).update(results)
+        stored["machine"] = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(stored, file, indent=4, sort_keys=True)
+        print(f"Baseline saved in '{args.baseline}'")
+
+    # Exit:
+    # -----
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Handler used by the tests of the log outputs
+# ---------------------------------------------------------
+# ./tests/test_Logueur/mock_handler.py
+""" Mock handler shared by the tests """
+
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopicFilter
+from Logueur.log_message import LogMessage
+from Logueur.log_out import BaseLogHandler
+
+class MockLogHandler(BaseLogHandler):
+    """ Handler keeping the messages written, and counting the flushes
+
+    The writes raise the exception error, if it's set.
+    """
+    def __init__(self, level:LogLevel=LogLevel.DEBUG, filter:LogTopicFilter=LogTopicFilter("#")) -> None:
+        super().__init__(level, filter)
+        self.messages = list()
+        self.error = None # Exception raised by the writes
+        self.flushed = 0
+        self.closed = False
+    @property
+    def bodies(self) -> list[str]:
+        return [msg.body for msg in self.messages]
+    def _write(self, msg:LogMessage) -> None:
+        if self.error is not None:
+            raise self.error
+        self.messages.append(msg)
+    def flush(self) -> None:
+        self.flushed += 1
+    def close(self) -> None:
+        self.closed = True
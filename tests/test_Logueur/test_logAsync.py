@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output for asyncio
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logAsync.py
+""" Tests for the log_async module """
+
+import io
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from Logueur.log_async import *
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopic, LogTopicFilter
+from Logueur.logueur import Logueur
+
+class ThreadLogHandler(BaseLogHandler):
+    """ Handler keeping the messages written, and the threads writing them """
+    def __init__(self, level:LogLevel=LogLevel.DEBUG) -> None:
+        super().__init__(level, LogTopicFilter("#"))
+        self.messages = list()
+        self.threads = set()
+        self.closed = False
+    def _write(self, msg:LogMessage) -> None:
+        self.threads.add(threading.current_thread())
+        self.messages.append(msg)
+    def close(self) -> None:
+        self.closed = True
+
+
+class test_AsyncLogHandler(unittest.IsolatedAsyncioTestCase):
+    """ Tests for the AsyncLogHandler class, and the async methods of Logueur
+
+    The messages must be written outside of the thread of the event
+    loop, and the topics must be the one of the calling coroutine.
+    """
+
+    def setUp(self):
+        self.out = ThreadLogHandler(LogLevel.INFO)
+        self.handler = AsyncLogHandler(self.out)
+        self.log = Logueur(self.handler)
+
+    async def test_levelMethods(self):
+        await self.log.adebug("debug")
+        await self.log.ainfo("info {}", "message")
+        await self.log.aerror("error")
+        await self.handler.aclose()
+        self.assertEqual([msg.body for msg in self.out.messages], ["info message","error"])
+        self.assertNotIn(threading.current_thread(), self.out.threads)
+        self.assertTrue(self.out.closed)
+    async def test_topic(self):
+        await self.log.ainfo("info")
+        await self.handler.aflush()
+        self.assertEqual(self.out.messages[0].topic, "test_logAsync.test_AsyncLogHandler.test_topic")
+    async def test_syncEmit(self):
+        self.log.info("from sync code")
+        await self.handler.aflush()
+        self.assertEqual([msg.body for msg in self.out.messages], ["from sync code"])
+    async def test_otherThread(self):
+        await self.log.ainfo("start") # Start the worker in this loop
+        thread = threading.Thread(target=self.log.info, args=("from a thread",))
+        thread.start(); thread.join()
+        await asyncio.sleep(0.01)
+        await self.handler.aflush()
+        self.assertEqual([msg.body for msg in self.out.messages], ["start","from a thread"])
+    async def test_dropped(self):
+        handler = AsyncLogHandler(self.out, maxsize=1)
+        for _ in range(3):
+            handler.emit(LogMessage("info",LogLevel.INFO,LogTopic("topic")))
+        self.assertEqual(handler.dropped, 2)
+        await handler.aclose()
+        self.assertEqual(len(self.out.messages), 1)
+
+    async def test_failingBody(self):
+        def fail():
+            raise RuntimeError("render failed")
+        with mock.patch("sys.stderr", new_callable=io.StringIO):
+            for body in ("a", fail, "b"):
+                self.handler.emit(LogMessage(body,LogLevel.INFO,LogTopic("topic")))
+            await self.handler.aflush()
+        self.assertEqual([msg.body for msg in self.out.messages], ["a","b"])
+        self.assertEqual(self.handler.errors, 1)
+
+    def test_withoutLoop(self):
+        self.log.info("without loop")
+        self.assertEqual([msg.body for msg in self.out.messages], ["without loop"])
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output in a compact binary format
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logBinary.py
+""" Tests for the log_binary and decode modules """
+
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from Logueur.log_binary import *
+from Logueur.log_binary import _encodeVarint, _decodeVarint
+from Logueur.log_topic import LogTopic
+from Logueur import decode
+
+class test_varint(unittest.TestCase):
+
+    def test_roundTrip(self):
+        for n in (0, 1, 127, 128, 300, 2**32, 2**63):
+            data = _encodeVarint(n)
+            self.assertEqual(_decodeVarint(data, 0), (n, len(data)))
+        self.assertEqual(len(_encodeVarint(127)), 1)
+        self.assertEqual(len(_encodeVarint(128)), 2)
+        with self.assertRaises(IndexError):
+            _decodeVarint(_encodeVarint(300)[:1], 0)
+
+class test_BinaryLogHandler(unittest.TestCase):
+    """ Tests for the BinaryLogHandler and BinaryLogReader classes
+
+    We write messages in a binary log file, and check that the
+    reader give them back, whatever the size of the chunks read.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.bin")
+        self.msgs = [LogMessage(f"message {i} é",LogLevel.INFO if i%2 else LogLevel.ERROR,
+                                LogTopic(f"topic.{i%3}"),timestamp=1700000000.123456+i) for i in range(10)]
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _handler(self, **kwargs) -> BinaryLogHandler:
+        return BinaryLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,**kwargs)
+    def assertMessages(self, msgs:list, expected:list) -> None:
+        self.assertEqual([(msg.body,msg.level,msg.topic.topic) for msg in msgs],
+                         [(msg.body,msg.level,msg.topic.topic) for msg in expected])
+        for msg, other in zip(msgs, expected):
+            self.assertAlmostEqual(msg.time, other.time, places=5)
+
+    def test_readWrite(self):
+        with self._handler() as log:
+            for msg in self.msgs[:5]:
+                log.emit(msg)
+            log.emit_batch(self.msgs[5:])
+        for chunkSize in (1, 7, 1<<20):
+            reader = BinaryLogReader(self.filename, chunkSize)
+            self.assertMessages(list(reader), self.msgs)
+            self.assertEqual(reader.topics, ["topic.0","topic.1","topic.2"])
+    def test_size(self):
+        with self._handler() as log:
+            log.emit_batch(self.msgs)
+        text = "".join(str(msg) for msg in self.msgs).encode("utf-8")
+        self.assertLess(os.path.getsize(self.filename), len(text))
+    def test_append(self):
+        with self._handler() as log:
+            log.emit_batch(self.msgs[:3])
+        with open(self.filename,"ab") as f: # Record cut by a crash
+            f.write(b"\x20\x01")
+        with self._handler(action="append") as log:
+            log.emit_batch(self.msgs[3:])
+        reader = BinaryLogReader(self.filename)
+        self.assertMessages(list(reader), self.msgs)
+        self.assertEqual(len(reader.topics), 3)
+    def test_failedWrite(self):
+        with self._handler() as log:
+            with mock.patch.object(log, "_append", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    log.emit(self.msgs[0])
+                with self.assertRaises(OSError):
+                    log.emit_batch(self.msgs[1:3])
+            # The topics of the lost records are defined again:
+            log.emit_batch(self.msgs[:3])
+        reader = BinaryLogReader(self.filename)
+        self.assertMessages(list(reader), self.msgs[:3])
+        self.assertEqual(reader.topics, ["topic.0","topic.1","topic.2"])
+    def test_notBinary(self):
+        with open(self.filename,"w") as f:
+            f.write("[INFO] topic\nbody\n\n")
+        with self.assertRaises(ValueError):
+            list(BinaryLogReader(self.filename))
+    def test_corrupted(self):
+        topic = b"\xfftopic"
+        header = b"LOGBIN1\n" + _encodeVarint(len(topic)) + topic
+        time = (0).to_bytes(8,"little")
+        for record in (b"\x0a\x00" + time + b"x", # Unknown level
+                       b"\x0a\x02\x07" + time, # Unknown topic
+                       b"\x02\x00\x00"): # Truncated time
+            with open(self.filename,"wb") as f:
+                f.write(header + _encodeVarint(len(record)) + record)
+            with self.assertRaisesRegex(ValueError, f"corrupted record at offset {len(header)}"):
+                list(BinaryLogReader(self.filename))
+            with self.assertRaisesRegex(ValueError, "corrupted record"):
+                self._handler(action="append")
+        with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr, mock.patch("sys.stdout", new_callable=io.StringIO):
+            self.assertEqual(decode.main([self.filename]), 1)
+        self.assertEqual(stderr.getvalue(), f"Error: corrupted record at offset {len(header)}\n")
+    def test_decode(self):
+        with self._handler() as log:
+            log.emit_batch(self.msgs[:2])
+        output = os.path.join(self.tmpdir.name,"test.txt")
+        self.assertEqual(decode.main([self.filename,"-o",output]), 0)
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(f.read(), str(self.msgs[0])+str(self.msgs[1]))
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            decode.main([self.filename,"--format","{level}:{body}\n"])
+        self.assertEqual(stdout.getvalue(), "ERROR:message 0 é\nINFO:message 1 é\n")
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output bypassing a slow or failing handler
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logBreaker.py
+""" Tests for the log_breaker module """
+
+import io
+import unittest
+from unittest import mock
+
+from Logueur.log_breaker import *
+from Logueur.logueur import Logueur
+from .mock_handler import MockLogHandler
+
+class Clock():
+    """ Fake monotonic clock """
+    def __init__(self) -> None:
+        self.now = 0.0
+    def __call__(self) -> float:
+        return self.now
+
+class SlowLogHandler(MockLogHandler):
+    """ Handler keeping the messages written, taking delay seconds of the clock """
+    def __init__(self, clock:Clock, level:LogLevel=LogLevel.DEBUG) -> None:
+        super().__init__(level)
+        self.clock = clock
+        self.delay = 0.0
+    def _write(self, msg:LogMessage) -> None:
+        self.clock.now += self.delay
+        super()._write(msg)
+
+
+class test_CircuitBreakerLogHandler(unittest.TestCase):
+    """ Tests for the CircuitBreakerLogHandler class
+
+    We check the trips after slow and failed writes, the fallback,
+    the probes and the recoveries, with a fake clock.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        patcher = mock.patch("Logueur.log_breaker._monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.target = SlowLogHandler(self.clock)
+        self.fallback = SlowLogHandler(self.clock)
+        self.breaker = CircuitBreakerLogHandler(self.target, self.fallback, maxLatency=0.1, maxFailures=3, recoveryInterval=10)
+        self.log = Logueur([self.breaker])
+
+    def test_closed(self):
+        for i in range(5):
+            self.log.info(f"msg {i}", topic="app")
+        self.assertEqual(self.target.bodies, [f"msg {i}" for i in range(5)])
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.fallback.bodies, [])
+
+    def test_slow_trip(self):
+        self.target.delay = 1.0
+        for i in range(5):
+            self.log.info(f"msg {i}", topic="app")
+        self.assertEqual(self.breaker.state, "open")
+        self.assertEqual((self.breaker.trips, self.breaker.slow), (1, 3))
+        self.assertEqual(self.target.bodies, ["msg 0", "msg 1", "msg 2"])
+        self.assertTrue(self.fallback.bodies[0].startswith("SlowLogHandler bypassed after 3 slow or failed writes"))
+        self.assertEqual(self.fallback.bodies[1:], ["msg 3", "msg 4"])
+
+    def test_failures_reset(self):
+        self.target.delay = 1.0
+        self.log.info("a", topic="app")
+        self.log.info("b", topic="app")
+        self.target.delay = 0.0
+        self.log.info("c", topic="app")
+        self.target.delay = 1.0
+        self.log.info("d", topic="app")
+        self.log.info("e", topic="app")
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_error_trip(self):
+        self.target.error = OSError("No space left on device")
+        for i in range(4):
+            self.log.info(f"msg {i}", topic="app")
+        self.assertEqual(self.breaker.state, "open")
+        self.assertEqual(self.breaker.errors, 3)
+        self.assertIn("No space left on device", self.fallback.bodies[2])
+        self.assertEqual([body for body in self.fallback.bodies if body.startswith("msg")], ["msg 0", "msg 1", "msg 2", "msg 3"])
+
+    def test_recovery(self):
+        self.target.error = OSError("No space left on device")
+        for i in range(3):
+            self.log.info(f"msg {i}", topic="app")
+        self.clock.now += 10
+        self.log.info("failed probe", topic="app")
+        self.assertEqual(self.breaker.state, "open")
+        self.assertEqual(self.breaker.errors, 4)
+
+        self.target.error = None
+        self.clock.now += 5
+        self.log.info("bypassed", topic="app")
+        self.clock.now += 5
+        self.log.info("probe", topic="app")
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.recoveries, 1)
+        self.assertEqual(self.target.bodies, ["probe", "SlowLogHandler recovered, writing the messages again"])
+        self.assertEqual(self.fallback.bodies[-2:], ["bypassed", "SlowLogHandler recovered, writing the messages again"])
+
+    def test_batch(self):
+        self.target.delay = 0.08 # 0.16s for the batch, 0.2s allowed
+        self.log.log_many([LogMessage("a",LogLevel.INFO,LogTopic("app")), LogMessage("b",LogLevel.INFO,LogTopic("app"))])
+        self.assertEqual(self.breaker.slow, 0)
+        self.assertAlmostEqual(self.breaker.latency, 0.016)
+
+    def test_no_fallback(self):
+        breaker = CircuitBreakerLogHandler(self.target, maxFailures=1)
+        self.target.error = OSError("No space left on device")
+        with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            for _ in range(3):
+                breaker.emit(LogMessage("a",LogLevel.INFO,LogTopic("app")))
+        self.assertIn("[WARNING] Logueur.breaker", stderr.getvalue())
+        self.assertEqual(breaker.dropped, 3)
+
+    def test_type_check(self):
+        with self.assertRaises(ValueError):
+            CircuitBreakerLogHandler(self.target, fallback="stderr")
+        with self.assertRaises(ValueError):
+            CircuitBreakerLogHandler(self.target, maxLatency=0)
+        with self.assertRaises(ValueError):
+            CircuitBreakerLogHandler(self.target, maxFailures=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
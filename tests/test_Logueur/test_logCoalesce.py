@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output coalescing the duplicated messages
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logCoalesce.py
+""" Tests for the log_coalesce module """
+
+import unittest
+from time import sleep
+
+from Logueur.log_coalesce import *
+from Logueur.log_level import LogLevel
+from Logueur.log_topic import LogTopic
+from .mock_handler import MockLogHandler
+
+
+class test_CoalescingLogHandler(unittest.TestCase):
+    """ Tests for the CoalescingLogHandler class
+
+    We check the consecutive and the windowed duplicates, and the
+    aggregated messages written when the runs end.
+    """
+
+    def setUp(self) -> None:
+        self.target = MockLogHandler()
+
+    def _message(self, body:str, time:float, level:LogLevel=LogLevel.INFO, topic:str="topic") -> LogMessage:
+        return LogMessage._trusted(body,level,LogTopic(topic),timestamp=time)
+    def _bodies(self) -> list[str]:
+        return [msg.body for msg in self.target.messages]
+
+    def test_consecutive(self):
+        log = CoalescingLogHandler(self.target)
+        for i in range(5):
+            log.emit(self._message("retry", 10.0 + i))
+        log.emit(self._message("done", 20.0))
+        self.assertEqual(self._bodies(), ["retry", "retry (repeated 4 times in 4.000s)", "done"])
+        aggregated = self.target.messages[1]
+        self.assertEqual(aggregated.fields, {"repeated": 4, "span": 4.0})
+        self.assertEqual(aggregated.time, 14.0)
+        self.assertEqual(aggregated.level, LogLevel.INFO)
+        self.assertEqual(log.coalesced, 4)
+
+    def test_level_and_topic(self):
+        log = CoalescingLogHandler(self.target)
+        log.emit(self._message("a", 0.0))
+        log.emit(self._message("a", 1.0, level=LogLevel.WARNING))
+        log.emit(self._message("a", 2.0, topic="other"))
+        self.assertEqual(self._bodies(), ["a", "a", "a"])
+
+    def test_lazy_body(self):
+        log = CoalescingLogHandler(self.target)
+        for i in (1, 1, 2):
+            log.emit(LogMessage._trusted("value {}",LogLevel.INFO,LogTopic("topic"),args=(i,),timestamp=0.0))
+        self.assertEqual(self._bodies(), ["value 1", "value 1 (repeated 1 times in 0.000s)", "value 2"])
+
+    def test_no_duplicate(self):
+        log = CoalescingLogHandler(self.target)
+        log.emit_batch([self._message("a", 0.0), self._message("b", 1.0), self._message("a", 2.0)])
+        self.assertEqual(self._bodies(), ["a", "b", "a"])
+        log.flush()
+        self.assertEqual(len(self.target.messages), 3)
+
+    def test_flush(self):
+        log = CoalescingLogHandler(self.target)
+        log.emit_batch([self._message("a", 0.0), self._message("a", 0.5)])
+        log.flush()
+        self.assertEqual(self._bodies(), ["a", "a (repeated 1 times in 0.500s)"])
+        self.assertEqual(self.target.flushed, 1)
+
+    def test_window(self):
+        log = CoalescingLogHandler(self.target, window=10)
+        for time, body in [(0, "a"), (1, "b"), (2, "a"), (3, "b"), (4, "a"), (11, "c")]:
+            log.emit(self._message(body, time))
+        self.assertEqual(self._bodies(), ["a", "b", "a (repeated 2 times in 4.000s)", "b (repeated 1 times in 2.000s)", "c"])
+
+    def test_window_restart(self):
+        log = CoalescingLogHandler(self.target, window=10)
+        for time in (0, 5, 10, 12):
+            log.emit(self._message("a", time))
+        log.close()
+        self.assertEqual(self._bodies(), ["a", "a (repeated 1 times in 5.000s)", "a", "a (repeated 1 times in 2.000s)"])
+
+    def test_window_timer(self):
+        log = CoalescingLogHandler(self.target, window=0.05)
+        for time in (0, 0.01, 0.02):
+            log.emit(self._message("a", time))
+        self.assertEqual(self._bodies(), ["a"])
+        sleep(0.15) # Expired without other message
+        self.assertEqual(self._bodies(), ["a", "a (repeated 2 times in 0.020s)"])
+        log.close()
+        self.assertEqual(len(self.target.messages), 2)
+
+    def test_filtrate(self):
+        self.target.level = LogLevel.WARNING
+        log = CoalescingLogHandler(self.target)
+        log.emit(self._message("a", 0.0))
+        self.assertEqual(self._bodies(), [])
+
+    def test_type_check(self):
+        with self.assertRaises(ValueError):
+            CoalescingLogHandler(self.target, window=0)
+        with self.assertRaises(ValueError):
+            CoalescingLogHandler("handler")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the offset index of the log files
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logIndex.py
+""" Tests for the log_index and query modules """
+
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from Logueur.log_index import *
+from Logueur.log_topic import LogTopic
+from Logueur import query as queryModule
+
+class test_LogIndex(unittest.TestCase):
+    """ Tests for the LogIndex and IndexedFileLogHandler classes, and the queryLog function
+
+    We write messages with several levels, topics and times, and
+    check that the queries read back exactly the matching ones.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.log")
+        levels = list(LogLevel)
+        topics = ["app.db","app.http","app.http.client","other"]
+        self.msgs = [LogMessage(f"message {i} é\n\nwith an empty line" if i%7 == 0 else f"message {i}",
+                                levels[i%5],LogTopic(topics[i%4]),timestamp=1000+i*10) for i in range(40)]
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _write(self, **kwargs) -> None:
+        with IndexedFileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,**kwargs) as log:
+            log.emit_batch(self.msgs[:20])
+            for msg in self.msgs[20:]:
+                log.emit(msg)
+    def _expected(self, level:LogLevel=LogLevel.DEBUG, filter:str="#", start:float=0, end:float=1e10) -> list:
+        filter = LogTopicFilter(filter)
+        return [(msg.body,msg.level,msg.topic.topic) for msg in self.msgs
+                if msg.level >= level and filter.match(msg.topic) and start <= msg.time < end]
+    def _query(self, *args, **kwargs) -> list:
+        return [(msg.body,msg.level,msg.topic.topic) for msg in queryLog(self.filename,*args,**kwargs)]
+
+    def test_query(self):
+        self._write(bucketSize=50)
+        self.assertEqual(self._query(), self._expected())
+        self.assertEqual(self._query(LogLevel.ERROR), self._expected(LogLevel.ERROR))
+        self.assertEqual(self._query("WARNING",LogTopicFilter("app.*")), self._expected(LogLevel.WARNING,"app.*"))
+        self.assertEqual(self._query(filter=LogTopicFilter("app.http.#")), self._expected(filter="app.http.#"))
+        self.assertEqual(self._query(start=1095,end=1255), self._expected(start=1095,end=1255))
+        self.assertEqual([msg.time for msg in queryLog(self.filename,start=1095,end=1125)], [1100,1110,1120])
+    def test_incremental(self):
+        self._write(indexBlock=7)
+        self.assertEqual(len(LogIndex.load(self.filename+".idx")), 40)
+        with IndexedFileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,action="append") as log:
+            log.emit(self.msgs[0])
+        self.assertEqual(self._query(), self._expected()+[("message 0 é\n\nwith an empty line",LogLevel.DEBUG,"app.db")])
+    def test_build(self):
+        with FileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit_batch(self.msgs)
+        self.assertEqual(self._query(LogLevel.ERROR,LogTopicFilter("app.#")), self._expected(LogLevel.ERROR,"app.#"))
+        self.assertTrue(os.path.isfile(self.filename+".idx"))
+        self.assertEqual(self._query(start=0), []) # Unknown times
+        with IndexedFileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,action="append") as log:
+            log.emit(self.msgs[4])
+        self.assertEqual(self._query(LogLevel.FATAL,LogTopicFilter("app.db")),
+                         self._expected(LogLevel.FATAL,"app.db")+[("message 4",LogLevel.FATAL,"app.db")])
+    def test_appendedBetweenQueries(self):
+        with open(self.filename,"w",encoding="utf-8") as f:
+            f.write("[INFO] app\nfirst\n\n")
+        self.assertEqual([msg.body for msg in queryLog(self.filename)], ["first"])
+        with open(self.filename,"a",encoding="utf-8") as f:
+            f.write("[INFO] app\nsecond\n\n")
+        self.assertEqual([msg.body for msg in queryLog(self.filename)], ["first","second"])
+        self.assertEqual(LogIndex.load(self.filename+".idx").end, os.path.getsize(self.filename))
+        os.rename(self.filename, self.filename+".1") # Rotated, the new log file is indexed again
+        with open(self.filename,"w",encoding="utf-8") as f:
+            f.write("[INFO] app\nthird, after the rotation of the log file\n\n")
+        self.assertEqual([msg.body for msg in queryLog(self.filename)], ["third, after the rotation of the log file"])
+    def test_badLevel(self):
+        self._write()
+        with self.assertRaises(ValueError):
+            self._query("VERBOSE")
+
+    def test_main(self):
+        self._write()
+        with mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            self.assertEqual(queryModule.main([self.filename,"--level","fatal","--topic","app.db","--until","1100"]), 0)
+        self.assertEqual(stdout.getvalue(), str(self.msgs[4]))
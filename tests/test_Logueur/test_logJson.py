@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output in the JSON Lines format
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logJson.py
+""" Tests for the log_json module """
+
+import os
+import json
+import datetime
+import tempfile
+import unittest
+
+from Logueur.log_json import *
+from Logueur.log_topic import LogTopic
+from Logueur.logueur import Logueur
+
+class test_JSONLinesLogHandler(unittest.TestCase):
+    """ Tests for the JSONLinesLogHandler class
+
+    We write messages with and without fields, and parse
+    back each line with the json module.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.jsonl")
+        self.handler = JSONLinesLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename)
+    def tearDown(self) -> None:
+        self.handler.close()
+        self.tmpdir.cleanup()
+
+    def _lines(self) -> list[dict]:
+        self.handler.flush()
+        with open(self.filename, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_message(self):
+        self.handler.emit(LogMessage('a "quoted"\nbody é',LogLevel.WARNING,LogTopic("a.topic"),timestamp=1700000000.5))
+        self.assertEqual(self._lines(), [{"level":"WARNING","topic":"a.topic","time":1700000000.5,
+                                          "body":'a "quoted"\nbody é'}])
+    def test_fields(self):
+        when = datetime.date(2024,1,2)
+        self.handler.emit(LogMessage("body",LogLevel.INFO,LogTopic("topic"),
+                                     fields={"user":"bob","count":3,"when":when,(1,2):"skipped"}))
+        self.assertEqual(self._lines()[0]["fields"], {"user":"bob","count":3,"when":"2024-01-02"})
+    def test_nonFinite(self):
+        fields = {"ratio":float("nan"),"limits":[1.5,float("inf"),(float("-inf"),)],"nested":{float("nan"):0.5},(1,2):"skipped"}
+        self.handler.emit(LogMessage("body",LogLevel.INFO,LogTopic("topic"),fields=fields))
+        self.handler.emit(LogMessage("body",LogLevel.INFO,LogTopic("topic"),fields={"ratio":0.5}))
+        def reject(constant):
+            raise ValueError(f"Invalid JSON constant {constant}")
+        with open(self.filename, encoding="utf-8") as f:
+            lines = [json.loads(line, parse_constant=reject) for line in f]
+        self.assertEqual(lines[0]["fields"], {"ratio":"nan","limits":[1.5,"inf",["-inf"]],"nested":{"nan":0.5}})
+        self.assertEqual(lines[1]["fields"], {"ratio":0.5})
+    def test_cachedHeads(self):
+        msgs = [LogMessage(f"body {i}",level,LogTopic(f"topic.{i%2}")) for i, level in enumerate(LogLevel)]
+        self.handler.emit_batch(msgs+msgs)
+        lines = self._lines()
+        self.assertEqual([(line["level"],line["topic"]) for line in lines],
+                         [(msg.level.name,msg.topic.topic) for msg in msgs+msgs])
+    def test_logueurFields(self):
+        log = Logueur([self.handler])
+        log.info("user {} logged in", "bob", topic="auth", fields={"user":"bob"})
+        with self.assertRaises(ValueError):
+            log.info("body", fields=["user"])
+        self.assertEqual(self._lines()[0]["body"], "user bob logged in")
+        self.assertEqual(self._lines()[0]["fields"], {"user":"bob"})
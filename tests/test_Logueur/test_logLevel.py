@@ -225,3 +225,21 @@ class test_LogLevel(unittest.TestCase):
 
         self.assertEqual("FATAL",test_int.name)
         self.assertEqual("FATAL",test_str.name)
+
+    # Operands outside of the precomputed table:
+    def test_otherOperands(self):
+        level = LogLevel(2)
+
+        self.assertTrue(level == "Warning", msg="Error asserting equal using a mixed case str")
+        self.assertTrue(level > "Info", msg="Error asserting greater than using a mixed case str")
+        self.assertFalse(level == [2], msg="Error asserting equal using an unsupported type")
+        self.assertFalse(level < None, msg="Error asserting lower than using an unsupported type")
+        with self.assertRaises(KeyError):
+            level < "NOT_A_LEVEL"
+        with self.assertRaises(ValueError):
+            level < 42
+
+    def test_hash(self):
+        levels = {LogLevel.DEBUG:"debug", LogLevel.FATAL:"fatal"}
+        self.assertEqual("debug",levels[LogLevel(0)])
+        self.assertEqual(hash(LogLevel.FATAL),hash(4))
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the rate limiting of the log messages
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logLimit.py
+""" Tests for the log_limit module """
+
+import time
+import unittest
+from unittest import mock
+
+from Logueur.log_limit import *
+from Logueur.logueur import Logueur
+from .mock_handler import MockLogHandler
+
+
+class test_LogRateLimiter(unittest.TestCase):
+    """ Tests for the LogRateLimiter class
+
+    We check the token buckets and the sampling, with a fake clock,
+    the topics matching no rules, the cache of the limits, and the
+    summaries. The summary timer isn't armed with the fake clock.
+    """
+
+    def setUp(self) -> None:
+        self.now = 1000.0
+        for target, value in (("_monotonic", lambda: self.now), ("_startTimer", mock.Mock())):
+            patcher = mock.patch(f"Logueur.log_limit.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _message(self, topic:str="app.loop", level:LogLevel=LogLevel.INFO) -> LogMessage:
+        return LogMessage("body",level,LogTopic(topic))
+    def _allowed(self, limiter:LogRateLimiter, n:int, **kwargs) -> int:
+        return sum(limiter.allow(self._message(**kwargs)) for _ in range(n))
+
+    def test_token_bucket(self):
+        limiter = LogRateLimiter().add_rule("app.#", rate=2, burst=5)
+        self.assertEqual(self._allowed(limiter, 10), 5)
+        self.now += 1
+        self.assertEqual(self._allowed(limiter, 10), 2)
+        self.now += 100
+        self.assertEqual(self._allowed(limiter, 10), 5)
+        self.assertEqual(limiter.suppressed, 18)
+
+    def test_unmatched_topic(self):
+        limiter = LogRateLimiter().add_rule("app.#", rate=1, burst=1)
+        self.assertEqual(self._allowed(limiter, 10, topic="other"), 10)
+        self.assertEqual(limiter.suppressed, 0)
+
+    def test_first_rule(self):
+        limiter = LogRateLimiter().add_rule("app.loop", rate=1, burst=2).add_rule("app.#", rate=1, burst=4)
+        self.assertEqual(self._allowed(limiter, 10, topic="app.loop"), 2)
+        self.assertEqual(self._allowed(limiter, 10, topic="app.other"), 4)
+
+    def test_topics_buckets(self):
+        limiter = LogRateLimiter().add_rule("app.*", rate=1, burst=3)
+        self.assertEqual(self._allowed(limiter, 10, topic="app.a"), 3)
+        self.assertEqual(self._allowed(limiter, 10, topic="app.b"), 3)
+
+    def test_lru_topics(self):
+        limiter = LogRateLimiter().add_rule("app.*", rate=0.001, burst=1)
+        with mock.patch("Logueur.log_limit._MAX_TOPICS", 2):
+            self.assertEqual(self._allowed(limiter, 2, topic="app.a"), 1)
+            self.assertEqual(self._allowed(limiter, 2, topic="app.b"), 1)
+            self.assertEqual(self._allowed(limiter, 1, topic="app.a"), 0)
+            # app.b is the least recently used, app.a keeps its bucket:
+            self.assertEqual(self._allowed(limiter, 2, topic="app.c"), 1)
+            self.assertEqual(list(limiter._limits), ["app.a", "app.c"])
+            self.assertEqual(self._allowed(limiter, 1, topic="app.a"), 0)
+
+    def test_max_level(self):
+        limiter = LogRateLimiter().add_rule("#", rate=1, burst=1, maxLevel=LogLevel.WARNING)
+        self.assertEqual(self._allowed(limiter, 10), 1)
+        self.assertEqual(self._allowed(limiter, 10, level=LogLevel.ERROR), 10)
+
+    def test_per_level(self):
+        shared = LogRateLimiter().add_rule("#", rate=1, burst=2)
+        self.assertEqual(self._allowed(shared, 10, level=LogLevel.DEBUG), 2)
+        self.assertEqual(self._allowed(shared, 10, level=LogLevel.INFO), 0)
+        perLevel = LogRateLimiter().add_rule("#", rate=1, burst=2, perLevel=True)
+        self.assertEqual(self._allowed(perLevel, 10, level=LogLevel.DEBUG), 2)
+        self.assertEqual(self._allowed(perLevel, 10, level=LogLevel.INFO), 2)
+
+    def test_sampling(self):
+        limiter = LogRateLimiter().add_rule("#", sampling=0.25)
+        with mock.patch("Logueur.log_limit._random", side_effect=[0.1, 0.3, 0.2, 0.9]):
+            self.assertEqual([limiter.allow(self._message()) for _ in range(4)], [True, False, True, False])
+        self.assertEqual(self._allowed(LogRateLimiter().add_rule("#", sampling=0), 10), 0)
+
+    def test_summary(self):
+        limiter = LogRateLimiter(summaryInterval=10).add_rule("app.#", rate=1, burst=1)
+        self._allowed(limiter, 4, topic="app.a")
+        self._allowed(limiter, 2, topic="app.b")
+        self.assertIsNone(limiter._summary)
+        self.now += 10
+        limiter.allow(self._message("app.a"))
+        summary = limiter._summary
+        self.assertEqual(summary.level, LogLevel.WARNING)
+        self.assertEqual(summary.topic, "Logueur.ratelimit")
+        self.assertEqual(summary.body, "4 messages suppressed by the rate limiter in the last 10.0s: app.a (3), app.b (1)")
+        # The summary topic is never limited:
+        self.assertTrue(LogRateLimiter().add_rule("#", sampling=0).allow(summary))
+
+    def test_summarize(self):
+        limiter = LogRateLimiter().add_rule("#", sampling=0)
+        self.assertIsNone(limiter.summarize())
+        self._allowed(limiter, 3)
+        self.assertIn("3 messages suppressed", limiter.summarize().body)
+        self.assertIsNone(limiter.summarize())
+
+    def test_type_check(self):
+        limiter = LogRateLimiter()
+        with self.assertRaises(ValueError):
+            limiter.add_rule(1)
+        with self.assertRaises(ValueError):
+            limiter.add_rule("#", rate=0)
+        with self.assertRaises(ValueError):
+            limiter.add_rule("#", rate=1, burst=0.5)
+        with self.assertRaises(ValueError):
+            limiter.add_rule("#", sampling=2)
+        with self.assertRaises(ValueError):
+            LogRateLimiter(summaryInterval=-1)
+
+
+class test_Logueur_rateLimiter(unittest.TestCase):
+    """ Tests for the rate limiter of the Logueur
+
+    We check that the suppressed messages aren't rendered, and that
+    the summary is given to the outputs.
+    """
+
+    def test_logueur(self):
+        now = [0.0]
+        with mock.patch("Logueur.log_limit._monotonic", lambda: now[0]):
+            limiter = LogRateLimiter(summaryInterval=5).add_rule("app.#", rate=1, burst=2)
+            out = MockLogHandler(LogLevel.DEBUG)
+            log = Logueur([out], rateLimiter=limiter)
+            body = mock.Mock(return_value="lazy")
+            for _ in range(5):
+                log.info(body, topic="app.loop")
+            log.info("kept", topic="other")
+            self.assertEqual([msg.topic.topic for msg in out.messages], ["app.loop", "app.loop", "other"])
+            self.assertEqual(body.call_count, 0)
+
+            now[0] = 5.0
+            log.log_many([LogMessage("a",LogLevel.INFO,LogTopic("app.loop")), LogMessage("b",LogLevel.INFO,LogTopic("app.loop"))])
+            self.assertEqual(out.messages[3].topic, "Logueur.ratelimit")
+            self.assertEqual([msg.body for msg in out.messages[4:]], ["a", "b"])
+
+    def test_idle_summary(self):
+        limiter = LogRateLimiter(summaryInterval=0.1).add_rule("app.#", sampling=0)
+        out = MockLogHandler(LogLevel.DEBUG)
+        log = Logueur([out], rateLimiter=limiter)
+        for _ in range(3):
+            log.info("dropped", topic="app.loop")
+        self.assertEqual(out.messages, [])
+        time.sleep(0.3)
+        self.assertEqual(len(out.messages), 1)
+        self.assertEqual(out.messages[0].topic, "Logueur.ratelimit")
+        self.assertIn("3 messages suppressed", out.messages[0].body)
+        self.assertIsNone(limiter._timer)
+
+    def test_type_check(self):
+        with self.assertRaises(ValueError):
+            Logueur([MockLogHandler(LogLevel.DEBUG)], rateLimiter="limiter")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,11 @@
 # ./tests/test_Logueur/test_logMessage.py
 """ Tests for the log_message module """
 
+import time
 import unittest
 
 from Logueur.log_message import *
+from Logueur.log_message import _compileFormat
 
 class test_LogMessage(unittest.TestCase):
     """ Tests for the LogMessage class
@@ -47,4 +49,86 @@ class test_LogMessage(unittest.TestCase):
         fmt = "({level}) {topic}\n"
 
         with self.assertRaises(ValueError):
-            LogMessage(body,level,topic,fmt=fmt)
\ No newline at end of file
+            LogMessage(body,level,topic,fmt=fmt)
+    def test_templateBody(self):
+
+        level = LogLevel(1)
+        topic = LogTopic("msg.topic")
+        message = LogMessage("{} and {name}",level,topic,args=("first",),kwargs={"name":"second"})
+
+        self.assertEqual("first and second",message.body)
+        self.assertEqual("[INFO] msg.topic\nfirst and second\n\n",str(message))
+
+    def test_callableBody(self):
+
+        calls = list()
+        def body():
+            calls.append(None)
+            return "lazy body"
+        message = LogMessage(body,LogLevel(1),LogTopic("msg.topic"))
+
+        self.assertEqual(calls,[])
+        self.assertEqual("lazy body",message.body)
+        self.assertEqual("lazy body",message.body)
+        self.assertEqual(len(calls),1)
+
+    def test_trusted(self):
+
+        message = LogMessage._trusted("{} body",LogLevel(1),LogTopic("msg.topic"),"({level}) {body}",("trusted",))
+
+        self.assertEqual("(INFO) trusted body",str(message))
+        self.assertFalse(hasattr(message,"__dict__"))
+
+    def test_timeAndFields(self):
+
+        before = time.time()
+        message = LogMessage("body",LogLevel(1),LogTopic("msg.topic"),fields={"key":"value"})
+        self.assertTrue(before <= message.time <= time.time())
+        self.assertEqual(message.fields,{"key":"value"})
+
+        message = LogMessage("body",LogLevel(1),LogTopic("msg.topic"),timestamp=12.5)
+        self.assertEqual(message.time,12.5)
+        self.assertIsNone(message.fields)
+
+        with self.assertRaises(ValueError):
+            LogMessage("body",LogLevel(1),LogTopic("msg.topic"),fields=[("key","value")])
+
+    def test_badBody(self):
+
+        with self.assertRaises(ValueError):
+            LogMessage(1,LogLevel(1),LogTopic("msg.topic"))
+        with self.assertRaises(ValueError):
+            LogMessage(lambda: "body",LogLevel(1),LogTopic("msg.topic"),args=("arg",))
+
+
+class test_compileFormat(unittest.TestCase):
+    """ Tests for the compilation of the message formats
+
+    The renderers must give the same result as str.format, and
+    be shared by the messages using the same format.
+    """
+
+    fmts = [
+        "[{level}] {topic}\n{body}\n\n",
+        "{body} ({topic}, {level})",
+        "100% {body} {{not a field}}",
+        "{level:>8} {body!r}",
+        "{body} {body}",
+    ]
+
+    def test_sameAsFormat(self):
+        for fmt in self.fmts:
+            render = _compileFormat(fmt)
+            self.assertEqual(fmt.format(body="a body",level="INFO",topic="a.topic"),
+                             render("a body","INFO","a.topic"))
+    def test_unknownField(self):
+        with self.assertRaises(KeyError):
+            _compileFormat("{body} {date}")("a body","INFO","a.topic")
+    def test_sharedRenderer(self):
+        self.assertIs(_compileFormat(self.fmts[1]), _compileFormat(self.fmts[1]))
+
+    def test_renderedOnce(self):
+        message = LogMessage("a body",LogLevel(1),LogTopic("a.topic"))
+        self.assertIs(str(message),str(message))
+        message.msg_fmt = "{body}"
+        self.assertEqual(str(message),"a body")
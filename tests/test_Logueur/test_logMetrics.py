@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the metrics of the logging
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logMetrics.py
+""" Tests for the log_metrics module """
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from Logueur.log_metrics import *
+from Logueur.log_topic import LogTopic, LogTopicFilter
+from Logueur.log_out import ConsoleLogHandler, FileLogHandler
+from .mock_handler import MockLogHandler
+
+
+class test_LogMetrics(unittest.TestCase):
+    """ Tests for the LogMetrics class
+
+    We check the counters of the Logueur and of the handlers, the
+    histograms, the Prometheus format and the detach.
+    """
+
+    def setUp(self) -> None:
+        self.out = MockLogHandler(LogLevel.INFO, LogTopicFilter("app.#"))
+        self.log = Logueur([self.out])
+        self.metrics = LogMetrics().attach(self.log)
+
+    def test_messages(self):
+        self.log.info("a", topic="app.a")
+        self.log.info("b", topic="app.a")
+        self.log.error("c", topic="app.b")
+        self.log.debug("d", topic="app.a") # Discarded by the Logueur, not counted
+        self.assertEqual(self.metrics.snapshot()["messages"], {"INFO": {"app.a": 2}, "ERROR": {"app.b": 1}})
+
+    def test_handler(self):
+        other = MockLogHandler(LogLevel.DEBUG)
+        self.log.add_out(other)
+        self.log.debug("a", topic="app.a")
+        self.log.info("b", topic="other")
+        self.log.log_many([LogMessage("c",LogLevel.INFO,LogTopic("app.c")), LogMessage("d",LogLevel.INFO,LogTopic("app.d"))])
+        handlers = self.metrics.snapshot()["handlers"]
+        self.assertEqual(set(handlers), {"MockLogHandler", "MockLogHandler#2"})
+        metrics = handlers["MockLogHandler"]
+        self.assertEqual(metrics["written"], 2)
+        self.assertEqual(metrics["filtered"], {"level": 1, "topic": 1})
+        self.assertEqual(metrics["latency"]["count"], 1) # One batch
+        self.assertEqual(metrics["latency"]["buckets"][-1], (float("inf"), 1))
+        self.assertIsNone(metrics["bytes"])
+        self.assertEqual(handlers["MockLogHandler#2"]["written"], 4)
+
+    def test_errors(self):
+        self.out.error = RuntimeError("write failed")
+        with self.assertRaises(RuntimeError):
+            self.log.info("fail", topic="app.a")
+        metrics = self.metrics.snapshot()["handlers"]["MockLogHandler"]
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["written"], 0)
+
+    def test_histogram(self):
+        with mock.patch("Logueur.log_metrics._perfCounter", side_effect=[0.0, 0.0002, 1.0, 3.0]):
+            self.log.info("a", topic="app.a")
+            self.log.info("b", topic="app.a")
+        latency = self.metrics.snapshot()["handlers"]["MockLogHandler"]["latency"]
+        buckets = dict(latency["buckets"])
+        self.assertEqual((buckets[1e-4], buckets[5e-4], buckets[1.0], buckets[5.0]), (0, 1, 1, 2))
+        self.assertAlmostEqual(latency["sum"], 2.0002)
+
+    def test_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            handler = FileLogHandler(LogLevel.DEBUG, LogTopicFilter("#"), os.path.join(tmp, "log.txt"))
+            self.metrics.attach(handler, name="file")
+            handler.emit(LogMessage("body é",LogLevel.INFO,LogTopic("topic")))
+            handler.close()
+            self.assertEqual(self.metrics.snapshot()["handlers"]["file"]["bytes"], len("[INFO] topic\nbody é\n\n".encode("utf-8")))
+
+    def test_consoleBytes(self):
+        handler = ConsoleLogHandler(LogLevel.DEBUG, LogTopicFilter("#"), supportColor=False)
+        msg = LogMessage("body é",LogLevel.INFO,LogTopic("topic"))
+        with mock.patch("sys.stdout"):
+            handler.emit(msg)
+            self.assertEqual(handler.written, 0) # Not counted without metrics
+            self.metrics.attach(handler, name="console")
+            handler.emit(msg)
+            handler.emit_batch([msg, msg])
+        self.assertEqual(self.metrics.snapshot()["handlers"]["console"]["bytes"], 3 * len(str(msg).encode("utf-8")))
+
+    def test_prometheus(self):
+        self.log.info("a", topic='app."quoted"')
+        text = self.metrics.prometheus()
+        self.assertIn('logueur_messages_total{level="INFO",topic="app.\\"quoted\\""} 1', text)
+        self.assertIn('logueur_handler_messages_total{handler="MockLogHandler"} 1', text)
+        self.assertIn('logueur_handler_filtered_total{handler="MockLogHandler",reason="level"} 0', text)
+        self.assertIn('logueur_handler_write_seconds_bucket{handler="MockLogHandler",le="+Inf"} 1', text)
+        self.assertIn('logueur_handler_write_seconds_count{handler="MockLogHandler"} 1', text)
+        self.assertIn("# TYPE logueur_handler_write_seconds histogram", text)
+
+    def test_dump(self):
+        self.log.info("a", topic="app.a")
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "metrics.prom")
+            self.metrics.start(filename, interval=60)
+            self.metrics.stop() # Last dump
+            with open(filename) as file:
+                self.assertEqual(file.read(), self.metrics.prometheus())
+            self.assertEqual(os.listdir(tmp), ["metrics.prom"])
+
+    def test_detach(self):
+        self.metrics.detach()
+        self.assertIsNone(self.log._metrics)
+        self.assertIsNone(self.out._metrics)
+        self.log.info("a", topic="app.a")
+        self.assertEqual(self.metrics.snapshot()["messages"], {})
+        self.assertEqual(len(self.out.messages), 1)
+        self.metrics.attach(self.log)
+        self.log.info("b", topic="app.a")
+        self.assertEqual(set(self.metrics.snapshot()["handlers"]), {"MockLogHandler"})
+
+    def test_type_check(self):
+        with self.assertRaises(ValueError):
+            self.metrics.attach("handler")
+        with self.assertRaises(ValueError):
+            LogMetrics().attach(self.log)
+        with self.assertRaises(ValueError):
+            self.metrics.attach(self.log, name="name")
+        with self.assertRaises(ValueError):
+            self.metrics.start("metrics.prom", interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
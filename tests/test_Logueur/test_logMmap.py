@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output to a memory-mapped ring file
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logMmap.py
+""" Tests for the log_mmap module """
+
+import os
+import tempfile
+import unittest
+
+from Logueur.log_mmap import *
+from Logueur.log_mmap import _HEADER, _RECORD
+from .mock_handler import MockLogHandler
+
+
+class test_RingLogHandler(unittest.TestCase):
+    """ Tests for the RingLogHandler and RingLogReader classes
+
+    We write messages in a small ring, and check that the reader
+    give back the newest ones, in order, after the wraparound.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.ring")
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _message(self, i:int, level:LogLevel=LogLevel.INFO) -> LogMessage:
+        return LogMessage(f"message {i:03}",level,LogTopic("a.topic"))
+    def _bodies(self) -> list[str]:
+        return [msg.body for msg in RingLogReader(self.filename)]
+
+    def test_readWrite(self):
+        with RingLogHandler(LogLevel.INFO,LogTopicFilter("#"),self.filename) as log:
+            log.emit(self._message(0,LogLevel.DEBUG))
+            log.emit(self._message(1))
+            log.emit(self._message(2,LogLevel.ERROR))
+        messages = list(RingLogReader(self.filename))
+        self.assertEqual([msg.body for msg in messages], ["message 001","message 002"])
+        self.assertEqual([msg.level for msg in messages], [LogLevel.INFO,LogLevel.ERROR])
+        self.assertEqual(messages[0].topic, "a.topic")
+    def test_wraparound(self):
+        recordSize = _RECORD.size + len("a.topic") + len("message 000")
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,capacity=int(recordSize*3.5)) as log:
+            for i in range(10):
+                log.emit(self._message(i))
+                self.assertEqual(self._bodies()[-1], f"message {i:03}")
+        self.assertEqual(self._bodies(), ["message 007","message 008","message 009"])
+    def test_reopen(self):
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit(self._message(0))
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit(self._message(1))
+        self.assertEqual(self._bodies(), ["message 000","message 001"])
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,capacity=4096) as log:
+            log.emit(self._message(2))
+        self.assertEqual(self._bodies(), ["message 002"])
+    def test_partialRecord(self):
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit(self._message(0))
+            log.emit(self._message(1))
+        with open(self.filename,"r+b") as f: # Length of the second record too long
+            f.seek(_HEADER.size + _RECORD.size + len("a.topic") + len("message 000"))
+            f.write(b"\xff\x00")
+        self.assertEqual(self._bodies(), ["message 000"])
+    def test_tooBig(self):
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,capacity=16) as log:
+            log.emit(self._message(0))
+            self.assertEqual(log.dropped, 1)
+        self.assertEqual(self._bodies(), [])
+    def test_replay(self):
+        with RingLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit(self._message(0))
+            log.emit(self._message(1,LogLevel.ERROR))
+        handler = MockLogHandler(LogLevel.WARNING)
+        RingLogReader(self.filename).replay(handler)
+        self.assertEqual([msg.body for msg in handler.messages], ["message 001"])
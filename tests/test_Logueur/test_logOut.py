@@ -6,7 +6,11 @@
 """ Tests for the log_out module """
 
 import io
+import os
+import time
+import tempfile
 import unittest
+from typing import Optional
 
 from Logueur.log_out import *
 from Logueur.log_topic import LogTopic as LogTopic
@@ -62,6 +66,18 @@ class test_baseLogHandler(unittest.TestCase):
 
         mockVar = False; self.log.emit(self.message_bad3)
         self.assertFalse(mockVar)
+    def test_baseEmitBatch(self):
+
+        global mockVar
+
+        mockVar = False; self.log.emit_batch([self.message_bad1,self.message_bad2])
+        self.assertFalse(mockVar)
+
+        mockVar = False; self.log.emit_batch([self.message_bad1,self.message_good])
+        self.assertTrue(mockVar)
+
+        with self.assertRaises(ValueError):
+            self.log.emit_batch([self.message_good,"A msg body"])
 
 class test_logConsoleHandler(unittest.TestCase):
     """ Tests for the LogConsoleHandler class
@@ -165,6 +181,102 @@ class test_logConsoleHandler(unittest.TestCase):
         self.assertEqual(self.mockStdout.getvalue(),expected_stdout)
         self.assertEqual(self.mockStdErr.getvalue(),expected_stderr)
 
-class test_logFileHandler(unittest.TestCase): #TODO
+    def test_writeBatch(self):
+        """ Test a batch on stdout and stderr, without color """
+        log = ConsoleLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),supportColor=False,useStderr=True)
+
+        log._writeBatch([self.debug_msg,self.info_msg,self.warning_msg,self.error_msg,self.fatal_msg])
+
+        expected_stdout = "debug message\ninfo message\n"
+        expected_stderr = "warning message\nerror message\nfatal message\n"
+
+        self.assertEqual(self.mockStdout.getvalue(),expected_stdout)
+        self.assertEqual(self.mockStdErr.getvalue(),expected_stderr)
+
+class test_logFileHandler(unittest.TestCase):
     """ Tests for the LogFileHandler class
-    """
\ No newline at end of file
+
+    We test the actions taken when the file already exist,
+    and the flush policies, by reading the file after each
+    message written.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.log")
+        self.info_msg = LogMessage("info message",LogLevel.INFO,LogTopic("topic"),fmt='{body}\n')
+        self.error_msg = LogMessage("error message",LogLevel.ERROR,LogTopic("topic"),fmt='{body}\n')
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _read(self, filename:Optional[str]=None) -> str:
+        with open(filename or self.filename) as f:
+            return f.read()
+    def _handler(self, **kwargs) -> FileLogHandler:
+        return FileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,**kwargs)
+
+    def test_actions(self):
+        with self._handler() as log:
+            log.emit(self.info_msg)
+        with self.assertRaises(FileExistsError):
+            self._handler()
+        with self._handler(action="append") as log:
+            log.emit(self.info_msg)
+        self.assertEqual(self._read(), "info message\ninfo message\n")
+        with self._handler(action="new") as log:
+            log.emit(self.error_msg)
+        self.assertEqual(self._read(), "info message\ninfo message\n")
+        self.assertEqual(self._read(log._filename), "error message\n")
+        with self.assertWarns(ResourceWarning):
+            with self._handler(action="overwrite-warn") as log:
+                log.emit(self.error_msg)
+        self.assertEqual(self._read(), "error message\n")
+
+    def test_flushMessage(self):
+        with self._handler() as log:
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "info message\n")
+    def test_flushBytes(self):
+        with self._handler(flushPolicy="bytes",flushBytes=20) as log:
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "")
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "info message\n"*2)
+    def test_flushTime(self):
+        with self._handler(flushPolicy="time",flushInterval=100) as log:
+            log.emit(self.info_msg)
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "")
+            time.sleep(0.15) # Flushed by the timer, without other message
+            self.assertEqual(self._read(), "info message\n"*2)
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "info message\n"*2)
+            time.sleep(0.1)
+            self.assertEqual(self._read(), "info message\n"*3)
+    def test_flushBytesEncoded(self):
+        msg = LogMessage("é"*10,LogLevel.INFO,LogTopic("topic"),fmt='{body}\n')
+        with self._handler(flushPolicy="bytes",flushBytes=20) as log:
+            log.emit(msg) # 11 characters, 21 bytes
+            self.assertEqual(self._read(), "é"*10+"\n")
+    def test_flushLevel(self):
+        with self._handler(flushPolicy="level") as log:
+            log.emit(self.info_msg)
+            self.assertEqual(self._read(), "")
+            log.emit(self.error_msg)
+            self.assertEqual(self._read(), "info message\nerror message\n")
+            log.emit(self.info_msg)
+            log.flush()
+            self.assertEqual(self._read(), "info message\nerror message\ninfo message\n")
+    def test_emitBatch(self):
+        with self._handler(flushPolicy="level") as log:
+            log.emit_batch([self.info_msg,self.info_msg])
+            self.assertEqual(self._read(), "")
+            log.emit_batch([self.info_msg,self.error_msg])
+            self.assertEqual(self._read(), "info message\n"*3+"error message\n")
+    def test_close(self):
+        log = self._handler(flushPolicy="level")
+        log.emit(self.info_msg)
+        log.close()
+        self.assertEqual(self._read(), "info message\n")
+        with self.assertRaises(ValueError):
+            log.emit(self.info_msg)
\ No newline at end of file
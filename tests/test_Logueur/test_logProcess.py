@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output for multiple processes
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logProcess.py
+""" Tests for the log_process module """
+
+import io
+import os
+import time
+import datetime
+import unittest
+import multiprocessing
+from unittest import mock
+
+from Logueur.log_process import *
+from Logueur.logueur import Logueur
+from .mock_handler import MockLogHandler
+
+def worker(queue, n:int, crash:bool) -> None:
+    """ Log n messages, then exit normally or crash """
+    log = Logueur([ProcessLogHandler(queue, batchSize=10)])
+    for i in range(n):
+        log.info("message {}", i, topic=f"worker.{os.getpid()}", fields={"i":i})
+    if crash:
+        log.error("crashing", topic=f"worker.{os.getpid()}") # Sent right away
+        log.info("lost", topic=f"worker.{os.getpid()}")
+        os._exit(1)
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork start method needed")
+class test_ProcessLogHandler(unittest.TestCase):
+    """ Tests for the ProcessLogHandler and ProcessLogListener classes
+
+    We log from worker processes, some of them crashing, and check
+    the messages received by the handlers of the parent process.
+    """
+
+    def setUp(self) -> None:
+        self.context = multiprocessing.get_context("fork")
+        self.out = MockLogHandler()
+        self.listener = ProcessLogListener([self.out, MockLogHandler(LogLevel.ERROR)], self.context.SimpleQueue())
+        self.queue = self.listener.queue
+
+    def _run(self, *args) -> multiprocessing.Process:
+        process = self.context.Process(target=worker, args=(self.queue,)+args)
+        process.start()
+        process.join()
+        return process
+
+    def test_workers(self):
+        with self.listener:
+            processes = [self._run(25, False) for _ in range(3)]
+        self.assertTrue(self.out.closed)
+        for process in processes:
+            bodies = [msg.body for msg in self.out.messages if msg.topic == f"worker.{process.pid}"]
+            self.assertEqual(bodies, [f"message {i}" for i in range(25)])
+            self.assertEqual(self.listener.received[process.pid], 25)
+        self.assertEqual(self.out.messages[0].fields, {"i":0})
+        self.assertEqual(self.listener._handlers[1].messages, [])
+    def test_crash(self):
+        with self.listener:
+            crashed = self._run(15, True)
+            process = self._run(5, False)
+        self.assertEqual(crashed.exitcode, 1)
+        bodies = [msg.body for msg in self.out.messages if msg.topic == f"worker.{crashed.pid}"]
+        self.assertEqual(bodies, [f"message {i}" for i in range(15)]+["crashing"])
+        self.assertEqual(len([msg for msg in self.out.messages if msg.topic == f"worker.{process.pid}"]), 5)
+        self.assertEqual([msg.body for msg in self.listener._handlers[1].messages], ["crashing"])
+    def test_defaultQueue(self):
+        listener = ProcessLogListener([self.out]).start()
+        ProcessLogHandler(listener.queue).emit(LogMessage("body",LogLevel.INFO,LogTopic("topic")))
+        listener.stop()
+        self.assertEqual([msg.body for msg in self.out.messages], ["body"])
+    def test_batchInterval(self):
+        with self.listener:
+            handler = ProcessLogHandler(self.queue, batchInterval=0.05)
+            handler.emit(LogMessage("idle",LogLevel.INFO,LogTopic("topic")))
+            for _ in range(100): # Sent by the timer, without other message
+                if self.out.messages:
+                    break
+                time.sleep(0.01)
+            self.assertEqual([msg.body for msg in self.out.messages], ["idle"])
+            handler.close()
+    def test_forkExit(self):
+        handler = ProcessLogHandler(self.queue, batchSize=100, batchInterval=60)
+        def child():
+            handler.emit(LogMessage("child",LogLevel.INFO,LogTopic("topic")))
+        with self.listener:
+            process = self.context.Process(target=child) # Exit without flushing the handler
+            process.start()
+            process.join()
+        self.assertEqual([msg.body for msg in self.out.messages], ["child"])
+    def test_fork(self):
+        handler = ProcessLogHandler(self.queue, batchSize=100, batchInterval=60)
+        handler.emit(LogMessage("parent",LogLevel.INFO,LogTopic("topic"),fields={"when":datetime.date(2024,1,2)}))
+        with self.listener:
+            process = self.context.Process(target=handler.flush)
+            process.start()
+            process.join()
+            handler.close()
+        self.assertEqual([msg.body for msg in self.out.messages], ["parent"])
+        self.assertEqual(self.out.messages[0].fields, {"when":"2024-01-02"})
+        with self.assertRaises(ValueError):
+            handler.emit(LogMessage("closed",LogLevel.INFO,LogTopic("topic")))
+    def test_corruptedBatch(self):
+        with mock.patch("sys.stderr", new_callable=io.StringIO), self.listener:
+            self.queue.put((1, [("not a record",)]))
+            self.queue.put((1, [(1, "topic", "body", 0.0, None, None)]))
+        self.assertEqual(self.listener.errors, 1)
+        self.assertEqual([msg.body for msg in self.out.messages], ["body"])
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output written by a background thread
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logQueue.py
+""" Tests for the log_queue module """
+
+import gc
+import io
+import os
+import tempfile
+import threading
+import weakref
+import unittest
+from unittest import mock
+
+from Logueur.log_queue import *
+from Logueur.log_queue import _openHandlers, _closeAtExit
+from Logueur.log_topic import LogTopic, LogTopicFilter
+from Logueur.log_out import FileLogHandler
+from Logueur.logueur import Logueur
+from .mock_handler import MockLogHandler
+
+class BlockingLogHandler(BaseLogHandler):
+    """ Handler keeping the messages written, once unblocked """
+    def __init__(self, level:LogLevel=LogLevel.DEBUG) -> None:
+        super().__init__(level, LogTopicFilter("#"))
+        self.messages = list()
+        self.writing = threading.Event()
+        self.unblocked = threading.Event()
+        self.closed = False
+    def _write(self, msg:LogMessage) -> None:
+        self.writing.set()
+        self.unblocked.wait()
+        self.messages.append(msg.body)
+    def close(self) -> None:
+        self.closed = True
+
+class FailingLogHandler(MockLogHandler):
+    """ Handler failing to write the messages whose body is 'b' """
+    def _write(self, msg:LogMessage) -> None:
+        if msg.body == "b":
+            raise OSError("write failed")
+        super()._write(msg)
+
+
+class test_QueueLogHandler(unittest.TestCase):
+    """ Tests for the QueueLogHandler class
+
+    The wrapped handler block until the test unblock it, so the queue
+    can be filled to test the overflow policies. The first message is
+    taken by the writer thread before the queue is filled.
+    """
+
+    def setUp(self):
+        self.out = BlockingLogHandler()
+
+    def _message(self, body:str, level:LogLevel=LogLevel.INFO) -> LogMessage:
+        return LogMessage(body, level, LogTopic("topic"))
+    def _fill(self, log:QueueLogHandler, bodies:list[str]) -> None:
+        log.emit(self._message("first"))
+        self.out.writing.wait()
+        for body in bodies:
+            log.emit(self._message(body))
+
+    def test_writeAndClose(self):
+        log = QueueLogHandler(self.out)
+        self.out.unblocked.set()
+        for i in range(100):
+            log.emit(self._message(str(i)))
+        log.close()
+        self.assertEqual(self.out.messages, [str(i) for i in range(100)])
+        self.assertTrue(self.out.closed)
+        with self.assertRaises(ValueError):
+            log.emit(self._message("closed"))
+    def test_closeAtExit(self):
+        log = QueueLogHandler(self.out)
+        self.out.unblocked.set()
+        log.emit(self._message("message"))
+        self.assertIn(log, _openHandlers)
+        _closeAtExit()
+        self.assertEqual(self.out.messages, ["message"])
+        self.assertTrue(self.out.closed)
+        ref = weakref.ref(log) # Not kept alive by the exit registration once closed
+        del log
+        gc.collect()
+        self.assertIsNone(ref())
+    def test_flush(self):
+        log = QueueLogHandler(self.out)
+        self.out.unblocked.set()
+        log.emit(self._message("message"))
+        log.flush()
+        self.assertEqual(self.out.messages, ["message"])
+        log.close()
+
+    def test_filter(self):
+        self.out.level = LogLevel.WARNING
+        log = QueueLogHandler(self.out)
+        self.out.unblocked.set()
+        log.emit(self._message("info"))
+        log.emit(self._message("error", LogLevel.ERROR))
+        log.close()
+        self.assertEqual(self.out.messages, ["error"])
+        self.assertIs(log.level, LogLevel.WARNING)
+
+    def test_logueurLevel(self):
+        self.out.level = LogLevel.WARNING
+        log = QueueLogHandler(self.out)
+        logueur = Logueur(log)
+        self.assertFalse(logueur.is_enabled_for(LogLevel.INFO))
+        self.out.level = LogLevel.DEBUG
+        self.assertTrue(logueur.is_enabled_for(LogLevel.INFO))
+        log.close()
+
+    def test_dropNewest(self):
+        log = QueueLogHandler(self.out, maxsize=2, overflow="drop-newest")
+        self._fill(log, ["1","2","3","4"])
+        self.assertEqual(log.stats()["dropped"], 2)
+        self.out.unblocked.set()
+        log.close()
+        self.assertEqual(self.out.messages, ["first","1","2"])
+    def test_dropOldest(self):
+        log = QueueLogHandler(self.out, maxsize=2, overflow="drop-oldest")
+        self._fill(log, ["1","2","3","4"])
+        self.assertEqual(log.stats()["droppedByLevel"]["INFO"], 2)
+        self.out.unblocked.set()
+        log.close()
+        self.assertEqual(self.out.messages, ["first","3","4"])
+    def test_dropBelowLevel(self):
+        log = QueueLogHandler(self.out, maxsize=2, overflow="drop-below-level")
+        self._fill(log, ["1","2","3"])
+        self.assertEqual(log.dropped, 1)
+        threading.Timer(0.05, self.out.unblocked.set).start()
+        log.emit(self._message("error", LogLevel.ERROR)) # Block until unblocked
+        log.close()
+        self.assertEqual(self.out.messages, ["first","1","2","error"])
+    def test_block(self):
+        log = QueueLogHandler(self.out, maxsize=1)
+        self._fill(log, ["1"])
+        threading.Timer(0.05, self.out.unblocked.set).start()
+        log.emit(self._message("2")) # Block until unblocked
+        log.close()
+        self.assertEqual(self.out.messages, ["first","1","2"])
+        self.assertEqual(log.dropped, 0)
+    def test_failingBody(self):
+        def fail():
+            raise RuntimeError("render failed")
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "log.txt")
+            log = QueueLogHandler(FileLogHandler(LogLevel.DEBUG, LogTopicFilter("#"), filename))
+            with mock.patch("sys.stderr", new_callable=io.StringIO):
+                log.emit_batch([self._message(str(i)) for i in range(3)] + [LogMessage(fail, LogLevel.INFO, LogTopic("topic"))]
+                               + [self._message(str(i)) for i in range(3, 5)])
+                log.close()
+            with open(filename) as file:
+                self.assertEqual(file.read(), "".join(f"[INFO] topic\n{i}\n\n" for i in range(5)))
+        self.assertEqual(log.errors, 1)
+    def test_failingMidBatch(self):
+        out = FailingLogHandler()
+        log = QueueLogHandler(out)
+        with mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            log.emit_batch([self._message(body) for body in ("a", "b", "c")])
+            log.close()
+        self.assertEqual(out.bodies, ["a", "c"]) # "a" isn't written again
+        self.assertEqual(log.errors, 2) # The batch, then "b" alone
+        self.assertEqual(stderr.getvalue().count("Traceback"), 2)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the streaming reader of the text log files
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logReader.py
+""" Tests for the log_reader module """
+
+import io
+import os
+import gzip
+import tempfile
+import unittest
+
+from Logueur.log_reader import *
+from Logueur.log_out import FileLogHandler
+
+class test_readLog(unittest.TestCase):
+    """ Tests for the readLog, filterLevel and filterTopic generators
+
+    We write messages with a FileLogHandler, including bodies with
+    empty lines, and read them back with several chunk sizes.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.log")
+        levels = list(LogLevel)
+        topics = ["app.db","app.http","other"]
+        self.msgs = [LogMessage(f"message {i} é\n\n[INFO] not a record" if i%4 == 0 else f"message {i}",
+                                levels[i%5],LogTopic(topics[i%3])) for i in range(30)]
+        with FileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename) as log:
+            log.emit_batch(self.msgs)
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _tuples(self, msgs) -> list:
+        return [(msg.body,msg.level,msg.topic.topic) for msg in msgs]
+
+    def test_chunks(self):
+        for chunkSize in (1, 5, 64, 1<<20):
+            self.assertEqual(self._tuples(readLog(self.filename,chunkSize)), self._tuples(self.msgs))
+    def test_partialFile(self):
+        with open(self.filename,"rb") as f:
+            data = f.read()
+        partial = io.BytesIO(b"end of a previous record\n\n" + data[:-1])
+        self.assertEqual(self._tuples(readLog(partial,7)), self._tuples(self.msgs))
+    def test_oversized(self):
+        big = [LogMessage("x"*500,LogLevel.INFO,LogTopic("big")), LogMessage("line\n"*100,LogLevel.INFO,LogTopic("big"))]
+        with FileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,action="append") as log:
+            log.emit_batch(big[:1] + self.msgs[:3] + big[1:] + self.msgs[3:6])
+        expected = self._tuples(self.msgs + self.msgs[:6])
+        for chunkSize in (1, 7, 64, 1<<20):
+            self.assertEqual(self._tuples(readLog(self.filename,chunkSize,maxRecordSize=128)), expected)
+        with self.assertRaises(ValueError):
+            list(readLog(self.filename,maxRecordSize=0))
+    def test_compressed(self):
+        with open(self.filename,"rb") as f, gzip.open(self.filename+".gz","wb") as dst:
+            dst.write(f.read())
+        self.assertEqual(self._tuples(readLog(self.filename+".gz")), self._tuples(self.msgs))
+    def test_pipeline(self):
+        msgs = filterTopic(filterLevel(readLog(self.filename),"ERROR"),LogTopicFilter("app.*"))
+        expected = [msg for msg in self.msgs if msg.level >= LogLevel.ERROR and msg.topic.topic.startswith("app.")]
+        self.assertEqual(self._tuples(msgs), self._tuples(expected))
+        with self.assertRaises(ValueError):
+            filterLevel(self.msgs,"VERBOSE")
+        with self.assertRaises(ValueError):
+            filterTopic(self.msgs,"app.*")
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output keeping the last messages in memory
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logRecorder.py
+""" Tests for the log_recorder module """
+
+import unittest
+from unittest import mock
+
+from Logueur.log_recorder import *
+from Logueur.log_topic import LogTopic
+from .mock_handler import MockLogHandler
+
+
+class test_FlightRecorderLogHandler(unittest.TestCase):
+    """ Tests for the FlightRecorderLogHandler class
+
+    We check that the messages are kept unrendered until a
+    critical message arrive, and the bounds of the ring.
+    """
+
+    def setUp(self) -> None:
+        self.target = MockLogHandler(LogLevel.DEBUG)
+        self.log = FlightRecorderLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.target,capacity=3)
+
+    def _message(self, body, level:LogLevel=LogLevel.DEBUG) -> LogMessage:
+        return LogMessage(body,level,LogTopic("topic"))
+    def _bodies(self) -> list[str]:
+        return [msg.body for msg in self.target.messages]
+
+    def test_trigger(self):
+        body = mock.Mock(return_value="lazy")
+        self.log.emit(self._message(body))
+        self.log.emit(self._message("warning",LogLevel.WARNING))
+        body.assert_not_called()
+        self.assertEqual(self.target.messages, [])
+        self.log.emit(self._message("error",LogLevel.ERROR))
+        self.assertEqual(self._bodies(), ["lazy","warning","error"])
+        self.assertEqual(len(self.log), 0)
+        self.assertEqual(self.log.dumps, 1)
+    def test_capacity(self):
+        for i in range(5):
+            self.log.emit(self._message(f"debug {i}"))
+        self.log.dump()
+        self.assertEqual(self._bodies(), ["debug 2","debug 3","debug 4"])
+    def test_maxBytes(self):
+        log = FlightRecorderLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.target,maxBytes=300)
+        for i in range(5):
+            log.emit(self._message("x"*100))
+        self.assertEqual(len(log), 1)
+    def test_maxBytesTemplate(self):
+        log = FlightRecorderLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.target,maxBytes=300)
+        for i in range(5):
+            log.emit(LogMessage("{} {value}",LogLevel.DEBUG,LogTopic("topic"),args=("x"*50,),kwargs={"value":"y"*50}))
+        self.assertEqual(len(log), 1)
+        self.assertIsNone(log._ring[0][1]._body) # Still unrendered
+    def test_targetFilter(self):
+        self.target.level = LogLevel.INFO
+        self.log.emit(self._message("debug"))
+        self.log.emit(self._message("info",LogLevel.INFO))
+        self.log.emit(self._message("fatal",LogLevel.FATAL))
+        self.assertEqual(self._bodies(), ["info","fatal"])
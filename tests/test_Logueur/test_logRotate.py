@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the log output to rotating files
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logRotate.py
+""" Tests for the log_rotate module """
+
+import os
+import gzip
+import lzma
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+from Logueur.log_rotate import *
+from Logueur.log_topic import LogTopic
+
+class test_RotatingFileLogHandler(unittest.TestCase):
+    """ Tests for the RotatingFileLogHandler class
+
+    We test the rotation on size and on time, the retention
+    of the segments and their compression.
+    """
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name,"test.log")
+        self.msg = LogMessage("message",LogLevel.INFO,LogTopic("topic"),fmt='{body}\n')
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def _handler(self, **kwargs) -> RotatingFileLogHandler:
+        return RotatingFileLogHandler(LogLevel.DEBUG,LogTopicFilter("#"),self.filename,**kwargs)
+    def _read(self, filename:str) -> str:
+        if filename.endswith(".gz"):
+            with gzip.open(filename,"rt") as f:
+                return f.read()
+        if filename.endswith(".xz"):
+            with lzma.open(filename,"rt") as f:
+                return f.read()
+        with open(filename) as f:
+            return f.read()
+
+    def test_maxBytes(self):
+        with self._handler(maxBytes=20) as log:
+            for _ in range(5):
+                log.emit(self.msg)
+        segments = log.segments()
+        self.assertEqual([self._read(segment) for segment in segments], ["message\n"*2]*2)
+        self.assertEqual(self._read(self.filename), "message\n")
+    def test_maxBytesBatch(self):
+        with self._handler(maxBytes=20) as log:
+            log.emit_batch([self.msg]*5)
+        segments = log.segments()
+        self.assertEqual([self._read(segment) for segment in segments], ["message\n"*2]*2)
+        self.assertEqual(self._read(self.filename), "message\n")
+    def test_maxBytesEncoded(self):
+        msg = LogMessage("é"*5,LogLevel.INFO,LogTopic("topic"),fmt='{body}\n') # 6 characters, 11 bytes
+        with self._handler(maxBytes=20) as log:
+            for _ in range(3):
+                log.emit(msg)
+            log.emit_batch([msg]*3)
+        self.assertEqual([os.path.getsize(segment) for segment in log.segments()], [11]*5)
+    def test_flushNotWaiting(self):
+        with self._handler(maxBytes=8, compression="gzip") as log:
+            with mock.patch.object(log, "_processSegment", side_effect=lambda segment: time.sleep(0.3)):
+                log.emit(self.msg)
+                log.rotate()
+                start = time.monotonic()
+                log.flush()
+                self.assertLess(time.monotonic() - start, 0.2)
+    def test_renameFailure(self):
+        with self._handler() as log:
+            log.emit(self.msg)
+            with mock.patch("os.rename", side_effect=PermissionError("locked")):
+                with self.assertRaises(PermissionError):
+                    log.rotate()
+            log.emit(self.msg)
+            log.flush()
+            self.assertEqual(log.segments(), [])
+        self.assertEqual(self._read(self.filename), "message\n"*2)
+    def test_interval(self):
+        with self._handler(interval=0.05) as log:
+            log.emit(self.msg)
+            time.sleep(0.06)
+            log.emit(self.msg)
+            log.flush()
+            self.assertEqual(len(log.segments()), 1)
+        self.assertEqual(self._read(self.filename), "message\n")
+    def test_backupCount(self):
+        with self._handler(maxBytes=8, backupCount=2) as log:
+            for _ in range(5):
+                log.emit(self.msg)
+        self.assertEqual(len(log.segments()), 2)
+        with self._handler(maxBytes=8, backupCount=None) as log:
+            for _ in range(5):
+                log.emit(self.msg)
+        self.assertEqual(len(log.segments()), 7) # The 2 kept, and the appended file
+    def test_compression(self):
+        for compression, ext in (("gzip",".gz"),("lzma",".xz")):
+            with self._handler(maxBytes=8, compression=compression, action="overwrite") as log:
+                log.emit(self.msg)
+                log.rotate()
+            segment = log.segments()[-1]
+            self.assertTrue(segment.endswith(ext))
+            self.assertEqual(self._read(segment), "message\n")
+            self.assertFalse(os.path.exists(segment[:-len(ext)]))
+        with self.assertRaises(ValueError):
+            self._handler(compression="zip")
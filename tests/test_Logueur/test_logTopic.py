@@ -5,7 +5,12 @@
 # ./tests/test_Logueur/test_logTopic.py
 """ Tests for the log_topic module """
 
+import os
+import sys
+import inspect
+import tempfile
 import unittest
+import importlib.util
 
 from Logueur.log_topic import *
 from Logueur.log_topic import _generateFromModule
@@ -39,6 +44,42 @@ class test_func(unittest.TestCase):
         self.assertEqual(correct_topic, _generateFromModule(1))
 
 
+class test_frameWalking(unittest.TestCase):
+    """ Tests that the frame walking give the same topics as inspect.stack()
+
+    The reference topics are computed the way they were before the
+    frame walking, by using inspect.stack(), at different depth of
+    the execution stack.
+    """
+
+    @staticmethod
+    def _inspectStack(n_frame:int) -> str:
+        stack = inspect.stack()[n_frame:]
+        return ".".join(f.function for f in reversed(stack) if f.function != "<module>")
+    @staticmethod
+    def _inspectModule(n_frame:int) -> str:
+        frame_info = inspect.stack()[n_frame]
+        topics = [inspect.getmodule(frame_info.frame).__name__.rsplit(".",1)[-1]]
+        topics.extend(frame_info.frame.f_code.co_qualname.rsplit(".",1))
+        return ".".join(topics)
+    
+    def _atDepth(self, depth:int, func, *args):
+        if depth == 0:
+            return func(*args)
+        return self._atDepth(depth-1, func, *args)
+
+    def test_sameStack(self):
+        for depth in (0,10,50):
+            self.assertEqual(self._atDepth(depth,self._inspectStack,1), self._atDepth(depth,_generateFromStack,1))
+    def test_sameModule(self):
+        for depth in (0,10,50):
+            self.assertEqual(self._atDepth(depth,self._inspectModule,1), self._atDepth(depth,_generateFromModule,1))
+    def test_tooDeep(self):
+        self.assertEqual("", _generateFromStack(10000))
+        with self.assertRaises(IndexError):
+            _generateFromModule(10000)
+
+
 class test_LogTopic(unittest.TestCase):
     """ Tests for the LogTopic class.
 
@@ -51,10 +92,68 @@ class test_LogTopic(unittest.TestCase):
 
     def test_fromStack(self):
         self.assertEqual(self.correctStack, LogTopic.topicFactory(method="stack",n_frame=2))
+    def test_trusted(self):
+        topic = LogTopic._trusted("a.topic")
+        self.assertEqual(topic, LogTopic("a.topic"))
+        self.assertFalse(hasattr(topic,"__dict__"))
+        with self.assertRaises(ValueError):
+            LogTopic(1)
     def test_fromModule(self):
         self.assertEqual(self.correctModule, LogTopic.topicFactory(method="module",n_frame=2))
 
 
+class test_topicCache(unittest.TestCase):
+    """ Tests for the TopicCache class, and its use by LogTopic.topicFactory """
+
+    def setUp(self):
+        LogTopic.invalidateCache()
+
+    def _callSite(self) -> LogTopic:
+        return LogTopic.topicFactory(method="module")
+
+    def test_sameInstance(self):
+        topic_1 = self._callSite()
+        topic_2 = self._callSite()
+        self.assertIs(topic_1, topic_2)
+        self.assertEqual(topic_1, "test_logTopic.test_topicCache._callSite")
+    def test_counters(self):
+        hits, misses = LogTopic.cacheInfo()["hits"], LogTopic.cacheInfo()["misses"]
+        for _ in range(3):
+            self._callSite()
+        self.assertEqual(LogTopic.cacheInfo()["misses"], misses+1)
+        self.assertEqual(LogTopic.cacheInfo()["hits"], hits+2)
+    def test_invalidateModule(self):
+        topic = self._callSite()
+        LogTopic.invalidateCache("Logueur.log_topic") # An other module
+        self.assertIs(topic, self._callSite())
+        LogTopic.invalidateCache(sys.modules[__name__])
+        self.assertIsNot(topic, self._callSite())
+    def test_identicalCode(self):
+        # Equal code objects of two modules, their filename is ignored by ==
+        source = "from Logueur.log_topic import LogTopic\ndef f():\n    return LogTopic.topicFactory(method='module')\n"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            topics = list()
+            for name in ("mod_pa", "modb"):
+                filename = os.path.join(tmpdir, name+".py")
+                with open(filename, "w") as f:
+                    f.write(source)
+                spec = importlib.util.spec_from_file_location(name, filename)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[name] = module
+                self.addCleanup(sys.modules.pop, name)
+                spec.loader.exec_module(module)
+                topics.append(module.f())
+        self.assertEqual(topics, ["mod_pa.f", "modb.f"])
+    def test_eviction(self):
+        cache = TopicCache(maxsize=2)
+        codes = [self.test_eviction.__code__, self.setUp.__code__, self._callSite.__code__]
+        for code in codes:
+            cache.put(code, LogTopic(code.co_name))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(codes[0]))
+        self.assertEqual(cache.get(codes[2]), "_callSite")
+
+
 class test_logTopicFilter(unittest.TestCase):
     """ Tests for the LogTopicFilter class.
 
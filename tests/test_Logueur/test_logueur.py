@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------
+# Tests for the logueur
+# ---------------------------------------------------------
+# ./tests/test_Logueur/test_logueur.py
+""" Tests for the logueur module """
+
+import unittest
+from unittest import mock
+
+from Logueur.logueur import *
+from .mock_handler import MockLogHandler
+
+
+class test_Logueur(unittest.TestCase):
+    """ Tests for the Logueur class
+
+    We test the creation of the messages by the level methods,
+    and the check of the level before creating them.
+    """
+
+    def setUp(self):
+        self.out_info = MockLogHandler(LogLevel.INFO)
+        self.out_error = MockLogHandler(LogLevel.ERROR)
+        self.log = Logueur([self.out_info, self.out_error])
+
+    def test_levelMethods(self):
+        self.log.debug("debug")
+        self.log.info("info")
+        self.log.error("error")
+        self.assertEqual([msg.body for msg in self.out_info.messages], ["info","error"])
+        self.assertEqual([msg.body for msg in self.out_error.messages], ["error"])
+    def test_topic(self):
+        self.log.info("info", topic="a.topic")
+        self.log.info("info")
+        self.assertEqual(self.out_info.messages[0].topic, "a.topic")
+        self.assertEqual(self.out_info.messages[1].topic, "test_logueur.test_Logueur.test_topic")
+        with self.assertRaises(ValueError): # The topic given as the former positional argument
+            self.log.info("info", "a.topic")
+        self.assertEqual(len(self.out_info.messages), 2)
+
+    def test_lazyBody(self):
+        body = mock.Mock(return_value="lazy")
+        self.log.debug(body)
+        body.assert_not_called()
+        self.log.info(body)
+        self.log.info("{} {key}", "template", key="value")
+        self.assertEqual(self.out_info.messages[0].body, "lazy")
+        self.assertEqual(self.out_info.messages[1].body, "template value")
+        body.assert_called_once()
+
+    def test_logMany(self):
+        msgs = [LogMessage("debug",LogLevel.DEBUG,LogTopic("topic")),
+                LogMessage("error",LogLevel.ERROR,LogTopic("topic"))]
+        self.log.log_many(msgs)
+        self.assertEqual([msg.body for msg in self.out_info.messages], ["error"])
+        self.assertEqual([msg.body for msg in self.out_error.messages], ["error"])
+        with self.assertRaises(ValueError):
+            self.log.log_many(msgs[0])
+
+    def test_isEnabledFor(self):
+        self.assertFalse(self.log.is_enabled_for(LogLevel.DEBUG))
+        self.assertTrue(self.log.is_enabled_for(LogLevel.INFO))
+        self.assertTrue(self.log.is_enabled_for("ERROR"))
+        self.assertTrue(self.log.is_enabled_for(4))
+    def test_disabledLevel(self):
+        with mock.patch.object(LogTopic,"topicFactory") as topicFactory:
+            self.log.debug("debug")
+        topicFactory.assert_not_called()
+        self.assertEqual(self.out_info.messages, [])
+    def test_addOut(self):
+        self.log.add_out(MockLogHandler(LogLevel.DEBUG))
+        self.assertTrue(self.log.is_enabled_for(LogLevel.DEBUG))
+        self.assertEqual(len(self.log._out), 3)
+    def test_levelChange(self):
+        self.out_info.level = LogLevel.DEBUG
+        self.assertTrue(self.log.is_enabled_for(LogLevel.DEBUG))
+        self.out_info.level = LogLevel.WARNING
+        self.assertFalse(self.log.is_enabled_for(LogLevel.INFO))
+        self.assertTrue(self.log.is_enabled_for(LogLevel.WARNING))
+    def test_noOutput(self):
+        log = Logueur([])
+        self.assertFalse(log.is_enabled_for(LogLevel.FATAL))